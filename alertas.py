@@ -0,0 +1,152 @@
+"""
+Despacho assincrono dos alertas de queda (SMS e chamada).
+
+Os alertas sao enfileirados pelo laco de deteccao e enviados por uma thread
+propria, para que o modem GSM (com suas esperas de varios segundos) nunca
+bloqueie a camera nem o stream.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+QUEUED = "queued"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+class Alerta:
+    """Um alerta enviado pelo despachante, com seu estado e os instantes de cada etapa."""
+
+    __slots__ = ('id', 'tipo', 'destino', 'mensagem', 'tempo_confirmacao', 'estado',
+                 'enfileirado_em', 'inicio_envio', 'concluido_em', 'erro', 'metricas')
+
+    def __init__(self, id, tipo, destino, mensagem=None, tempo_confirmacao=None):
+        self.id = id
+        self.tipo = tipo
+        self.destino = destino
+        self.mensagem = mensagem
+        self.tempo_confirmacao = tempo_confirmacao
+        self.estado = QUEUED
+        self.enfileirado_em = time.time()
+        self.inicio_envio = None
+        self.concluido_em = None
+        self.erro = None
+        self.metricas = {}
+
+    def as_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class AlertDispatcher(threading.Thread):
+    """
+    Envia os alertas da fila, um de cada vez, com o handler registrado para o tipo.
+
+    `handlers` mapeia o tipo do alerta ("sms", "chamada", ...) para uma funcao
+    que recebe o Alerta e retorna True em caso de sucesso. Os alertas sao
+    processados na ordem de chegada porque compartilham o mesmo modem.
+    `ao_concluir(alerta)`, se informado, e chamado apos cada envio (sucesso ou falha).
+    """
+
+    def __init__(self, handlers, historico=50, ao_concluir=None):
+        super().__init__(name="alertas", daemon=True)
+        self.handlers = handlers
+        self.ao_concluir = ao_concluir
+        self._fila = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._historico = deque(maxlen=historico)
+
+    def enviar(self, tipo, destino, mensagem=None, tempo_confirmacao=None):
+        """Enfileira um alerta e retorna imediatamente."""
+        alerta = Alerta(next(self._ids), tipo, destino, mensagem, tempo_confirmacao)
+        with self._lock:
+            self._historico.append(alerta)
+        self._fila.put(alerta)
+        return alerta
+
+    def run(self):
+        while True:
+            alerta = self._fila.get()
+            if alerta is None: break
+            alerta.inicio_envio = time.time()
+            alerta.estado = SENDING
+            try:
+                sucesso = bool(self.handlers[alerta.tipo](alerta))
+                if not sucesso: alerta.erro = "modem nao confirmou o envio"
+            except Exception as e:
+                sucesso = False
+                alerta.erro = str(e)
+            alerta.concluido_em = time.time()
+            alerta.estado = SENT if sucesso else FAILED
+            espera = alerta.inicio_envio - alerta.enfileirado_em
+            duracao = alerta.concluido_em - alerta.inicio_envio
+            print(f"[ALERTA] #{alerta.id} {alerta.tipo}: {alerta.estado} (fila {espera:.2f}s, envio {duracao:.2f}s)"
+                  + (f" - {alerta.erro}" if alerta.erro else ""))
+            if self.ao_concluir: self.ao_concluir(alerta)
+
+    def parar(self):
+        self._fila.put(None)
+
+    def pendentes(self):
+        return self._fila.qsize()
+
+    def status(self):
+        """Lista os alertas recentes, do mais antigo para o mais novo."""
+        with self._lock:
+            return [alerta.as_dict() for alerta in self._historico]
+
+
+# --- ALERTAS VIA MODULO GSM ---
+MENSAGEM_QUEDA = "ALERTA DE QUEDA! Alexandre Rodrigues esta caido no {sala}"
+
+def alertar_queda(despachante, destinos, sala, tempo_confirmacao):
+    """Enfileira o SMS da queda (com o comodo) para cada destino e a chamada para o primeiro."""
+    for destino in destinos:
+        despachante.enviar("sms", destino, MENSAGEM_QUEDA.format(sala=sala), tempo_confirmacao)
+    despachante.enviar("chamada", destinos[0])
+
+def enviar_sms(modem, alerta):
+    print("--- Acionando envio de SMS ---")
+    if modem is None: return False
+    resposta = modem.enviar_sms(alerta.destino, alerta.mensagem)
+    if not resposta.ok:
+        print(f"--- Falha no envio do SMS: {resposta.comando} -> {resposta.final} ---")
+        return False
+
+    # <<< COLETA DE METRICA DE TEMPO >>>
+    tempo_envio_sms = time.time() # instante em que o modulo confirmou o envio (+CMGS)
+    latencia_sms = tempo_envio_sms - (alerta.tempo_confirmacao or alerta.enfileirado_em)
+    alerta.metricas['latencia'] = latencia_sms
+    print(f"[METRICA] Latencia do Alerta SMS: {latencia_sms:.2f} segundos")
+    print("--- SMS enviado ---")
+    return True
+
+def fazer_chamada_com_alerta_rapido(modem, alerta, duracao_tons=20):
+    print("--- Acionando chamada com alerta rapido ---")
+    if modem is None: return False
+    if not modem.comando(f"ATD{alerta.destino};", "OK", timeout=20).ok: return False
+
+    # <<< COLETA DE METRICA DE TEMPO >>>
+    tempo_inicio_chamada = time.time()
+    alerta.metricas['latencia'] = tempo_inicio_chamada - (alerta.tempo_confirmacao or alerta.enfileirado_em)
+    print(f"[METRICA] Chamada iniciada em: {tempo_inicio_chamada}")
+
+    print(">>> Enviando tons de alerta rapido...")
+    tempo_final = time.time() + duracao_tons
+    while time.time() < tempo_final:
+        modem.comando('AT+VTS="#"', timeout=2); time.sleep(0.2)
+
+    modem.comando("ATH", "OK", timeout=5)
+    print("--- Chamada finalizada ---")
+    return True
+
+def criar_handlers_gsm(modem, duracao_tons=20):
+    """Handlers "sms" e "chamada" do AlertDispatcher usando o driver SIM800L."""
+    return {
+        "sms": lambda alerta: enviar_sms(modem, alerta),
+        "chamada": lambda alerta: fazer_chamada_com_alerta_rapido(modem, alerta, duracao_tons),
+    }
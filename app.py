@@ -1,195 +1,285 @@
-
-from flask import Flask, render_template, Response
-import cv2
-import mediapipe as mp
+from flask import Flask, render_template, Response, jsonify, request
 import time
-import numpy as np
-import math
-import serial
 import psutil
 import os    
+import threading
+from collections import deque
+
+from inicializacao import StartupSequence
+# Medida a partir daqui; MediaPipe, OpenCV e a serial sao importados dentro das fases, em paralelo
+inicializacao = StartupSequence()
+
+from pipeline import LatestQueue, StageStats, CaptureStage, ProcessingStage, formatar_relatorio
+from broadcast import FrameHub, tier_da_requisicao
+from alertas import AlertDispatcher, criar_handlers_gsm, alertar_queda, SENT
+from metricas import Registry
 
 app = Flask(__name__)
 
 # --- INICIALIZACAO DO PROCESSO PARA METRICAS ---
 process = psutil.Process(os.getpid())
+process.cpu_percent() # primeira leitura so define a referencia (retorna 0.0)
 
-# --- CONFIGURACAO DO MEDIAPIPE ---
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(min_detection_confidence=0.6, model_complexity=1)
-mp_drawing = mp.solutions.drawing_utils
+# --- CONFIGURACAO ---
+numero_alerta = "+5535999092107"
+porta_serial_gsm = "/dev/serial0"
+SALA = "Escritorio"
+INFERENCIA_ADAPTATIVA = True
+USAR_GATE_MOVIMENTO = True
+USAR_ROI = True
+# Clipe de cada queda confirmada: segundos antes/depois, guardados num buffer de JPEGs com orcamento fixo de RAM
+GRAVAR_CLIPES = True
+PASTA_CLIPES = "clipes"
+CLIPE_ANTES, CLIPE_DEPOIS = 10.0, 5.0
+ORCAMENTO_CLIPES = 8 * 1024 * 1024
+# Log binario dos landmarks e do estado de cada frame inferido (telemetria.py), um arquivo por dia
+GRAVAR_TELEMETRIA = False
+PASTA_TELEMETRIA = "telemetria"
+DIAS_TELEMETRIA = 7
 
-# --- CONFIGURACAO DA CAMERA ---
-def find_camera_index():
-    for index in range(15):
-        cap_test = cv2.VideoCapture(index)
-        if cap_test.isOpened():
-            print(f"Camera funcional encontrada no indice {index}")
-            cap_test.release(); return index
-    return -1
+# Preenchidos pelas fases de inicializacao (iniciar_app)
+cap = info_camera = None
+modem = None
+despachante = None
+detector = monitor = codificar_jpeg = None
+gravador = telemetria = None
 
-camera_index = find_camera_index()
-if camera_index == -1: exit("Erro: Nenhuma camera foi encontrada.")
-cap = cv2.VideoCapture(camera_index)
+# --- FASES DE INICIALIZACAO ---
+def abrir_camera_fase():
+    """Descoberta da camera (cache do dispositivo em camera.py)."""
+    global cap, info_camera
+    import cv2
+    from camera import abrir_camera
+    cap, info_camera = abrir_camera()
+    if cap is None: raise RuntimeError("Nenhuma camera foi encontrada.")
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) # V4L2: nao deixar frames velhos acumulando no driver
+    return {'dispositivo': info_camera['dispositivo'], 'resolucao': f"{info_camera['largura']}x{info_camera['altura']}"}
 
+def abrir_gsm_fase():
+    """Serial do SIM800L e despacho assincrono dos alertas."""
+    global modem, despachante
+    from gsm_modem import abrir_modem
+    modem = abrir_modem(porta_serial_gsm)
+    # O SMS e a chamada (~30 s de esperas no modem) rodam em uma thread propria;
+    # o laco de deteccao apenas enfileira e segue processando frames.
+    despachante = AlertDispatcher(criar_handlers_gsm(modem), ao_concluir=registrar_alerta)
+    despachante.start()
+    return {'modem': modem is not None}
 
-# --- SECAO GSM ---
-numero_alerta = "+5535999092107"
-porta_serial_gsm = "/dev/serial0"
-try:
-    ser_gsm = serial.Serial(porta_serial_gsm, baudrate=115200, timeout=5)
-    print(f"Porta serial GSM {porta_serial_gsm} aberta.")
-except serial.SerialException as e:
-    print(f"ERRO CRITICO: Nao foi possivel abrir a porta serial GSM: {e}")
-    ser_gsm = None
-
-def enviar_comando_at(comando, resposta_esperada="OK", timeout=0.2):
-    if ser_gsm is None: return False
-    ser_gsm.write((comando + '\r\n').encode())
-    time.sleep(timeout); resposta = ser_gsm.read_all().decode(errors='ignore').strip()
-    return resposta_esperada in resposta
-
-def enviar_sms(numero, mensagem, tempo_confirmacao):
-    print("--- Acionando envio de SMS ---")
-    if not enviar_comando_at("AT+CMGF=1", timeout=1): return
-    if not enviar_comando_at(f'AT+CMGS="{numero}"', ">", timeout=5): return
-    ser_gsm.write(mensagem.encode()); time.sleep(0.5); ser_gsm.write(bytes([26])); time.sleep(5)
-    
-    # <<< COLETA DE METRICA DE TEMPO >>>
-    tempo_envio_sms = time.time()
-    latencia_sms = tempo_envio_sms - tempo_confirmacao
-    print(f"[METRICA] Latencia do Alerta SMS: {latencia_sms:.2f} segundos")
-    print("--- SMS enviado ---")
-
-def fazer_chamada_com_alerta_rapido(numero):
-    print("--- Acionando chamada com alerta rapido ---")
-    if not enviar_comando_at(f"ATD{numero};", "OK", timeout=5): return
-    
-    # <<< COLETA DE METRICA DE TEMPO >>>
-    tempo_inicio_chamada = time.time()
-    print(f"[METRICA] Chamada iniciada em: {tempo_inicio_chamada}")
-    
-    print(">>> Enviando tons de alerta rapido...")
-    tempo_final = time.time() + 20
-    while time.time() < tempo_final:
-        enviar_comando_at('AT+VTS="#"'); time.sleep(0.2)
-    
-    enviar_comando_at("ATH", "OK", timeout=2)
-    print("--- Chamada finalizada ---")
-    
-# --- Variaveis de estado ---
-current_state = "Estavel"
-fall_confirmed = False
-previous_hip_y = None
-time_unstable_start = None
-high_velocity_event = False
-was_previously_tracking = True
-last_stable_hip_y = None
-
-# --- Limiares ---
-FALL_CONFIRM_TIME = 4.5
-Y_VELOCITY_THRESHOLD = 20
-TORSO_VERTICAL_THRESHOLD = 70
-ASPECT_RATIO_UPRIGHT_THRESHOLD = 1.2
+def carregar_pose_fase():
+    """Importa o MediaPipe, cria o Pose e o aquece num frame vazio do tamanho da camera."""
+    global detector, monitor, codificar_jpeg
+    from camera import ler_cache
+    from fall_detector import FallDetector
+    from monitor import CameraMonitor, codificar_jpeg
+    # Maquina de estados (fall_detector.py) e pose/otimizacoes da camera (monitor.py)
+    detector = FallDetector(ao_confirmar=confirmar_queda)
+    monitor = CameraMonitor(detector, INFERENCIA_ADAPTATIVA, USAR_GATE_MOVIMENTO, USAR_ROI)
+    # A resolucao real so e conhecida depois da fase da camera; o cache da ultima execucao basta para o aquecimento
+    anterior = ler_cache() or {}
+    aquecimento = monitor.aquecer(anterior.get('largura', 640), anterior.get('altura', 480))
+    return {'aquecimento_ms': round(aquecimento * 1000)}
+
+def confirmar_queda(tempo_confirmacao):
+    quedas_confirmadas.inc()
+    alertar_queda(despachante, [numero_alerta], SALA, tempo_confirmacao)
+    if gravador: gravador.disparar(tempo_confirmacao)
 
 # --- Variavel para metricas de sistema ---
 last_metric_time = time.time()
 
-def generate_frames():
-    global current_state, fall_confirmed, previous_hip_y, time_unstable_start, high_velocity_event
-    global was_previously_tracking, last_stable_hip_y, last_metric_time
-
-    while True:
-        success, frame = cap.read()
-        if not success: break
-        
-        frame = cv2.flip(frame, 1)
-        image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(image_rgb)
-        
-        if results.pose_landmarks:
-            is_reacquiring_track = not was_previously_tracking
-            was_previously_tracking = True
-            mp_drawing.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-            # ... (Toda a logica de deteccao de pose permanece a mesma)
-            landmarks = results.pose_landmarks.landmark
-            h, w, _ = frame.shape
-            sh_l, sh_r = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER], landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-            hip_l, hip_r = landmarks[mp_pose.PoseLandmark.LEFT_HIP], landmarks[mp_pose.PoseLandmark.RIGHT_HIP]
-            hip_mid_y = (hip_l.y + hip_r.y) / 2
-            current_hip_y = int(hip_mid_y * h)
-
-            if is_reacquiring_track and last_stable_hip_y is not None:
-                y_velocity = current_hip_y - last_stable_hip_y
-            else:
-                y_velocity = current_hip_y - previous_hip_y if previous_hip_y is not None else 0
-            
-            if y_velocity > Y_VELOCITY_THRESHOLD:
-                high_velocity_event = True
-                current_state = "Caindo"
-            previous_hip_y = current_hip_y
-
-            torso_angle = abs(math.degrees(math.atan2((hip_l.y + hip_r.y)/2 - (sh_l.y + sh_r.y)/2, (hip_l.x + hip_r.x)/2 - (sh_l.x + sh_r.x)/2)))
-            points = np.array([[lm.x * w, lm.y * h] for lm in landmarks]).astype(int)
-            body_height = np.max(points, axis=0)[1] - np.min(points, axis=0)[1]
-            body_width = np.max(points, axis=0)[0] - np.min(points, axis=0)[0]
-            aspect_ratio = body_height / body_width if body_width > 0 else 0
-            is_upright = torso_angle > TORSO_VERTICAL_THRESHOLD and aspect_ratio > ASPECT_RATIO_UPRIGHT_THRESHOLD
-
-            if is_upright:
-                current_state = "Estavel"
-                time_unstable_start = None
-                fall_confirmed = False
-                high_velocity_event = False
-                last_stable_hip_y = current_hip_y
-            else:
-                if high_velocity_event:
-                    if time_unstable_start is None:
-                        # <<< COLETA DE METRICA DE TEMPO >>>
-                        time_unstable_start = time.time()
-                        print(f"[METRICA] Evento de instabilidade iniciado em: {time_unstable_start}")
-                        
-                        current_state = "Instavel"
-                        
-            if current_state == "Instavel" and time_unstable_start is not None:
-                if time.time() - time_unstable_start >= FALL_CONFIRM_TIME:
-                    if not fall_confirmed:
-                        # <<< COLETA DE METRICA DE TEMPO >>>
-                        tempo_confirmacao = time.time()
-                        tempo_total_deteccao = tempo_confirmacao - time_unstable_start
-                        print(f"[METRICA] Queda confirmada em: {tempo_confirmacao}")
-                        print(f"[METRICA] Tempo de Confirmacao da Queda: {tempo_total_deteccao:.2f} segundos")
-                        
-                        fall_confirmed = True
-                        enviar_sms(numero_alerta, "ALERTA DE QUEDA! Alexandre Rodrigues esta caido no Escritorio", tempo_confirmacao)
-                        fazer_chamada_com_alerta_rapido(numero_alerta)
-        else:
-            was_previously_tracking = False
-            current_state = "Nenhuma pessoa detectada"
-        
-        # <<< COLETA DE METRICAS DE SISTEMA >>>
-        if time.time() - last_metric_time > 5.0: # A cada 5 segundos
-            cpu_usage = process.cpu_percent()
-            ram_usage = process.memory_info().rss / (1024 * 1024) # em MB
-            print(f"[METRICA] Uso de CPU: {cpu_usage:.2f}% | Uso de RAM: {ram_usage:.2f} MB")
-            last_metric_time = time.time()
-        
-        # Logica de exibicao na tela... (sem alteracao)
-        if fall_confirmed: cv2.putText(frame, "QUEDA CONFIRMADA!", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 4)
-        cv2.putText(frame, f"Estado: {current_state}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
-        if current_state == "Instavel" and time_unstable_start is not None:
-             time_in_unstable_state = time.time() - time_unstable_start
-             cv2.putText(frame, f"Tempo Instavel: {time_in_unstable_state:.1f}s", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame = buffer.tobytes()
+# --- METRICAS PROMETHEUS (/metrics) ---
+# No caminho quente so ha observe()/inc(); CPU, RSS, clientes e descartes sao lidos na coleta
+metricas = Registry()
+duracao_estagio = metricas.histogram("quedas_estagio_duracao_segundos",
+                                     "Tempo de processamento por frame em cada estagio", ("estagio",))
+duracao_alerta = metricas.histogram("quedas_alerta_duracao_segundos",
+                                    "Tempo do alerta desde a fila ate o modem concluir o envio", ("tipo",))
+frames_por_resultado = metricas.counter("quedas_frames_total",
+                                        "Frames da inferencia: pose estimada ou reaproveitada (gate/taxa base)", ("resultado",))
+frames_inferidos = frames_por_resultado.labels("inferido")
+frames_reaproveitados = frames_por_resultado.labels("reaproveitado")
+frames_descartados = metricas.counter("quedas_frames_descartados_total",
+                                      "Frames descartados pelas filas latest-wins", ("fila",))
+transicoes_estado = metricas.counter("quedas_transicoes_estado_total",
+                                     "Mudancas de estado da maquina de deteccao", ("de", "para"))
+quedas_confirmadas = metricas.counter("quedas_confirmadas_total", "Quedas confirmadas")
+alertas_enviados = metricas.counter("quedas_alertas_total", "Alertas concluidos pelo despachante", ("tipo", "resultado"))
+processo_metricas = psutil.Process(os.getpid()) # referencia de cpu_percent propria, separada do print a cada 5 s
+processo_metricas.cpu_percent()
+metricas.gauge("quedas_processo_cpu_percentual", "Uso de CPU do processo desde a coleta anterior").set_function(processo_metricas.cpu_percent)
+metricas.gauge("quedas_processo_rss_bytes", "Memoria residente do processo").set_function(lambda: processo_metricas.memory_info().rss)
+metricas.gauge("quedas_espectadores", "Clientes conectados em /video_feed").set_function(lambda: hub.clientes)
+metricas.gauge("quedas_alertas_pendentes", "Alertas na fila do despachante").set_function(
+    lambda: despachante.pendentes() if despachante else 0)
+metricas.gauge("quedas_clipes_buffer_bytes", "Bytes de JPEG no buffer dos clipes").set_function(
+    lambda: gravador.ring.bytes if gravador else 0)
+metricas.gauge("quedas_pronto", "1 quando a inicializacao terminou").set_function(lambda: int(inicializacao.pronto))
+ultima_decisao = (None, False) # (estado, queda confirmada) do frame anterior
+
+def registrar_alerta(alerta):
+    duracao_alerta.labels(alerta.tipo).observe(alerta.concluido_em - alerta.enfileirado_em)
+    alertas_enviados.labels(alerta.tipo, "enviado" if alerta.estado == SENT else "falhou").inc()
+
+# --- MODO HEADLESS ---
+# A deteccao roda sempre; desenho do overlay e codificacao JPEG so com espectadores no hub.
+frames_sem_render = 0
+houve_espectador = False
+cpu_por_modo = {"headless": deque(maxlen=60), "com espectadores": deque(maxlen=60)}
+
+# --- ESTAGIOS DO PIPELINE ---
+def relatorio_headless(cpu_usage):
+    """Resume a economia do modo headless: render evitado e CPU medida em cada modo."""
+    global houve_espectador
+    cpu_por_modo["com espectadores" if houve_espectador else "headless"].append(cpu_usage)
+    houve_espectador = hub.clientes > 0
+
+    custo_render = stats_render.duracao_media()
+    economia = f"~{frames_sem_render * custo_render:.1f} s de CPU economizados" if custo_render else "custo do render ainda nao medido"
+    medias = {modo: f"{sum(v) / len(v):.1f}%" if v else "n/d" for modo, v in cpu_por_modo.items()}
+    return (f"[METRICA] Headless: {frames_sem_render} frames sem render/encode ({economia})"
+            f" | CPU media headless {medias['headless']} vs com espectadores {medias['com espectadores']}")
+
+def inferir(pacote):
+    global last_metric_time, frames_sem_render, houve_espectador, ultima_decisao
+
+    # Frame cru da camera (o espelhado e desenhado e outro array): o gravador o codifica na thread dele
+    if gravador: gravador.adicionar(pacote.frame, time.time())
+    inferido = monitor.inferir(pacote)
+    if inferido:
+        frames_inferidos.inc()
+        duracao_estado.observe(monitor.duracao_estado)
+    else:
+        frames_reaproveitados.inc()
+    estado, confirmada, _ = pacote.estado
+    mudou = (estado, confirmada) != ultima_decisao
+    if estado != ultima_decisao[0] and ultima_decisao[0] is not None:
+        transicoes_estado.labels(ultima_decisao[0], estado).inc()
+    ultima_decisao = (estado, confirmada)
+    # Frames com pose nova ou que mudaram a decisao; os reaproveitados sem mudanca nao trazem informacao
+    if telemetria and (inferido or mudou):
+        telemetria.registrar(monitor.t_decisao, pacote.seq, estado, confirmada, inferido,
+                             monitor.landmarks.array if pacote.results.pose_landmarks else None, detector.medidas)
+
+    # <<< COLETA DE METRICAS DE SISTEMA >>>
+    if time.time() - last_metric_time > 5.0: # A cada 5 segundos
+        cpu_usage = process.cpu_percent()
+        ram_usage = process.memory_info().rss / (1024 * 1024) # em MB
+        print(f"[METRICA] Uso de CPU: {cpu_usage:.2f}% | Uso de RAM: {ram_usage:.2f} MB")
+        print(formatar_relatorio(stats_estagios, [("captura", fila_captura), ("render", fila_render)]) + f" | clientes: {hub.clientes}")
+        print(relatorio_headless(cpu_usage))
+        for linha in monitor.relatorios(time.monotonic()): print(linha)
+        if gravador: print(gravador.relatorio())
+        if telemetria: print(telemetria.relatorio())
+        last_metric_time = time.time()
+
+    # Sem ninguem assistindo, o frame nao segue para o estagio de renderizacao
+    if hub.clientes == 0:
+        frames_sem_render += 1
+        return None
+    houve_espectador = True
+    return pacote
+
+def renderizar(pacote):
+    # Tiers limitados por fps podem nao precisar deste frame; nesse caso nem desenha o overlay
+    tiers = hub.tiers_para_codificar(time.monotonic())
+    if not tiers: return None
+
+    monitor.desenhar(pacote)
+    # Cada tier com clientes e codificado uma unica vez e compartilhado por todos eles
+    for tier in tiers:
+        t0 = time.monotonic()
+        jpeg = codificar_jpeg(pacote.frame, tier)
+        duracao_encode.observe(time.monotonic() - t0)
+        hub.publicar(tier, jpeg)
+
+# Filas "latest-wins" de tamanho 1 entre os estagios: nenhum estagio acumula frames velhos
+fila_captura = LatestQueue(1)
+fila_render = LatestQueue(1)
+# Um unico laco de deteccao e dono da camera; os clientes de /video_feed so leem do hub
+hub = FrameHub()
+stats_captura = StageStats("Captura", histograma=duracao_estagio.labels("captura"))
+stats_inferencia = StageStats("Inferencia", histograma=duracao_estagio.labels("inferencia"))
+stats_render = StageStats("Render", histograma=duracao_estagio.labels("render"))
+stats_estagios = (stats_captura, stats_inferencia, stats_render)
+duracao_estado = duracao_estagio.labels("estado")   # landmarks -> detector.step
+duracao_encode = duracao_estagio.labels("encode")   # um JPEG por tier
+frames_descartados.labels("captura").set_function(lambda: fila_captura.descartados)
+frames_descartados.labels("render").set_function(lambda: fila_render.descartados)
+
+estagios = []
+
+def iniciar_pipeline_fase():
+    """Sobe os estagios e espera o primeiro frame passar pela inferencia."""
+    global gravador, telemetria
+    if GRAVAR_TELEMETRIA:
+        from telemetria import TelemetryLog
+        telemetria = TelemetryLog(PASTA_TELEMETRIA, DIAS_TELEMETRIA)
+        telemetria.start()
+    if GRAVAR_CLIPES:
+        from clipes import ClipRecorder
+        gravador = ClipRecorder(PASTA_CLIPES, SALA.lower(), ORCAMENTO_CLIPES, antes=CLIPE_ANTES, depois=CLIPE_DEPOIS)
+        gravador.start()
+    estagios.extend([
+        CaptureStage(cap, fila_captura, stats_captura),
+        ProcessingStage("inferencia", inferir, fila_captura, fila_render, stats_inferencia),
+        ProcessingStage("render", renderizar, fila_render, hub, stats_render), # publica direto no hub
+    ])
+    for estagio in estagios: estagio.start()
+    t0 = time.monotonic()
+    while stats_inferencia.total == 0:
+        if not estagios[0].is_alive(): raise RuntimeError("a captura parou antes do primeiro frame")
+        time.sleep(0.005)
+    return {'primeiro_frame_ms': round((time.monotonic() - t0) * 1000)}
+
+def iniciar_app():
+    """Camera, GSM e modelo de pose em paralelo; o pipeline sobe quando os tres terminam."""
+    inicializacao.fase("camera", abrir_camera_fase)
+    inicializacao.fase("gsm", abrir_gsm_fase)
+    inicializacao.fase("pose", carregar_pose_fase)
+    inicializacao.fase("pipeline", iniciar_pipeline_fase, depende=("camera", "gsm", "pose"))
+
+    def aguardar_pronto():
+        if not inicializacao.aguardar("pipeline"):
+            # Sem camera ou sem modelo nao ha monitoramento: encerra para o watchdog reiniciar o app
+            print("Erro: inicializacao falhou.", inicializacao.status()['fases'])
+            os._exit(1)
+        inicializacao.marcar_pronto()
+        print(inicializacao.relatorio())
+    threading.Thread(target=aguardar_pronto, name="init-pronto", daemon=True).start()
+
+def generate_frames(tier):
+    for frame in hub.subscribe(tier):
         yield (b'--frame\r\n'
                b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
 
-# --- Rotas do Flask (sem alteracao) ---
+# --- Rotas do Flask ---
 @app.route('/')
-def index(): return render_template('index.html')
+def index(): return render_template('index.html', parametros_video=request.args.to_dict())
 @app.route('/video_feed')
-def video_feed(): return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
-if __name__ == '__main__': app.run(host='0.0.0.0', port=5000, debug=False)            
+def video_feed():
+    # Ex.: /video_feed?tier=baixa ou /video_feed?res=320x240&q=60&fps=10
+    try: tier = tier_da_requisicao(request.args)
+    except ValueError: return "Parametros de video invalidos (res=LxA, q=10-95, fps=1-30)", 400
+    return Response(generate_frames(tier), mimetype='multipart/x-mixed-replace; boundary=frame')
+@app.route('/video_tiers')
+def video_tiers(): return jsonify(hub.status())
+@app.route('/alertas')
+def alertas():
+    if despachante is None: return jsonify(erro="inicializando"), 503
+    return jsonify(pendentes=despachante.pendentes(), alertas=despachante.status(),
+                   latencia_gsm=modem.estatisticas() if modem else {})
+@app.route('/metrics')
+def metrics(): return Response(metricas.exposicao(), content_type=Registry.CONTENT_TYPE)
+@app.route('/health')
+def health():
+    # Processo no ar; 503 se alguma fase da inicializacao falhou
+    return jsonify(inicializacao.status()), 503 if inicializacao.falhou else 200
+@app.route('/ready')
+def ready():
+    # Pronto = camera, GSM e modelo prontos e o primeiro frame ja passou pela inferencia
+    return jsonify(inicializacao.status()), 200 if inicializacao.pronto else 503
+if __name__ == '__main__':
+    # O servidor sobe junto com as fases, para /health e /ready responderem durante a inicializacao
+    iniciar_app()
+    app.run(host='0.0.0.0', port=5000, debug=False)
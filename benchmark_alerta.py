@@ -0,0 +1,92 @@
+# benchmark_alerta.py - Latencia do caminho de alerta contra o SIM800L simulado
+"""
+Mede, de forma reproduzivel, as latencias [METRICA] do caminho de alerta:
+da confirmacao da queda ate o "+CMGS:" do SMS e ate o OK do ATD da chamada.
+
+Usa o mesmo caminho do app.py (AlertDispatcher + handlers GSM + driver
+SIM800L), mas com o modulo GSM substituido pelo simulador em pty, cujos
+atrasos de rede sao fixos. Assim a diferenca entre duas versoes do codigo
+aparece como diferenca de latencia, sem o ruido da rede celular.
+"""
+
+import argparse
+import statistics
+import time
+
+import serial
+
+from alertas import AlertDispatcher, SENT, criar_handlers_gsm
+from gsm_modem import SIM800L
+from sim800l_simulador import SimuladorSIM800L
+
+# Soma dos sleeps fixos do envio de SMS antes do driver orientado a eventos
+# (AT+CMGF 1 s + AT+CMGS 5 s + texto 0,5 s + espera do +CMGS 5 s)
+LATENCIA_SMS_SLEEPS_FIXOS = 11.5
+
+
+def resumo(nome, amostras):
+    if not amostras:
+        return f"{nome}: sem amostras"
+    ordenadas = sorted(amostras)
+    p95 = ordenadas[min(len(ordenadas) - 1, int(round(0.95 * (len(ordenadas) - 1))))]
+    return (f"{nome}: media {statistics.mean(amostras):.3f}s | mediana {statistics.median(amostras):.3f}s"
+            f" | p95 {p95:.3f}s | max {max(amostras):.3f}s (n={len(amostras)})")
+
+
+def executar_benchmark(repeticoes=10, atraso_rede_sms=2.0, atraso_chamada=0.5, atraso_padrao=0.005,
+                       duracao_tons=1.0):
+    simulador = SimuladorSIM800L(atrasos={"ATD": atraso_chamada}, atraso_padrao=atraso_padrao,
+                                 atraso_rede_sms=atraso_rede_sms)
+    latencias = {"sms": [], "chamada": []}
+    falhas = 0
+    with simulador:
+        modem = SIM800L(serial.Serial(simulador.porta, baudrate=115200, timeout=5))
+        despachante = AlertDispatcher(criar_handlers_gsm(modem, duracao_tons=duracao_tons))
+        despachante.start()
+        try:
+            for _ in range(repeticoes):
+                # Mesmo par de alertas que o app enfileira ao confirmar uma queda
+                tempo_confirmacao = time.time()
+                alertas = [despachante.enviar("sms", "+5500000000000", "ALERTA DE QUEDA! (benchmark)", tempo_confirmacao),
+                           despachante.enviar("chamada", "+5500000000000", tempo_confirmacao=tempo_confirmacao)]
+                while any(alerta.concluido_em is None for alerta in alertas):
+                    time.sleep(0.01)
+                for alerta in alertas:
+                    if alerta.estado == SENT:
+                        latencias[alerta.tipo].append(alerta.metricas['latencia'])
+                    else:
+                        falhas += 1
+        finally:
+            despachante.parar()
+            estatisticas_modem = modem.estatisticas()
+            modem.fechar()
+    return latencias, estatisticas_modem, falhas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do caminho de alerta com o SIM800L simulado")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    parser.add_argument("--atraso-rede-sms", type=float, default=2.0, help="atraso simulado ate o +CMGS:")
+    parser.add_argument("--atraso-chamada", type=float, default=0.5, help="atraso simulado ate o OK do ATD")
+    parser.add_argument("--atraso-padrao", type=float, default=0.005, help="atraso simulado dos demais comandos")
+    parser.add_argument("--duracao-tons", type=float, default=1.0, help="segundos de AT+VTS por chamada")
+    args = parser.parse_args()
+
+    print("=== BENCHMARK DO CAMINHO DE ALERTA (SIM800L SIMULADO) ===")
+    print(f"Atraso simulado: rede SMS {args.atraso_rede_sms:.2f}s | ATD {args.atraso_chamada:.2f}s"
+          f" | demais comandos {args.atraso_padrao * 1000:.0f} ms")
+    latencias, estatisticas_modem, falhas = executar_benchmark(
+        args.repeticoes, args.atraso_rede_sms, args.atraso_chamada, args.atraso_padrao, args.duracao_tons)
+
+    print("\n" + "=" * 60)
+    print("[METRICA] " + resumo("Latencia do Alerta SMS (confirmacao -> +CMGS)", latencias["sms"]))
+    print("[METRICA] " + resumo("Latencia da Chamada (confirmacao -> OK do ATD)", latencias["chamada"]))
+    if latencias["sms"]:
+        excesso = statistics.mean(latencias["sms"]) - args.atraso_rede_sms
+        print(f"Sobrecusto do SMS acima do atraso de rede: {excesso * 1000:.0f} ms"
+              f" (com os sleeps fixos o SMS levava {LATENCIA_SMS_SLEEPS_FIXOS:.1f}s qualquer que fosse a rede)")
+    print(f"Falhas: {falhas}")
+
+    print("\nLatencia por comando AT:")
+    for nome, estat in sorted(estatisticas_modem.items()):
+        print(f"  {nome:<18} media {estat['media_ms']:8.1f} ms | max {estat['max_ms']:8.1f} ms | n={estat['n']}")
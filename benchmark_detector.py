@@ -0,0 +1,283 @@
+# benchmark_detector.py - Passos por segundo do nucleo de deteccao de quedas
+"""
+Microbenchmark de fall_detector.py contra as versoes antigas, copiadas dos
+scripts (listas Python e np.array novos a cada frame).
+
+Uma sequencia sintetica de landmarks (em pe, queda rapida, deitado, levantar,
+com ruido) e passada pelos dois lados com o mesmo relogio simulado. O script
+confere que as decisoes sao as mesmas e mede passos por segundo e o pico de
+memoria alocada por passo (tracemalloc).
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import time
+import tracemalloc
+from enum import IntEnum
+from types import SimpleNamespace
+
+import numpy as np
+
+from fall_detector import FallDetector, PostureFallDetector
+from landmarks import LandmarkAdapter, NUM_LANDMARKS
+
+FPS = 30.0
+
+
+# --- SEQUENCIA SINTETICA ---
+def gerar_sequencia(frames, seed=0):
+    """(frames, 33, 4) float32: ciclos de em pe -> queda -> deitado -> levantar."""
+    rng = np.random.default_rng(seed)
+    em_pe = np.zeros((NUM_LANDMARKS, 4), np.float32)
+    em_pe[:, 0] = 0.5 + rng.uniform(-0.05, 0.05, NUM_LANDMARKS)
+    em_pe[:, 1] = np.linspace(0.15, 0.9, NUM_LANDMARKS)  # corpo vertical
+    em_pe[0, 1] = 0.15                                   # nariz
+    em_pe[11:13, 1] = 0.3                                # ombros
+    em_pe[23:25, 1] = 0.55                               # quadris
+    em_pe[25:27, 1] = 0.72                               # joelhos
+    em_pe[27:29, 1] = 0.88                               # tornozelos
+    em_pe[:, 3] = 0.9
+    deitado = em_pe.copy()
+    deitado[:, 0] = np.linspace(0.15, 0.85, NUM_LANDMARKS)  # corpo horizontal
+    deitado[:, 1] = 0.85 + rng.uniform(-0.02, 0.02, NUM_LANDMARKS)
+
+    ciclo = [(em_pe, em_pe, 60), (em_pe, deitado, 1), (deitado, deitado, 200), (deitado, em_pe, 20)]
+    quadros = []
+    while len(quadros) < frames:
+        for origem, destino, n in ciclo:
+            for i in range(n):
+                a = (i + 1) / n
+                quadros.append((1 - a) * origem + a * destino)
+    sequencia = np.array(quadros[:frames], np.float32)
+    sequencia[:, :, :2] += rng.normal(0, 0.002, sequencia[:, :, :2].shape).astype(np.float32)
+    return sequencia
+
+
+def como_objetos(landmarks):
+    """Landmarks no formato do MediaPipe (objetos com .x .y .z .visibility), para as versoes antigas."""
+    return [SimpleNamespace(x=float(l[0]), y=float(l[1]), z=float(l[2]), visibility=float(l[3])) for l in landmarks]
+
+
+# --- VERSOES ANTIGAS (como estavam nos scripts) ---
+def calculate_angle(a, b):
+    a = np.array(a)
+    b = np.array(b)
+    cosang = np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
+    return np.degrees(np.arccos(np.clip(cosang, -1.0, 1.0)))
+
+
+class RegraTestadorAntiga:
+    def __init__(self, y_velocity_threshold=5, fall_confirm_time=0.5, trunk_horizontal_threshold=35,
+                 leg_horizontal_threshold=35, lower_body_threshold=0.55, head_low_threshold=0.7, altura=360):
+        self.Y_VELOCITY_THRESHOLD = y_velocity_threshold
+        self.FALL_CONFIRM_TIME = fall_confirm_time
+        self.TRUNK_HORIZONTAL_THRESHOLD = trunk_horizontal_threshold
+        self.LEG_HORIZONTAL_THRESHOLD = leg_horizontal_threshold
+        self.LOWER_BODY_THRESHOLD = lower_body_threshold
+        self.HEAD_LOW_THRESHOLD = head_low_threshold
+        self.h = altura
+        self.previous_y = None
+        self.time_fallen_start = None
+        self.fall_confirmed = False
+
+    def step(self, lm, t):
+        h = self.h
+        hip, shoulder, knee, ankle, nose = lm[24], lm[12], lm[26], lm[28], lm[0]
+        hip_y = hip.y * h
+        nose_y = nose.y * h
+        y_velocity = abs(hip_y - self.previous_y) if self.previous_y is not None else 0
+        self.previous_y = hip_y
+        trunk_angle = calculate_angle([(shoulder.x - hip.x), (shoulder.y - hip.y)], [0, -1])
+        leg_angle = calculate_angle([(ankle.x - knee.x), (ankle.y - knee.y)], [0, -1])
+        is_fast_drop = y_velocity > self.Y_VELOCITY_THRESHOLD
+        is_low_posture = hip.y > self.LOWER_BODY_THRESHOLD
+        is_trunk_horizontal = trunk_angle > self.TRUNK_HORIZONTAL_THRESHOLD
+        is_leg_horizontal = leg_angle > self.LEG_HORIZONTAL_THRESHOLD
+        is_head_low = nose_y > self.HEAD_LOW_THRESHOLD * h
+        fall_detected = (is_fast_drop and is_low_posture) or (is_low_posture and is_trunk_horizontal and is_head_low)
+        if fall_detected:
+            if self.time_fallen_start is None:
+                self.time_fallen_start = t
+        else:
+            self.time_fallen_start = None
+            self.fall_confirmed = False
+        if self.time_fallen_start is not None and t - self.time_fallen_start > self.FALL_CONFIRM_TIME:
+            self.fall_confirmed = True
+        return self.fall_confirmed
+
+
+class PoseLandmark(IntEnum):
+    # Mesmo acesso por enum que o app fazia com mp_pose.PoseLandmark
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+
+
+class MaquinaAppAntiga:
+    def __init__(self, largura=640, altura=480):
+        self.w, self.h = largura, altura
+        self.current_state = "Estavel"
+        self.fall_confirmed = False
+        self.previous_hip_y = None
+        self.time_unstable_start = None
+        self.high_velocity_event = False
+
+    def step(self, landmarks, t):
+        w, h = self.w, self.h
+        sh_l, sh_r = landmarks[PoseLandmark.LEFT_SHOULDER], landmarks[PoseLandmark.RIGHT_SHOULDER]
+        hip_l, hip_r = landmarks[PoseLandmark.LEFT_HIP], landmarks[PoseLandmark.RIGHT_HIP]
+        current_hip_y = int((hip_l.y + hip_r.y) / 2 * h)
+        y_velocity = current_hip_y - self.previous_hip_y if self.previous_hip_y is not None else 0
+        if y_velocity > 20:
+            self.high_velocity_event = True
+            self.current_state = "Caindo"
+        self.previous_hip_y = current_hip_y
+        torso_angle = abs(math.degrees(math.atan2((hip_l.y + hip_r.y)/2 - (sh_l.y + sh_r.y)/2, (hip_l.x + hip_r.x)/2 - (sh_l.x + sh_r.x)/2)))
+        points = np.array([[lm.x * w, lm.y * h] for lm in landmarks]).astype(int)
+        body_height = np.max(points, axis=0)[1] - np.min(points, axis=0)[1]
+        body_width = np.max(points, axis=0)[0] - np.min(points, axis=0)[0]
+        aspect_ratio = body_height / body_width if body_width > 0 else 0
+        if torso_angle > 70 and aspect_ratio > 1.2:
+            self.current_state = "Estavel"
+            self.time_unstable_start = None
+            self.fall_confirmed = False
+            self.high_velocity_event = False
+        elif self.high_velocity_event and self.time_unstable_start is None:
+            self.time_unstable_start = t
+            self.current_state = "Instavel"
+        if self.current_state == "Instavel" and t - self.time_unstable_start >= 4.5:
+            self.fall_confirmed = True
+        return self.current_state, self.fall_confirmed
+
+
+# --- MEDICAO ---
+def medir(passo, entradas, repeticoes):
+    """Passos por segundo (melhor de `repeticoes`) e decisoes da ultima rodada."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        decisoes = []
+        t0 = time.perf_counter()
+        for i, entrada in enumerate(entradas):
+            decisoes.append(passo(entrada, i / FPS))
+        melhor = min(melhor, time.perf_counter() - t0)
+    return len(entradas) / melhor, decisoes
+
+
+def pico_por_passo(passo, entradas, n=500):
+    """Maior memoria temporaria (bytes) alocada dentro de um passo."""
+    passo(entradas[0], 0.0)
+    tracemalloc.start()
+    pico = 0
+    for i, entrada in enumerate(entradas[:n]):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        passo(entrada, i / FPS)
+        pico = max(pico, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return pico
+
+
+def como_resultados_pose(sequencia):
+    """Frames como `results.pose_landmarks` do MediaPipe (NormalizedLandmarkList)."""
+    from mediapipe.framework.formats import landmark_pb2
+    resultados = []
+    for landmarks in sequencia:
+        lista = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibilidade in landmarks.tolist():
+            lista.landmark.add(x=x, y=y, z=z, visibility=visibilidade)
+        resultados.append(lista)
+    return resultados
+
+
+def cpu_por_frame(passo, entradas, repeticoes):
+    """Tempo de CPU (us) por frame, melhor de `repeticoes`."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        t0 = time.process_time()
+        for i, entrada in enumerate(entradas):
+            passo(entrada, i / FPS)
+        melhor = min(melhor, time.process_time() - t0)
+    return melhor / len(entradas) * 1e6
+
+
+def executar_por_frame(sequencia, repeticoes=3):
+    """
+    CPU por frame do app entre o resultado do Pose e a decisao: antes, os
+    landmarks eram lidos um a um do protobuf (enum PoseLandmark, listas para a
+    caixa do corpo); agora o LandmarkAdapter preenche o array (33, 4) e o
+    FallDetector calcula as medidas sobre ele.
+    """
+    resultados_pose = como_resultados_pose(sequencia)
+    adaptador = LandmarkAdapter()
+    novo = FallDetector(largura=640, altura=480)
+    antigo = MaquinaAppAntiga(640, 480)
+
+    def passo_novo(pose_landmarks, t):
+        novo.step(adaptador.preencher(pose_landmarks), t)
+
+    def passo_antigo(pose_landmarks, t):
+        antigo.step(pose_landmarks.landmark, t)
+
+    return cpu_por_frame(passo_novo, resultados_pose, repeticoes), cpu_por_frame(passo_antigo, resultados_pose, repeticoes)
+
+
+def executar_benchmark(frames=5000, repeticoes=3):
+    sequencia = gerar_sequencia(frames)
+    objetos = [como_objetos(l) for l in sequencia]
+    buffer = np.empty((NUM_LANDMARKS, 4), np.float32)
+
+    def com_buffer(passo):
+        # Como no app: cada frame e copiado para o mesmo buffer (33, 4) antes do passo
+        def executar(landmarks, t):
+            buffer[:] = landmarks
+            return passo(buffer, t)
+        return executar
+
+    resultados = {}
+    novo = FallDetector(largura=640, altura=480)
+    antigo = MaquinaAppAntiga(640, 480)
+
+    def passo_app(landmarks, t):
+        novo.step(landmarks, t)
+        return novo.estado()[:2]
+    resultados["FallDetector (app)"] = (
+        medir(passo_app, list(sequencia), repeticoes),
+        medir(antigo.step, objetos, repeticoes),
+        pico_por_passo(com_buffer(FallDetector(largura=640, altura=480).step), sequencia),
+        pico_por_passo(MaquinaAppAntiga().step, objetos),
+    )
+    novo = PostureFallDetector()
+    antigo = RegraTestadorAntiga()
+    resultados["PostureFallDetector (testadores)"] = (
+        medir(novo.step, list(sequencia), repeticoes),
+        medir(antigo.step, objetos, repeticoes),
+        pico_por_passo(com_buffer(PostureFallDetector().step), sequencia),
+        pico_por_passo(RegraTestadorAntiga().step, objetos),
+    )
+    return resultados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmark do nucleo de deteccao de quedas")
+    parser.add_argument("--frames", type=int, default=5000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"=== BENCHMARK DO DETECTOR ({args.frames} frames sinteticos, melhor de {args.repeticoes}) ===")
+    with contextlib.redirect_stdout(io.StringIO()): # os detectores imprimem as metricas de cada queda
+        resultados = executar_benchmark(args.frames, args.repeticoes)
+        cpu_novo, cpu_antigo = executar_por_frame(gerar_sequencia(args.frames), args.repeticoes)
+    for nome, ((pps_novo, dec_novo), (pps_antigo, dec_antigo), pico_novo, pico_antigo) in resultados.items():
+        iguais = sum(a == b for a, b in zip(dec_novo, dec_antigo))
+        print(f"\n{nome}")
+        print(f"  [METRICA] novo:   {pps_novo:10.0f} passos/s | pico alocado por passo {pico_novo:6d} bytes")
+        print(f"  [METRICA] antigo: {pps_antigo:10.0f} passos/s | pico alocado por passo {pico_antigo:6d} bytes")
+        print(f"  Aceleracao: {pps_novo / pps_antigo:.1f}x | decisoes iguais: {iguais}/{len(dec_novo)}")
+
+    print("\nPor frame no app (results.pose_landmarks -> decisao)")
+    print(f"  [METRICA] novo:   {cpu_novo:6.1f} us de CPU por frame (LandmarkAdapter + FallDetector)")
+    print(f"  [METRICA] antigo: {cpu_antigo:6.1f} us de CPU por frame (enum PoseLandmark + listas)")
+    print(f"  Aceleracao: {cpu_antigo / cpu_novo:.1f}x")
@@ -0,0 +1,122 @@
+"""
+Hub de difusao dos frames codificados para os clientes de /video_feed.
+
+Um unico produtor (o estagio de renderizacao) publica os frames e cada cliente
+conectado recebe sempre o ultimo frame disponivel. Os clientes sao agrupados
+por tier (resolucao, qualidade JPEG e fps maximo): cada tier e codificado no
+maximo uma vez por frame da camera e o mesmo JPEG e compartilhado por todos
+os clientes daquele tier. Um cliente lento pula frames em vez de acumula-los.
+"""
+
+import threading
+from collections import namedtuple
+
+# largura/altura 0 = resolucao original da camera
+Tier = namedtuple('Tier', 'largura altura qualidade max_fps')
+
+TIERS = {
+    'alta': Tier(0, 0, 95, 30),
+    'media': Tier(640, 480, 75, 15),
+    'baixa': Tier(320, 240, 50, 5),
+}
+TIER_PADRAO = TIERS['alta']
+
+
+def tier_da_requisicao(args):
+    """
+    Monta o Tier a partir dos parametros de /video_feed.
+
+    Aceita um tier nomeado (?tier=baixa) e/ou valores explicitos
+    (?res=320x240&q=60&fps=10), que sobrescrevem os do tier nomeado.
+    Valores fora da faixa sao limitados; valores invalidos levantam ValueError.
+    """
+    largura, altura, qualidade, max_fps = TIERS.get(args.get('tier', 'alta'), TIER_PADRAO)
+    if 'res' in args:
+        largura, altura = (int(v) for v in args['res'].lower().split('x'))
+        largura, altura = max(160, min(largura, 1920)), max(120, min(altura, 1080))
+    if 'q' in args:
+        qualidade = max(10, min(int(args['q']), 95))
+    if 'fps' in args:
+        max_fps = max(1, min(int(args['fps']), 30))
+    return Tier(largura, altura, qualidade, max_fps)
+
+
+class _Canal:
+    __slots__ = ('frame', 'seq', 'clientes', 'ultima_codificacao', 'codificados', 'pulados')
+
+    def __init__(self):
+        self.frame = None
+        self.seq = 0
+        self.clientes = 0
+        self.ultima_codificacao = float('-inf')
+        self.codificados = 0
+        self.pulados = 0
+
+
+class FrameHub:
+    """Guarda o JPEG mais recente de cada tier e acorda os clientes inscritos nele."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._canais = {}
+        self.fechado = False
+
+    @property
+    def clientes(self):
+        with self._cond:
+            return sum(canal.clientes for canal in self._canais.values())
+
+    def tiers_para_codificar(self, agora):
+        """Tiers com clientes cujo intervalo de fps maximo ja passou; marca-os como codificados em `agora`."""
+        with self._cond:
+            tiers = []
+            for tier, canal in self._canais.items():
+                # Tolerancia de 10% para nao perder o frame por jitter da camera
+                if canal.clientes and agora - canal.ultima_codificacao >= 0.9 / tier.max_fps:
+                    canal.ultima_codificacao = agora
+                    tiers.append(tier)
+            return tiers
+
+    def publicar(self, tier, frame):
+        with self._cond:
+            canal = self._canais.get(tier)
+            if canal is None: return
+            canal.frame = frame
+            canal.seq += 1
+            canal.codificados += 1
+            self._cond.notify_all()
+
+    # Mesma interface de LatestQueue.close, para o hub ser a saida de um estagio
+    def close(self):
+        with self._cond:
+            self.fechado = True
+            self._cond.notify_all()
+
+    def subscribe(self, tier=TIER_PADRAO, timeout=1.0):
+        """Gera os frames publicados no tier; frames perdidos por um cliente lento sao pulados."""
+        with self._cond:
+            canal = self._canais.setdefault(tier, _Canal())
+            canal.clientes += 1
+            visto = canal.seq
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: canal.seq != visto or self.fechado, timeout)
+                    if canal.seq == visto:
+                        if self.fechado: return
+                        continue
+                    if visto: canal.pulados += canal.seq - visto - 1
+                    visto, frame = canal.seq, canal.frame
+                yield frame
+        finally:
+            with self._cond:
+                canal.clientes -= 1
+                if canal.clientes == 0:
+                    del self._canais[tier]
+
+    def status(self):
+        """Clientes, frames codificados e frames pulados por clientes lentos, por tier."""
+        with self._cond:
+            return [{'tier': tier._asdict(), 'clientes': canal.clientes,
+                     'codificados': canal.codificados, 'pulados': canal.pulados}
+                    for tier, canal in self._canais.items()]
@@ -0,0 +1,186 @@
+"""
+Descoberta rapida da camera com cache do dispositivo escolhido.
+
+Em vez de abrir cv2.VideoCapture(0..14) um apos o outro (cada indice ausente
+custa o timeout do backend), a descoberta:
+  1. tenta primeiro o dispositivo salvo no cache, com o formato e a resolucao
+     que funcionaram da ultima vez; se ele entregar um frame, termina ai;
+  2. senao lista /dev/video*, descarta os nos que nao sao de captura
+     (metadados UVC, codecs e ISP do Raspberry Pi) via VIDIOC_QUERYCAP e
+     sonda os candidatos em paralelo, cada um com timeout;
+  3. grava no cache o dispositivo escolhido, seu nome, formato e resolucao.
+"""
+
+import fcntl
+import glob
+import json
+import os
+import re
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import cv2
+
+CACHE_CAMERA = os.path.expanduser("~/.cache/deteccao_quedas/camera.json")
+
+# struct v4l2_capability: driver[16] card[32] bus_info[32] version capabilities device_caps reserved[3]
+_V4L2_CAPABILITY = struct.Struct("16s32s32sIII12x")
+VIDIOC_QUERYCAP = 0x80685600  # _IOR('V', 0, struct v4l2_capability)
+V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_VIDEO_M2M_MPLANE = 0x00004000
+V4L2_CAP_VIDEO_M2M = 0x00008000
+V4L2_CAP_DEVICE_CAPS = 0x80000000
+
+
+def _numero(caminho):
+    encontrado = re.search(r"(\d+)$", caminho)
+    return int(encontrado.group(1)) if encontrado else -1
+
+
+def capacidades(caminho):
+    """(nome do dispositivo, e_captura) via VIDIOC_QUERYCAP, ou None se o no nao responder."""
+    try:
+        fd = os.open(caminho, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        bruto = fcntl.ioctl(fd, VIDIOC_QUERYCAP, bytes(_V4L2_CAPABILITY.size))
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    _, card, _, _, caps, device_caps = _V4L2_CAPABILITY.unpack(bruto)
+    if caps & V4L2_CAP_DEVICE_CAPS: caps = device_caps
+    e_captura = bool(caps & V4L2_CAP_VIDEO_CAPTURE) and not caps & (V4L2_CAP_VIDEO_M2M | V4L2_CAP_VIDEO_M2M_MPLANE)
+    return card.split(b"\0", 1)[0].decode(errors="replace"), e_captura
+
+
+def listar_dispositivos():
+    """Nos /dev/video* de captura, em ordem numerica, como (caminho, nome); sem V4L2, indices 0-14."""
+    caminhos = sorted(glob.glob("/dev/video*"), key=_numero)
+    if not caminhos:
+        return [(indice, None) for indice in range(15)]
+    dispositivos = []
+    for caminho in caminhos:
+        caps = capacidades(caminho)
+        if caps is None:
+            dispositivos.append((caminho, None)) # sem resposta ao ioctl: deixa a sondagem decidir
+        elif caps[1]:
+            dispositivos.append((caminho, caps[0]))
+    return dispositivos
+
+
+def _fourcc_texto(valor):
+    valor = int(valor)
+    texto = "".join(chr((valor >> 8 * i) & 0xFF) for i in range(4))
+    return texto if texto.isprintable() and texto.strip() else None
+
+
+def sondar(fonte, nome=None, formato=None):
+    """Abre a fonte e le um frame; retorna (cap, info) ou None. `formato` = (fourcc, largura, altura)."""
+    cap = cv2.VideoCapture(fonte, cv2.CAP_V4L2) if isinstance(fonte, str) else cv2.VideoCapture(fonte)
+    if not cap.isOpened():
+        cap.release(); return None
+    if formato:
+        fourcc, largura, altura = formato
+        if fourcc: cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, largura)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, altura)
+    ok, frame = cap.read()
+    if not ok or frame is None:
+        cap.release(); return None
+    info = {"dispositivo": fonte, "nome": nome, "fourcc": _fourcc_texto(cap.get(cv2.CAP_PROP_FOURCC)),
+            "largura": frame.shape[1], "altura": frame.shape[0]}
+    return cap, info
+
+
+def ler_cache(caminho=CACHE_CAMERA):
+    """Info da camera gravada na ultima execucao, ou None se o arquivo falta ou nao tem o formato de `sondar`."""
+    try:
+        with open(caminho) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not _cache_valido(cache):
+        print(f"Aviso: cache da camera invalido em {caminho}; a camera sera procurada de novo")
+        return None
+    return cache
+
+
+def _cache_valido(cache):
+    # Cache antigo ou editado a mao vira uma falta de cache, nunca um erro na fase da camera
+    if not isinstance(cache, dict): return False
+    inteiro = lambda v: isinstance(v, int) and not isinstance(v, bool)
+    dispositivo = cache.get("dispositivo")
+    return ((inteiro(dispositivo) or (isinstance(dispositivo, str) and dispositivo != ""))
+            and isinstance(cache.get("nome"), (str, type(None)))
+            and isinstance(cache.get("fourcc"), (str, type(None)))
+            and all(inteiro(cache.get(chave)) and cache[chave] > 0 for chave in ("largura", "altura")))
+
+
+def gravar_cache(info, caminho=CACHE_CAMERA):
+    try:
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, "w") as f:
+            json.dump(info, f)
+    except OSError as e:
+        print(f"Aviso: nao foi possivel gravar o cache da camera: {e}")
+
+
+def _do_cache(cache):
+    """Sonda o dispositivo do cache se ele ainda existe com o mesmo nome."""
+    fonte = cache.get("dispositivo")
+    if isinstance(fonte, str):
+        if not os.path.exists(fonte): return None
+        caps = capacidades(fonte)
+        if caps is not None and (not caps[1] or (cache.get("nome") and caps[0] != cache["nome"])):
+            return None # o no agora e outro dispositivo (ordem de enumeracao mudou no boot)
+    return sondar(fonte, cache.get("nome"), (cache.get("fourcc"), cache["largura"], cache["altura"]))
+
+
+def _varrer(timeout):
+    """Sonda todos os candidatos em paralelo e fica com o de menor numero que entregou frame."""
+    candidatos = listar_dispositivos()
+    if not candidatos: return None
+    executor = ThreadPoolExecutor(max_workers=len(candidatos), thread_name_prefix="sonda-camera")
+    futuros = {executor.submit(sondar, fonte, nome): ordem for ordem, (fonte, nome) in enumerate(candidatos)}
+    limite = time.monotonic() + timeout
+    pendentes = set(futuros)
+    resultados = {}
+    while pendentes and time.monotonic() < limite:
+        prontos, pendentes = wait(pendentes, timeout=limite - time.monotonic(), return_when=FIRST_COMPLETED)
+        for futuro in prontos:
+            if futuro.exception() is None and futuro.result() is not None:
+                resultados[futuros[futuro]] = futuro.result()
+        # Um candidato de numero menor ainda pode responder; sem nenhum pendente antes do melhor, para
+        if resultados and not any(futuros[f] < min(resultados) for f in pendentes): break
+    # Sondas presas no backend nao sao canceladas; o que elas abrirem depois e liberado em segundo plano
+    for futuro in pendentes:
+        futuro.add_done_callback(lambda f: f.exception() is None and f.result() and f.result()[0].release())
+    executor.shutdown(wait=False)
+    if not resultados: return None
+    melhor = min(resultados)
+    for ordem, (cap, _) in resultados.items():
+        if ordem != melhor: cap.release()
+    return resultados[melhor]
+
+
+def abrir_camera(cache=CACHE_CAMERA, timeout=3.0):
+    """Retorna (cap, info) da camera, usando o cache quando possivel, ou (None, None)."""
+    t0 = time.monotonic()
+    anterior = ler_cache(cache)
+    encontrado, origem = None, "cache"
+    if anterior:
+        encontrado = _do_cache(anterior)
+    if encontrado is None:
+        encontrado, origem = _varrer(timeout), "varredura"
+    if encontrado is None:
+        return None, None
+    cap, info = encontrado
+    if info != anterior: gravar_cache(info, cache)
+    print(f"Camera funcional encontrada em {info['dispositivo']}"
+          + (f" ({info['nome']})" if info["nome"] else "")
+          + f" - {info['largura']}x{info['altura']} {info['fourcc'] or ''}")
+    print(f"[METRICA] Descoberta da camera: {(time.monotonic() - t0) * 1000:.0f} ms ({origem})")
+    return cap, info
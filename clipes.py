@@ -0,0 +1,156 @@
+"""
+Clipes de video em volta de cada queda confirmada.
+
+O laco de deteccao entrega ao `ClipRecorder` o frame cru da camera (o mesmo
+array que ninguem mais altera depois da captura), no maximo `fps` vezes por
+segundo e sem copia. Uma thread propria espelha, reduz e codifica esses
+frames em JPEG e os guarda num `FrameRing`, um buffer circular limitado por
+bytes: quando o orcamento estoura, os frames mais antigos saem. A RAM dos
+clipes fica entao limitada a `orcamento_bytes` (mais uma copia dos frames do
+clipe enquanto ele e gravado).
+
+Quando uma queda e confirmada, `disparar(t)` agenda o clipe; outra thread
+espera passarem os `depois` segundos, copia do ring os frames de
+[t - antes, t + depois] e grava o .mp4, na taxa medida entre esses frames,
+sem bloquear a deteccao.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from pipeline import LatestQueue
+
+
+class FrameRing:
+    """Frames JPEG com seus instantes, do mais antigo ao mais novo, limitados a `orcamento_bytes`."""
+
+    def __init__(self, orcamento_bytes):
+        self.orcamento_bytes = orcamento_bytes
+        self.bytes = 0
+        self.descartados = 0
+        self._frames = deque()
+        self._lock = threading.Lock()
+
+    def adicionar(self, t, jpeg):
+        with self._lock:
+            self._frames.append((t, jpeg))
+            self.bytes += len(jpeg)
+            while self.bytes > self.orcamento_bytes and len(self._frames) > 1:
+                _, antigo = self._frames.popleft()
+                self.bytes -= len(antigo)
+                self.descartados += 1
+
+    def entre(self, inicio, fim):
+        """Copia da lista de (t, jpeg) com inicio <= t <= fim."""
+        with self._lock:
+            return [(t, jpeg) for t, jpeg in self._frames if inicio <= t <= fim]
+
+    def duracao(self):
+        """Segundos cobertos pelo ring agora."""
+        with self._lock:
+            return self._frames[-1][0] - self._frames[0][0] if len(self._frames) > 1 else 0.0
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class ClipRecorder:
+    """Mantem os ultimos segundos da camera em JPEG e grava um clipe por queda confirmada."""
+
+    def __init__(self, pasta="clipes", prefixo="queda", orcamento_bytes=8 * 1024 * 1024,
+                 largura=320, altura=240, qualidade=70, fps=10, antes=10.0, depois=5.0):
+        self.pasta = pasta
+        self.prefixo = prefixo
+        self.ring = FrameRing(orcamento_bytes)
+        self.largura, self.altura = largura, altura
+        self.qualidade = qualidade
+        self.fps = fps
+        self.antes, self.depois = antes, depois
+        self.clipes = []               # caminhos gravados, do mais antigo ao mais novo
+        self._entrada = LatestQueue(2) # frames crus esperando a codificacao
+        self._eventos = queue.Queue()
+        self._ultimo = float('-inf')
+        self._parar = threading.Event()
+        self._threads = [threading.Thread(target=self._codificar, name="clipes-jpeg", daemon=True),
+                         threading.Thread(target=self._gravar, name="clipes-gravacao", daemon=True)]
+
+    def start(self):
+        for thread in self._threads: thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._entrada.close()
+        self._eventos.put(None)
+
+    # --- Chamados pelo laco de deteccao ---
+    def adicionar(self, frame, t):
+        """Entrega o frame cru da camera no instante `t` (time.time()); ignora frames acima de `fps`."""
+        if t - self._ultimo < 0.9 / self.fps: return
+        self._ultimo = t
+        self._entrada.put((t, frame))
+
+    def disparar(self, t_evento):
+        """Agenda o clipe de [t_evento - antes, t_evento + depois]; retorna imediatamente."""
+        self._eventos.put(t_evento)
+
+    # --- Threads do gravador ---
+    def _codificar(self):
+        parametros = [cv2.IMWRITE_JPEG_QUALITY, self.qualidade]
+        while True:
+            item = self._entrada.get(timeout=0.5)
+            if item is None:
+                if self._entrada.fechada: return
+                continue
+            t, frame = item
+            # Mesmo espelhamento do que e mostrado e analisado pelo app
+            reduzido = cv2.flip(cv2.resize(frame, (self.largura, self.altura), interpolation=cv2.INTER_AREA), 1)
+            ok, jpeg = cv2.imencode('.jpg', reduzido, parametros)
+            if ok: self.ring.adicionar(t, jpeg.tobytes())
+
+    def _gravar(self):
+        while True:
+            t_evento = self._eventos.get()
+            if t_evento is None: return
+            # Espera os frames de depois do evento chegarem ao ring
+            restante = t_evento + self.depois - time.time()
+            if restante > 0 and self._parar.wait(restante): return
+            try:
+                self._gravar_clipe(t_evento)
+            except Exception as e:
+                print(f"ERRO ao gravar o clipe da queda: {e}")
+
+    def _gravar_clipe(self, t_evento):
+        t0 = time.monotonic()
+        frames = self.ring.entre(t_evento - self.antes, t_evento + self.depois)
+        if not frames:
+            print("Aviso: nenhum frame no buffer para o clipe da queda.")
+            return None
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = os.path.join(self.pasta, f"{self.prefixo}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(t_evento))}.mp4")
+        # `fps` so limita a taxa de entrada: com camera ou pipeline mais lentos o clipe e gravado na
+        # taxa medida entre os frames, para tocar na velocidade real
+        duracao = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / duracao if len(frames) > 1 and duracao > 0 else self.fps
+        escritor = cv2.VideoWriter(caminho, cv2.VideoWriter_fourcc(*'mp4v'), fps, (self.largura, self.altura))
+        for _, jpeg in frames:
+            escritor.write(cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR))
+        escritor.release()
+        self.clipes.append(caminho)
+
+        # <<< COLETA DE METRICA >>>
+        antes = t_evento - frames[0][0]
+        depois = frames[-1][0] - t_evento
+        print(f"[METRICA] Clipe da queda gravado: {caminho} | {len(frames)} frames a {fps:.1f} fps, {antes:.1f}s antes e {depois:.1f}s depois"
+              f" | gravacao {time.monotonic() - t0:.2f}s")
+        return caminho
+
+    def relatorio(self):
+        return (f"[METRICA] Clipes: buffer {self.ring.bytes / 1024:.0f}/{self.ring.orcamento_bytes / 1024:.0f} KB"
+                f" | {len(self.ring)} frames ({self.ring.duracao():.1f}s) | descartados na codificacao: {self._entrada.descartados}"
+                f" | clipes gravados: {len(self.clipes)}")
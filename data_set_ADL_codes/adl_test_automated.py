@@ -1,21 +1,31 @@
 import cv2
 import mediapipe as mp
 import time
-import numpy as np
 import os
 import csv
 from datetime import datetime
 import glob
+import sys
+
+# Diretório raiz do projeto no path para importar o detector compartilhado com o app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fall_detector import PostureFallDetector
+from landmarks import LandmarkAdapter
+from data_set_codes.landmark_cache import LandmarkCache, percorrer, segurar_ultima_pose
+from data_set_codes.video_reader import VideoReader
+from data_set_codes.avaliacao_paralela import analisar_videos
 
 class ADLFallDetectionTester:
     """
     Testador especializado para vídeos ADL (Activities of Daily Living)
     Estes vídeos NÃO devem ser detectados como quedas - são atividades normais
     """
-    def __init__(self):
+    def __init__(self, use_cache=True):
         self.mp_pose = mp.solutions.pose
         self.pose = self.mp_pose.Pose(min_detection_confidence=0.2, min_tracking_confidence=0.2)
         self.mp_drawing = mp.solutions.drawing_utils
+        # Landmarks por vídeo em ~/.cache/deteccao_quedas/landmarks (o mesmo cache dos vídeos de queda)
+        self.cache = LandmarkCache(min_detection_confidence=0.2, min_tracking_confidence=0.2, pose=self.pose) if use_cache else None
         
         # Parâmetros de detecção (mesmos do sistema original)
         self.Y_VELOCITY_THRESHOLD = 8
@@ -25,14 +35,20 @@ class ADLFallDetectionTester:
         self.LOWER_BODY_THRESHOLD = 0.75
         self.HEAD_LOW_THRESHOLD = 0.7
         
-        # Timeout para análise do último frame
+        # Timeout para análise do último frame (segundos de vídeo)
         self.MAX_LAST_FRAME_ANALYSIS_TIME = 10.0
         
-    def calculate_angle(self, a, b):
-        a = np.array(a)
-        b = np.array(b)
-        cosang = np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
-        return np.degrees(np.arccos(np.clip(cosang, -1.0, 1.0)))
+    def create_detector(self):
+        """Detector compartilhado (fall_detector.py) com os parâmetros deste testador."""
+        return PostureFallDetector(
+            y_velocity_threshold=self.Y_VELOCITY_THRESHOLD,
+            fall_confirm_time=self.FALL_CONFIRM_TIME,
+            trunk_horizontal_threshold=self.TRUNK_HORIZONTAL_THRESHOLD,
+            leg_horizontal_threshold=self.LEG_HORIZONTAL_THRESHOLD,
+            lower_body_threshold=self.LOWER_BODY_THRESHOLD,
+            head_low_threshold=self.HEAD_LOW_THRESHOLD,
+            altura=360,
+        )
     
     def analyze_adl_video(self, video_path, show_video=False):
         """
@@ -41,9 +57,12 @@ class ADLFallDetectionTester:
         """
         video_name = os.path.basename(video_path)
         print(f"Analisando ADL: {video_name}")
+        if self.cache and not show_video:
+            return self.analyze_cached_adl_video(video_path)
         
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
+        # Decodificação, resize e conversão para RGB numa thread, sobrepostas ao MediaPipe
+        leitor = VideoReader(video_path, (640, 360), rgb=True)
+        if not leitor.aberto:
             return {
                 'video': video_name,
                 'video_type': 'ADL',
@@ -56,121 +75,73 @@ class ADLFallDetectionTester:
             }
         
         # Informações do vídeo
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = leitor.total_frames
+        fps = leitor.fps
         duration = total_frames / fps if fps > 0 else 0
         
         # Variáveis de controle
-        previous_y = None
+        detector = self.create_detector()
+        adaptador = LandmarkAdapter()
+        self.pose.reset()  # rastreamento do MediaPipe não passa de um vídeo para o outro
         fall_confirmed = False
-        time_fallen_start = None
-        last_frame = None
+        last_pose = False
         video_ended = False
         
         analysis_start_time = time.time()
-        last_frame_analysis_start = None
         frame_count = 0
+        media_time = 0.0
         fall_detection_frame = None
         
-        while cap.isOpened():
-            ret, frame = cap.read()
-            
-            if not ret:
-                if last_frame is not None:
-                    frame = last_frame.copy()
-                    if not video_ended:
-                        print(f"  Vídeo ADL terminou - analisando último frame...")
-                        video_ended = True
-                        last_frame_analysis_start = time.time()
-                    
-                    if last_frame_analysis_start and (time.time() - last_frame_analysis_start) > self.MAX_LAST_FRAME_ANALYSIS_TIME:
-                        print(f"  Timeout na análise do último frame ADL")
-                        break
-                else:
-                    break
-            else:
-                last_frame = frame.copy()
-                frame_count += 1
+        for frame_count, media_time, rgb_image in leitor:
+            last_pose = False
             
-            # Reduzir resolução para processamento mais rápido
-            frame = cv2.resize(frame, (640, 360))
-            h, w, _ = frame.shape
-            
-            # Processar com MediaPipe
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Processar com MediaPipe (frame já reduzido para 640x360)
             results = self.pose.process(rgb_image)
             
             if results.pose_landmarks:
-                lm = results.pose_landmarks.landmark
-                
-                # Pontos chave
-                hip = lm[self.mp_pose.PoseLandmark.RIGHT_HIP]
-                shoulder = lm[self.mp_pose.PoseLandmark.RIGHT_SHOULDER]
-                knee = lm[self.mp_pose.PoseLandmark.RIGHT_KNEE]
-                ankle = lm[self.mp_pose.PoseLandmark.RIGHT_ANKLE]
-                nose = lm[self.mp_pose.PoseLandmark.NOSE]
-                
-                hip_y = hip.y * h
-                shoulder_y = shoulder.y * h
-                nose_y = nose.y * h
-                
-                # Calcular velocidade
-                if previous_y is not None:
-                    y_velocity = abs(hip_y - previous_y)
-                else:
-                    y_velocity = 0
-                previous_y = hip_y
-                
-                # Calcular ângulos
-                trunk_vector = [(shoulder.x - hip.x), (shoulder.y - hip.y)]
-                vertical_vector = [0, -1]
-                trunk_angle = self.calculate_angle(trunk_vector, vertical_vector)
-                
-                leg_vector = [(ankle.x - knee.x), (ankle.y - knee.y)]
-                leg_angle = self.calculate_angle(leg_vector, vertical_vector)
-                
-                # Condições de queda (mesma lógica do sistema original)
-                is_fast_drop = y_velocity > self.Y_VELOCITY_THRESHOLD
-                is_low_posture = hip.y > self.LOWER_BODY_THRESHOLD
-                is_trunk_horizontal = trunk_angle > self.TRUNK_HORIZONTAL_THRESHOLD
-                is_leg_horizontal = leg_angle > self.LEG_HORIZONTAL_THRESHOLD
-                is_head_low = nose_y > self.HEAD_LOW_THRESHOLD * h
-                
-                # Lógica de detecção
-                fall_detected = (is_fast_drop and is_low_posture) or (is_low_posture and is_trunk_horizontal and is_head_low)
-                
-                if fall_detected:
-                    if time_fallen_start is None:
-                        time_fallen_start = time.time()
-                        print(f"    ⚠️ POSSÍVEL FALSO POSITIVO no frame {frame_count}! Vel: {y_velocity:.1f}, Hip Y: {hip.y:.2f}")
-                else:
-                    time_fallen_start = None
-                    fall_confirmed = False
+                landmarks = adaptador.preencher(results.pose_landmarks)
+                last_pose = True
+                # Relógio do vídeo: o resultado não depende da velocidade da máquina
+                fall_confirmed = detector.step(landmarks, media_time)
+
+                if detector.inicio_neste_frame:
+                    print(f"    ⚠️ POSSÍVEL FALSO POSITIVO no frame {frame_count}! Vel: {detector.y_velocity:.1f}, Hip Y: {detector.hip_y:.2f}")
                 
                 # Confirmar "queda" (que seria um falso positivo)
-                if time_fallen_start is not None:
-                    if time.time() - time_fallen_start > self.FALL_CONFIRM_TIME:
-                        fall_confirmed = True
-                        fall_detection_frame = frame_count
-                        print(f"    ❌ FALSO POSITIVO CONFIRMADO no frame {frame_count}!")
-                        break
+                if fall_confirmed:
+                    fall_detection_frame = frame_count
+                    print(f"    ❌ FALSO POSITIVO CONFIRMADO no frame {frame_count}!")
+                    break
                 
                 # Mostrar vídeo se solicitado
                 if show_video:
-                    display_frame = frame.copy()
+                    display_frame = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR)
                     self.mp_drawing.draw_landmarks(display_frame, results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
                     
                     # Adicionar informações
-                    status = "FALSO POSITIVO!" if fall_confirmed else "Possível FP..." if time_fallen_start else "ADL Normal"
-                    color = (0,0,255) if fall_confirmed else (0,255,255) if time_fallen_start else (0,255,0)
+                    status = "FALSO POSITIVO!" if fall_confirmed else "Possível FP..." if detector.time_fallen_start is not None else "ADL Normal"
+                    color = (0,0,255) if fall_confirmed else (0,255,255) if detector.time_fallen_start is not None else (0,255,0)
                     cv2.putText(display_frame, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 2)
                     cv2.putText(display_frame, f"ADL Frame: {frame_count}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255,255,255), 2)
                     
                     cv2.imshow("ADL Fall Detection Test", display_frame)
                     if cv2.waitKey(1) & 0xFF == ord('q'):
                         break
+        else:
+            video_ended = True
+        
+        # Fim do vídeo: a última pose fica parada por MAX_LAST_FRAME_ANALYSIS_TIME segundos de vídeo,
+        # sem rodar o MediaPipe de novo sobre o mesmo frame
+        if video_ended and not fall_confirmed:
+            print(f"  Vídeo ADL terminou - mantendo a última pose...")
+            if last_pose and segurar_ultima_pose(detector, landmarks, media_time, fps, self.MAX_LAST_FRAME_ANALYSIS_TIME):
+                fall_confirmed = True
+                fall_detection_frame = frame_count
+                print(f"    ❌ FALSO POSITIVO CONFIRMADO no frame {frame_count}!")
+            else:
+                print(f"  Timeout na análise do último frame ADL")
         
-        cap.release()
+        leitor.fechar()
         if show_video:
             cv2.destroyAllWindows()
         
@@ -192,10 +163,53 @@ class ADLFallDetectionTester:
             'analysis_duration': analysis_duration,
             'fps': fps
         }
+
+    def analyze_cached_adl_video(self, video_path):
+        """
+        Mesma análise de analyze_adl_video sobre os landmarks do cache (extraídos na primeira vez)
+        """
+        video_name = os.path.basename(video_path)
+        analysis_start_time = time.time()
+        try:
+            video = self.cache.obter(video_path)
+        except IOError:
+            return {
+                'video': video_name,
+                'video_type': 'ADL',
+                'fall_detected': False,
+                'false_positive': False,
+                'error': 'Não foi possível abrir o vídeo',
+                'detection_time': None,
+                'total_frames': 0,
+                'analysis_duration': 0
+            }
+        fps = video.fps
+        if video.do_cache:
+            print(f"  Landmarks do cache ({len(video)} frames)")
+
+        detector = self.create_detector()
+        def ao_iniciar(frame):
+            print(f"    ⚠️ POSSÍVEL FALSO POSITIVO no frame {frame}! Vel: {detector.y_velocity:.1f}, Hip Y: {detector.hip_y:.2f}")
+        fall_confirmed, fall_detection_frame = percorrer(video, detector, self.MAX_LAST_FRAME_ANALYSIS_TIME, ao_iniciar)
+        if fall_confirmed:
+            print(f"    ❌ FALSO POSITIVO CONFIRMADO no frame {fall_detection_frame}!")
+
+        return {
+            'video': video_name,
+            'video_type': 'ADL',
+            'fall_detected': fall_confirmed,  # True = Falso Positivo
+            'false_positive': fall_confirmed,
+            'detection_time': fall_detection_frame / fps if fall_detection_frame and fps > 0 else None,
+            'detection_frame': fall_detection_frame,
+            'total_frames': video.total_frames,
+            'video_duration': video.total_frames / fps if fps > 0 else 0,
+            'analysis_duration': time.time() - analysis_start_time,
+            'fps': fps
+        }
     
-    def test_all_adl_videos(self, video_folder="data_set_videos_ADL", show_videos=False):
+    def test_all_adl_videos(self, video_folder="data_set_videos_ADL", show_videos=False, workers=1):
         """
-        Testa todos os vídeos ADL na pasta especificada
+        Testa todos os vídeos ADL na pasta especificada (em `workers` processos)
         """
         print("=== TESTE DE FALSOS POSITIVOS - VÍDEOS ADL ===")
         print(f"Pasta de vídeos ADL: {video_folder}")
@@ -216,11 +230,8 @@ class ADLFallDetectionTester:
         results = []
         false_positives = 0
         
-        for i, video_path in enumerate(video_files, 1):
-            print(f"\n[{i}/{len(video_files)}] ", end="")
-            
-            try:
-                result = self.analyze_adl_video(video_path, show_video=show_videos)
+        for video_path, result, error in analisar_videos(self, 'analyze_adl_video', video_files, workers, show_videos):
+            if error is None:
                 results.append(result)
                 
                 if result['false_positive']:
@@ -229,14 +240,14 @@ class ADLFallDetectionTester:
                 else:
                     print(f"  ✅ ADL Normal - Nenhuma queda detectada")
                     
-            except Exception as e:
-                print(f"  ❌ ERRO: {str(e)}")
+            else:
+                print(f"  ❌ ERRO: {error}")
                 results.append({
                     'video': os.path.basename(video_path),
                     'video_type': 'ADL',
                     'fall_detected': False,
                     'false_positive': False,
-                    'error': str(e),
+                    'error': error,
                     'detection_time': None,
                     'detection_frame': None,
                     'total_frames': 0,
@@ -287,9 +298,10 @@ def main():
     # Configurações
     SHOW_VIDEOS = False  # Mudar para True se quiser ver os vídeos durante o processamento
     ADL_VIDEO_FOLDER = "data_set_videos_ADL"
+    WORKERS = os.cpu_count() or 1  # Processos em paralelo (1 = sequencial)
     
     # Executar teste em todos os vídeos ADL
-    results = tester.test_all_adl_videos(ADL_VIDEO_FOLDER, show_videos=SHOW_VIDEOS)
+    results = tester.test_all_adl_videos(ADL_VIDEO_FOLDER, show_videos=SHOW_VIDEOS, workers=WORKERS)
     
     # Salvar resultados em CSV
     if results:
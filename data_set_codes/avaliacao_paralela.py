@@ -0,0 +1,90 @@
+"""
+Avaliação dos vídeos dos datasets em vários processos.
+
+Cada processo do pool cria um testador próprio (e portanto um único
+MediaPipe Pose, reiniciado a cada vídeo) com os mesmos parâmetros do
+testador original e analisa um vídeo por vez. A saída de cada vídeo é
+capturada no processo e impressa inteira, na ordem da lista de vídeos,
+assim como os resultados: o CSV sai igual ao da execução sequencial,
+com qualquer número de processos.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+_testador = None
+
+
+def _parametros(testador):
+    """Atributos em maiúsculas do testador (limiares e timeouts), inclusive os alterados depois do __init__."""
+    return {nome: valor for nome, valor in vars(testador).items() if nome.isupper()}
+
+
+def _iniciar_processo(classe, use_cache, parametros):
+    global _testador
+    # Um processo por núcleo: threads extras do OpenCV só disputariam CPU
+    cv2.setNumThreads(1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _testador = classe(use_cache=use_cache)
+    for nome, valor in parametros.items():
+        setattr(_testador, nome, valor)
+
+
+def _analisar(metodo, video_path):
+    saida = io.StringIO()
+    resultado = erro = None
+    with contextlib.redirect_stdout(saida):
+        try:
+            resultado = getattr(_testador, metodo)(video_path)
+        except Exception as e:
+            erro = str(e)
+    return resultado, erro, saida.getvalue()
+
+
+def analisar_videos(testador, metodo, video_files, workers=1, show_video=False):
+    """
+    Gera (video_path, resultado, erro) para cada vídeo, na ordem de `video_files`.
+
+    `metodo` é o nome do método de análise do testador (analyze_video ou
+    analyze_adl_video). Com workers > 1 os vídeos são analisados num pool de
+    processos; show_video força a execução sequencial (as janelas do OpenCV
+    ficam no processo principal). Ao final imprime a vazão da avaliação.
+    """
+    total = len(video_files)
+    inicio = time.time()
+    frames = 0
+    workers = 1 if show_video else max(1, min(workers, total))
+
+    if workers == 1:
+        analisar = getattr(testador, metodo)
+        for i, video_path in enumerate(video_files, 1):
+            print(f"\n[{i}/{total}] ", end="")
+            try:
+                resultado = analisar(video_path, show_video=show_video)
+            except Exception as e:
+                yield video_path, None, str(e)
+                continue
+            frames += resultado.get('total_frames') or 0
+            yield video_path, resultado, None
+    else:
+        print(f"Analisando em {workers} processos")
+        # spawn: o processo principal já tem um grafo do MediaPipe rodando, e fork com threads ativas pode travar
+        contexto = multiprocessing.get_context("spawn")
+        iniciar = (type(testador), testador.cache is not None, _parametros(testador))
+        with ProcessPoolExecutor(workers, mp_context=contexto, initializer=_iniciar_processo, initargs=iniciar) as pool:
+            futuros = [pool.submit(_analisar, metodo, video_path) for video_path in video_files]
+            for i, (video_path, futuro) in enumerate(zip(video_files, futuros), 1):
+                resultado, erro, saida = futuro.result()
+                print(f"\n[{i}/{total}] {saida}", end="")
+                if resultado: frames += resultado.get('total_frames') or 0
+                yield video_path, resultado, erro
+
+    # <<< COLETA DE METRICA >>>
+    duracao = time.time() - inicio
+    print(f"\n[METRICA] Avaliação: {total} vídeos, {frames} frames em {duracao:.1f}s com {workers} processo(s)"
+          f" | {total / duracao:.2f} vídeos/s | {frames / duracao:.0f} frames/s")
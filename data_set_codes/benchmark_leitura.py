@@ -0,0 +1,115 @@
+"""
+Benchmark da leitura dos vídeos dos testadores: laço anterior x VideoReader.
+
+O laço anterior lê cada frame na resolução original, copia para `last_frame`,
+reduz para 640x360 e converte para RGB, tudo no mesmo laço do MediaPipe. O
+VideoReader faz o mesmo em buffers reutilizados, numa thread quando há mais
+de uma CPU, e com `passo` pula frames só com grab(). Os passos são medidos em
+frames do vídeo percorridos por segundo.
+
+Mede frames por segundo só da leitura (sem inferência) e, com --pose, do
+laço completo com o MediaPipe Pose, onde a decodificação na thread se
+sobrepõe à inferência.
+
+Uso:
+    python data_set_codes/benchmark_leitura.py
+    python data_set_codes/benchmark_leitura.py data_set_codes/data_set_videos/fall-01-cam0.mp4 --repeticoes 5 --pose
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+# Diretório raiz do projeto no path para importar os módulos compartilhados com o app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_set_codes.video_reader import VideoReader
+
+VIDEO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_set_videos", "fall-01-cam0.mp4")
+TAMANHO = (640, 360)
+
+
+def laco_anterior(caminho, processar):
+    """Leitura como os testadores faziam antes do VideoReader; retorna o número de frames do vídeo percorridos."""
+    cap = cv2.VideoCapture(caminho)
+    last_frame = None
+    frames = 0
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret: break
+        last_frame = frame.copy()
+        frame = cv2.resize(frame, TAMANHO)
+        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        processar(rgb_image)
+        frames += 1
+    cap.release()
+    return frames
+
+
+def laco_video_reader(caminho, processar, passo=1, antecipar=None):
+    with VideoReader(caminho, TAMANHO, passo=passo, rgb=True, antecipar=antecipar) as leitor:
+        for _, _, rgb_image in leitor:
+            processar(rgb_image)
+        return leitor.frames + leitor.pulados
+
+
+def medir(nome, laco, repeticoes, base=None):
+    """Melhor de `repeticoes` execuções; imprime frames por segundo e o ganho sobre `base`."""
+    melhor = float('inf')
+    frames = 0
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        frames = laco()
+        melhor = min(melhor, time.perf_counter() - t0)
+    fps = frames / melhor
+    ganho = f" | {fps / base:.2f}x" if base else ""
+    print(f"  {nome:<36} {frames:5d} frames em {melhor * 1000:8.1f} ms  {fps:8.0f} frames/s{ganho}")
+    return fps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da leitura de vídeo dos testadores")
+    parser.add_argument("video", nargs="?", default=VIDEO_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--passos", default="2,3", help="passos de frame (grab sem retrieve) medidos no VideoReader")
+    parser.add_argument("--pose", action="store_true", help="mede também o laço completo com o MediaPipe Pose")
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    if not cap.isOpened():
+        print(f"Não foi possível abrir o vídeo: {args.video}")
+        return
+    largura, altura = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    print(f"=== {os.path.basename(args.video)} ({largura}x{altura} -> {TAMANHO[0]}x{TAMANHO[1]}) | "
+          f"{os.cpu_count()} CPU(s) | melhor de {args.repeticoes} ===")
+
+    nada = lambda frame: None
+    print("Só leitura:")
+    base = medir("laço anterior", lambda: laco_anterior(args.video, nada), args.repeticoes)
+    medir("VideoReader sem thread", lambda: laco_video_reader(args.video, nada, antecipar=False), args.repeticoes, base)
+    medir("VideoReader com thread", lambda: laco_video_reader(args.video, nada, antecipar=True), args.repeticoes, base)
+    for passo in (int(p) for p in args.passos.split(',') if p):
+        medir(f"VideoReader passo {passo}", lambda: laco_video_reader(args.video, nada, passo), args.repeticoes, base)
+
+    if args.pose:
+        import mediapipe as mp
+        pose = mp.solutions.pose.Pose(min_detection_confidence=0.2, min_tracking_confidence=0.2)
+        def inferir(rgb_image):
+            pose.process(rgb_image)
+        def reiniciar(laco):
+            pose.reset()
+            return laco()
+        print("Com MediaPipe Pose:")
+        base = medir("laço anterior + pose", lambda: reiniciar(lambda: laco_anterior(args.video, inferir)), args.repeticoes)
+        medir("VideoReader sem thread + pose", lambda: reiniciar(lambda: laco_video_reader(args.video, inferir, antecipar=False)),
+              args.repeticoes, base)
+        medir("VideoReader com thread + pose", lambda: reiniciar(lambda: laco_video_reader(args.video, inferir, antecipar=True)),
+              args.repeticoes, base)
+        pose.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Cache persistente dos landmarks por vídeo para os testadores dos datasets.
+
+A primeira análise de um vídeo decodifica todos os frames, roda o MediaPipe
+Pose e grava os landmarks de cada frame em .npy. As análises seguintes (por
+exemplo, com outros limiares de detecção) leem esses arrays mapeados em
+memória e não decodificam nem inferem nada.
+
+A chave do cache é o hash SHA-256 do conteúdo do vídeo junto com tudo o que
+muda o resultado da pose: min_detection_confidence, min_tracking_confidence,
+model_complexity, tamanho para o qual o frame é reduzido e versão do
+MediaPipe. Renomear ou mover o vídeo não invalida o cache; trocar o conteúdo
+ou qualquer parâmetro da pose, sim.
+
+Cada entrada é uma pasta com:
+  landmarks.npy  (N, 33, 4) float32, NaN nos frames sem pessoa
+  tempos.npy     (N,) float64, instante de cada frame no vídeo (frame/fps),
+                 o relógio que os testadores passam ao detector
+  info.json      fps, total de frames, parâmetros e tempo de extração
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# Diretório raiz do projeto no path para importar os módulos compartilhados com o app
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from landmarks import LandmarkAdapter, NUM_LANDMARKS
+from data_set_codes.video_reader import VideoReader
+
+PASTA_CACHE = os.environ.get("LANDMARK_CACHE_DIR", os.path.expanduser("~/.cache/deteccao_quedas/landmarks"))
+VERSAO_CACHE = 2  # 2: tempos no relógio do vídeo (antes, relógio de parede da extração)
+
+
+class VideoLandmarks:
+    """Landmarks de todos os frames de um vídeo, vindos do cache ou recém-extraídos."""
+
+    def __init__(self, landmarks, tempos, info, do_cache):
+        self.landmarks = landmarks   # (N, 33, 4) float32, NaN sem pessoa
+        self.tempos = tempos         # (N,) segundos
+        self.info = info
+        self.do_cache = do_cache
+
+    @property
+    def fps(self):
+        return self.info['fps']
+
+    @property
+    def total_frames(self):
+        return self.info['total_frames']
+
+    @property
+    def com_pessoa(self):
+        """Máscara (N,) dos frames em que o Pose encontrou alguém."""
+        return ~np.isnan(self.landmarks[:, 0, 0])
+
+    def __len__(self):
+        return len(self.landmarks)
+
+
+class LandmarkCache:
+    """Extrai e guarda os landmarks de vídeos com uma configuração fixa do MediaPipe Pose."""
+
+    def __init__(self, pasta=PASTA_CACHE, min_detection_confidence=0.2, min_tracking_confidence=0.2,
+                 model_complexity=1, tamanho=(640, 360), pose=None):
+        self.pasta = pasta
+        self.pose = pose  # Pose já criado com os mesmos parâmetros; senão é criado na primeira extração
+        self.parametros = {
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence,
+            'model_complexity': model_complexity,
+            'tamanho': list(tamanho),
+            'mediapipe': _versao_mediapipe(),
+            'versao_cache': VERSAO_CACHE,
+        }
+        self._hashes = {}
+
+    # --- Chave ---
+    def hash_video(self, video_path):
+        """SHA-256 do conteúdo; memorizado por (caminho, tamanho, mtime) durante a execução."""
+        estado = os.stat(video_path)
+        marca = (os.path.abspath(video_path), estado.st_size, estado.st_mtime_ns)
+        if marca not in self._hashes:
+            sha = hashlib.sha256()
+            with open(video_path, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(bloco)
+            self._hashes[marca] = sha.hexdigest()
+        return self._hashes[marca]
+
+    def chave(self, video_path):
+        texto = self.hash_video(video_path) + json.dumps(self.parametros, sort_keys=True)
+        return hashlib.sha256(texto.encode()).hexdigest()[:24]
+
+    # --- Leitura e extração ---
+    def carregar(self, video_path):
+        """VideoLandmarks do cache (mapeados em memória) ou None se o vídeo ainda não foi extraído."""
+        pasta = os.path.join(self.pasta, self.chave(video_path))
+        try:
+            with open(os.path.join(pasta, 'info.json'), encoding='utf-8') as f:
+                info = json.load(f)
+            landmarks = np.load(os.path.join(pasta, 'landmarks.npy'), mmap_mode='r')
+            tempos = np.load(os.path.join(pasta, 'tempos.npy'), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        return VideoLandmarks(landmarks, tempos, info, do_cache=True)
+
+    def obter(self, video_path):
+        """Landmarks do vídeo: do cache se possível, senão extrai e grava."""
+        return self.carregar(video_path) or self.extrair(video_path)
+
+    def extrair(self, video_path):
+        """Decodifica o vídeo inteiro, roda o Pose em todos os frames e grava a entrada no cache."""
+        import mediapipe as mp
+
+        leitor = VideoReader(video_path, self.parametros['tamanho'], rgb=True)
+        if not leitor.aberto:
+            raise IOError(f"Não foi possível abrir o vídeo: {video_path}")
+        fps, total_frames = leitor.fps, leitor.total_frames
+        if self.pose is None:
+            self.pose = mp.solutions.pose.Pose(min_detection_confidence=self.parametros['min_detection_confidence'],
+                                               min_tracking_confidence=self.parametros['min_tracking_confidence'],
+                                               model_complexity=self.parametros['model_complexity'])
+        # Grafo reiniciado por vídeo: o rastreamento não carrega estado de um vídeo para outro,
+        # então os landmarks dependem só do conteúdo e dos parâmetros (a chave do cache)
+        pose = self.pose
+        pose.reset()
+        adaptador = LandmarkAdapter()
+        landmarks, tempos = [], []
+        inicio = time.time()
+        with leitor:
+            for _, tempo, rgb in leitor:
+                tempos.append(tempo)
+                results = pose.process(rgb)
+                if results.pose_landmarks:
+                    landmarks.append(adaptador.preencher(results.pose_landmarks).copy())
+                else:
+                    landmarks.append(np.full((NUM_LANDMARKS, 4), np.nan, np.float32))
+        duracao = time.time() - inicio
+
+        info = {'video': os.path.basename(video_path), 'fps': fps, 'total_frames': total_frames,
+                'frames_lidos': len(landmarks), 'duracao_extracao': duracao, **self.parametros}
+        landmarks = np.array(landmarks, np.float32).reshape(-1, NUM_LANDMARKS, 4)
+        tempos = np.array(tempos, np.float64)
+        self._gravar(self.chave(video_path), landmarks, tempos, info)
+        return VideoLandmarks(landmarks, tempos, info, do_cache=False)
+
+    def _gravar(self, chave, landmarks, tempos, info):
+        # Grava numa pasta temporária e renomeia: leitores nunca veem uma entrada pela metade
+        destino = os.path.join(self.pasta, chave)
+        temporaria = f"{destino}.tmp-{os.getpid()}"
+        os.makedirs(temporaria, exist_ok=True)
+        np.save(os.path.join(temporaria, 'landmarks.npy'), landmarks)
+        np.save(os.path.join(temporaria, 'tempos.npy'), tempos)
+        with open(os.path.join(temporaria, 'info.json'), 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=2)
+        try:
+            os.rename(temporaria, destino)
+        except OSError:
+            # Outro processo gravou a mesma entrada primeiro
+            for nome in os.listdir(temporaria):
+                os.remove(os.path.join(temporaria, nome))
+            os.rmdir(temporaria)
+
+
+def percorrer(video, detector, tempo_cauda, ao_iniciar=None):
+    """
+    Roda o PostureFallDetector sobre os landmarks de um vídeo, como o laço dos testadores.
+
+    Só os frames com pessoa passam pelo detector, com o relógio do vídeo.
+    Quando o vídeo acaba sem queda confirmada, a última pose é mantida por
+    `tempo_cauda` segundos de vídeo (segurar_ultima_pose), como nos
+    testadores. `ao_iniciar(frame)` é chamado quando a condição de queda
+    começa.
+
+    Retorna (queda confirmada, número do frame da confirmação ou None).
+    """
+    landmarks, tempos = video.landmarks, video.tempos.tolist()
+    com_pessoa = video.com_pessoa.tolist()
+    for i, t in enumerate(tempos):
+        if not com_pessoa[i]: continue
+        if detector.step(landmarks[i], t):
+            return True, i + 1
+        if ao_iniciar and detector.inicio_neste_frame: ao_iniciar(i + 1)
+
+    if tempos and com_pessoa[-1] and segurar_ultima_pose(detector, landmarks[-1], tempos[-1], video.fps, tempo_cauda):
+        return True, len(tempos)
+    return False, None
+
+
+def segurar_ultima_pose(detector, landmarks, t_fim, fps, duracao):
+    """
+    Fim do vídeo: a pessoa continua na última pose por `duracao` segundos de vídeo.
+
+    Repete `landmarks` (a pose do último frame, no instante `t_fim`) no
+    detector a cada intervalo de frame, sem decodificar nem rodar o MediaPipe
+    de novo. Retorna True se a queda for confirmada durante a espera.
+    """
+    intervalo = 1.0 / fps if fps > 0 else 1.0 / 30
+    t = t_fim + intervalo
+    while t - t_fim <= duracao:
+        if detector.step(landmarks, t):
+            return True
+        t += intervalo
+    return False
+
+
+def _versao_mediapipe():
+    try:
+        import mediapipe as mp
+        return mp.__version__
+    except ImportError:
+        return None
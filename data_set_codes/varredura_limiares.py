@@ -0,0 +1,303 @@
+"""
+Varredura de limiares da regra de queda dos testadores, sobre os landmarks em cache.
+
+Avalia de uma vez uma grade inteira de combinações de limiares do
+PostureFallDetector (velocidade do quadril, quadril baixo, tronco horizontal,
+cabeça baixa e tempo de confirmação) em todos os vídeos de queda e ADL, sem
+rodar o detector frame a frame: as medidas de cada frame são calculadas uma
+vez a partir do LandmarkCache e as condições de todas as combinações saem de
+operações NumPy com broadcasting sobre (combinações, frames).
+
+Para cada combinação: sensibilidade (quedas detectadas), especificidade (ADL
+sem alarme), F1 e tempo médio de detecção nas quedas (frame da confirmação /
+fps, como no CSV dos testadores). Também marca a fronteira de Pareto
+(sensibilidade e especificidade maiores, tempo de detecção menor).
+
+A decisão é a mesma dos testadores com cache: relógio do vídeo e a última
+pose mantida por MAX_LAST_FRAME_ANALYSIS_TIME no fim. LEG_HORIZONTAL_THRESHOLD
+não entra na regra e por isso não faz parte da grade.
+
+Uso:
+    python data_set_codes/varredura_limiares.py
+    python data_set_codes/varredura_limiares.py --y-velocity 3:12:0.5 --confirmacao 0.5,1,2,4.4 --verificar 20
+Faixas: "inicio:fim:passo" (fim incluído) ou lista "a,b,c". Vídeos que ainda
+não estão no cache são extraídos antes (os testadores preenchem o cache em
+paralelo).
+"""
+
+import argparse
+import csv
+import glob
+import itertools
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+# Diretório raiz do projeto no path para importar os módulos compartilhados com o app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fall_detector import PostureFallDetector
+from landmarks import NOSE, RIGHT_HIP, RIGHT_SHOULDER
+from data_set_codes.landmark_cache import LandmarkCache, percorrer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_QUEDAS = os.path.join(RAIZ, "data_set_codes", "data_set_videos")
+PASTA_ADL = os.path.join(RAIZ, "data_set_ADL_codes", "data_set_videos_ADL")
+
+# Ordem dos limiares nas linhas da grade e nas colunas do CSV
+LIMIARES = ('y_velocity', 'confirmacao', 'lower_body', 'trunk', 'head_low')
+
+# Limiares atuais de cada testador, avaliados como referência
+REFERENCIAS = {
+    'FallDetectionTester': (5, 0.5, 0.55, 35, 0.7),
+    'ADLFallDetectionTester': (8, 4.4, 0.75, 45, 0.7),
+}
+
+ELEMENTOS_POR_BLOCO = 4_000_000  # (combinações x frames) avaliados por vez
+
+
+class Frames:
+    """Medidas dos frames com pessoa de todos os vídeos, concatenadas, no formato da regra."""
+
+    def __init__(self, videos, altura=360, tempo_cauda=10.0):
+        """`videos`: lista de (nome, VideoLandmarks, e_queda)."""
+        self.nomes = [nome for nome, _, _ in videos]
+        self.e_queda = np.array([e_queda for _, _, e_queda in videos], bool)
+        self.fps = np.array([video.fps for _, video, _ in videos], np.float64)
+        partes = [self._medidas(video, altura, tempo_cauda) for _, video, _ in videos]
+
+        # Vídeos sem nenhuma pose nunca disparam e ficam fora dos arrays
+        self.com_frames = np.flatnonzero([len(p[0]) > 0 for p in partes])
+        partes = [partes[i] for i in self.com_frames]
+        tamanhos = [len(p[0]) for p in partes]
+        self.inicios = np.cumsum([0] + tamanhos[:-1]).astype(np.intp)
+        self.video = np.repeat(self.com_frames, tamanhos)
+        (self.velocidade, self.quadril, self.tronco, self.nariz,
+         self.t, self.frame) = (np.concatenate(coluna) if partes else np.empty(0) for coluna in zip(*partes))
+        self.inicio_video = np.zeros(len(self.t), bool)
+        self.inicio_video[self.inicios] = True
+
+    @staticmethod
+    def _medidas(video, altura, tempo_cauda):
+        indices = np.flatnonzero(video.com_pessoa)
+        landmarks = np.asarray(video.landmarks[indices], np.float64)
+        quadril_x, quadril = landmarks[:, RIGHT_HIP, 0], landmarks[:, RIGHT_HIP, 1]
+        nariz = landmarks[:, NOSE, 1]
+
+        # Mesmas contas do PostureFallDetector.step: velocidade em pixels entre frames com pessoa
+        quadril_px = quadril * altura
+        velocidade = np.zeros(len(indices))
+        velocidade[1:] = np.abs(np.diff(quadril_px))
+        dx = landmarks[:, RIGHT_SHOULDER, 0] - quadril_x
+        dy = landmarks[:, RIGHT_SHOULDER, 1] - quadril
+        norma = np.hypot(dx, dy)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            tronco = np.where(norma == 0, 0.0, np.degrees(np.arccos(np.clip(-dy / norma, -1.0, 1.0))))
+        t = np.asarray(video.tempos, np.float64)[indices]
+        frame = indices + 1
+
+        if len(indices) and indices[-1] == len(video) - 1:
+            # Fim do vídeo (segurar_ultima_pose): a mesma pose parada, velocidade 0. A condição não
+            # muda durante a espera, então basta o último instante dela para decidir a confirmação
+            intervalo = 1.0 / video.fps if video.fps > 0 else 1.0 / 30
+            t_fim = t_ultimo = t[-1]
+            proximo = t_fim + intervalo
+            while proximo - t_fim <= tempo_cauda:
+                t_ultimo, proximo = proximo, proximo + intervalo
+            if t_ultimo > t_fim:
+                velocidade = np.append(velocidade, 0.0)
+                quadril, tronco, nariz = (np.append(a, a[-1]) for a in (quadril, tronco, nariz))
+                t = np.append(t, t_ultimo)
+                frame = np.append(frame, len(video))
+        return velocidade, quadril, tronco, nariz, t, frame
+
+    def __len__(self):
+        return len(self.t)
+
+
+def faixa(texto):
+    """'inicio:fim:passo' (fim incluído) ou 'a,b,c' -> array de valores."""
+    if ':' in texto:
+        inicio, fim, passo = (float(x) for x in texto.split(':'))
+        return np.round(np.arange(inicio, fim + passo / 2, passo), 6)
+    return np.array([float(x) for x in texto.split(',')])
+
+
+def deteccoes(frames, y_velocity, lower_body, trunk, head_low, confirmacoes):
+    """
+    Primeiro frame de confirmação de cada (combinação, confirmação, vídeo).
+
+    Os quatro limiares da condição vêm como arrays (K,); `confirmacoes` (E,).
+    Retorna um array (K, E, V) com o número do frame da confirmação ou 0 se o
+    vídeo não disparou.
+    """
+    K, V, F = len(y_velocity), len(frames.e_queda), len(frames)
+    resultado = np.zeros((K, len(confirmacoes), V), np.int64)
+    if F == 0: return resultado
+    indices = np.arange(F)
+    # Frames que nunca fazem parte de uma condição apontam para depois de si mesmos
+    depois = indices + 1
+    bloco = max(1, ELEMENTOS_POR_BLOCO // F)
+    for i in range(0, K, bloco):
+        k = slice(i, i + bloco)
+        baixo = frames.quadril > lower_body[k, None]
+        condicao = baixo & ((frames.velocidade > y_velocity[k, None]) |
+                            ((frames.tronco > trunk[k, None]) & (frames.nariz > head_low[k, None])))
+
+        # Início da condição corrente em cada frame: último frame sem condição + 1, ou o início do vídeo
+        marcas = np.where(condicao, np.where(frames.inicio_video, indices, 0), depois)
+        inicio = np.maximum.accumulate(marcas, axis=1)
+        decorrido = np.where(condicao, frames.t - frames.t[np.minimum(inicio, F - 1)], -1.0)
+
+        for e, confirmacao in enumerate(confirmacoes):
+            # Primeiro frame de cada vídeo com a condição mantida por mais de `confirmacao`
+            primeiro = np.minimum.reduceat(np.where(decorrido > confirmacao, indices, F), frames.inicios, axis=1)
+            disparou = primeiro < F
+            resultado[k, e][:, frames.com_frames] = np.where(disparou, frames.frame[np.minimum(primeiro, F - 1)], 0)
+    return resultado
+
+
+def metricas(frames, frame_deteccao):
+    """Sensibilidade, especificidade, F1, tempo médio de detecção e contagens, por combinação (..., V) -> (...)."""
+    detectado = frame_deteccao > 0
+    quedas, adl = frames.e_queda, ~frames.e_queda
+    vp = detectado[..., quedas].sum(axis=-1)
+    fp = detectado[..., adl].sum(axis=-1)
+    fn = quedas.sum() - vp
+    vn = adl.sum() - fp
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sensibilidade = vp / quedas.sum()
+        especificidade = vn / adl.sum()
+        f1 = np.where(vp > 0, 2 * vp / (2 * vp + fp + fn), 0.0)
+        tempo = np.where(detectado & quedas, frame_deteccao / frames.fps, 0.0).sum(axis=-1) / vp
+    return {'sensibilidade': sensibilidade, 'especificidade': especificidade, 'f1': f1,
+            'tempo_deteccao': tempo, 'vp': vp, 'fp': fp, 'vn': vn, 'fn': fn}
+
+
+def fronteira_pareto(sensibilidade, especificidade, tempo):
+    """Máscara das combinações não dominadas (sensibilidade e especificidade maiores, tempo menor)."""
+    tempo = np.where(np.isnan(tempo), np.inf, tempo)
+    pontos, grupo = np.unique(np.column_stack([-sensibilidade, -especificidade, tempo]), axis=0, return_inverse=True)
+    # Em ordem lexicográfica, um ponto só pode ser dominado por pontos anteriores (e basta olhar a fronteira)
+    frente = []
+    for i, (s, e, t) in enumerate(pontos):
+        if not any(fs <= s and fe <= e and ft <= t for fs, fe, ft in (pontos[j] for j in frente)):
+            frente.append(i)
+    na_frente = np.zeros(len(pontos), bool)
+    na_frente[frente] = True
+    return na_frente[grupo.ravel()]
+
+
+def carregar_videos(cache, pasta_quedas, pasta_adl):
+    videos = []
+    for pasta, e_queda in ((pasta_quedas, True), (pasta_adl, False)):
+        caminhos = sorted(glob.glob(os.path.join(pasta, "*.mp4")))
+        for i, caminho in enumerate(caminhos, 1):
+            video = cache.carregar(caminho)
+            if video is None:
+                print(f"[{i}/{len(caminhos)}] Extraindo landmarks: {os.path.basename(caminho)}")
+                video = cache.extrair(caminho)
+            videos.append((os.path.basename(caminho), video, e_queda))
+    return videos
+
+
+def verificar(frames, videos, grade, frame_deteccao, quantidade, altura, tempo_cauda):
+    """Compara combinações sorteadas com o PostureFallDetector rodando frame a frame (percorrer)."""
+    sorteio = np.random.default_rng(0).choice(len(grade), min(quantidade, len(grade)), replace=False)
+    diferencas = 0
+    for linha in sorteio:
+        y_velocity, confirmacao, lower_body, trunk, head_low = grade[linha]
+        for v, (nome, video, _) in enumerate(videos):
+            detector = PostureFallDetector(y_velocity_threshold=y_velocity, fall_confirm_time=confirmacao,
+                                           trunk_horizontal_threshold=trunk, lower_body_threshold=lower_body,
+                                           head_low_threshold=head_low, altura=altura)
+            _, frame = percorrer(video, detector, tempo_cauda)
+            if (frame or 0) != frame_deteccao[linha, v]:
+                diferencas += 1
+                print(f"  DIFERENÇA {nome} {grade[linha].tolist()}: detector {frame}, varredura {frame_deteccao[linha, v]}")
+    print(f"[METRICA] Verificação: {len(sorteio)} combinações x {len(videos)} vídeos | diferenças: {diferencas}")
+    return diferencas == 0
+
+
+def formatar(grade, m, i):
+    limiares = " ".join(f"{nome}={valor:g}" for nome, valor in zip(LIMIARES, grade[i]))
+    tempo = f"{m['tempo_deteccao'][i]:.2f}s" if np.isfinite(m['tempo_deteccao'][i]) else "-"
+    return (f"{limiares} | sens {m['sensibilidade'][i]:.1%} esp {m['especificidade'][i]:.1%}"
+            f" F1 {m['f1'][i]:.3f} | tempo {tempo} | VP {m['vp'][i]} FP {m['fp'][i]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de limiares do PostureFallDetector sobre os landmarks em cache")
+    parser.add_argument("--y-velocity", type=faixa, default=faixa("2:12:1"), help="Y_VELOCITY_THRESHOLD (pixels/frame)")
+    parser.add_argument("--confirmacao", type=faixa, default=faixa("0.25,0.5,1,1.5,2,2.5,3,3.5,4,4.4,5"), help="FALL_CONFIRM_TIME (s)")
+    parser.add_argument("--lower-body", type=faixa, default=faixa("0.5:0.8:0.05"), help="LOWER_BODY_THRESHOLD")
+    parser.add_argument("--trunk", type=faixa, default=faixa("25:60:5"), help="TRUNK_HORIZONTAL_THRESHOLD (graus)")
+    parser.add_argument("--head-low", type=faixa, default=faixa("0.6:0.8:0.05"), help="HEAD_LOW_THRESHOLD")
+    parser.add_argument("--tempo-cauda", type=float, default=10.0, help="MAX_LAST_FRAME_ANALYSIS_TIME (s de vídeo)")
+    parser.add_argument("--quedas", default=PASTA_QUEDAS, help="pasta dos vídeos de queda")
+    parser.add_argument("--adl", default=PASTA_ADL, help="pasta dos vídeos ADL")
+    parser.add_argument("--top", type=int, default=15, help="linhas da fronteira de Pareto mostradas")
+    parser.add_argument("--csv", help="arquivo de saída (padrão: varredura_limiares_AAAAMMDD_HHMMSS.csv)")
+    parser.add_argument("--verificar", type=int, default=0, help="confere N combinações sorteadas com o detector frame a frame")
+    args = parser.parse_args()
+    altura = 360  # frames reduzidos para 640x360 pelos testadores
+
+    videos = carregar_videos(LandmarkCache(), args.quedas, args.adl)
+    if not videos:
+        print("Nenhum vídeo encontrado!")
+        return
+    t0 = time.perf_counter()
+    frames = Frames(videos, altura, args.tempo_cauda)
+    t_medidas = time.perf_counter() - t0
+
+    # Grade: condição (velocidade, quadril, tronco, cabeça) x confirmação
+    condicoes = np.array(list(itertools.product(args.y_velocity, args.lower_body, args.trunk, args.head_low)))
+    t0 = time.perf_counter()
+    por_condicao = deteccoes(frames, *condicoes.T, args.confirmacao)
+    frame_deteccao = por_condicao.reshape(-1, len(videos))
+    grade = np.column_stack([np.repeat(condicoes[:, 0], len(args.confirmacao)), np.tile(args.confirmacao, len(condicoes)),
+                             np.repeat(condicoes[:, 1:], len(args.confirmacao), axis=0)])
+    m = metricas(frames, frame_deteccao)
+    pareto = fronteira_pareto(m['sensibilidade'], m['especificidade'], m['tempo_deteccao'])
+    duracao = time.perf_counter() - t0
+
+    n_quedas = int(frames.e_queda.sum())
+    print(f"\n=== VARREDURA DE LIMIARES: {n_quedas} quedas, {len(videos) - n_quedas} ADL, {len(frames)} frames com pessoa ===")
+    print(f"[METRICA] {len(grade)} combinações em {duracao:.2f}s ({len(grade) / duracao:.0f} combinações/s)"
+          f" | medidas dos frames {t_medidas * 1000:.0f} ms")
+
+    print("\nLimiares atuais dos testadores:")
+    for nome, (y_velocity, confirmacao, lower_body, trunk, head_low) in REFERENCIAS.items():
+        ref = deteccoes(frames, np.array([y_velocity]), np.array([lower_body]), np.array([trunk]),
+                        np.array([head_low]), np.array([confirmacao])).reshape(1, -1)
+        print(f"  {nome}: {formatar(np.array([REFERENCIAS[nome]]), metricas(frames, ref), 0)}")
+
+    frente = np.flatnonzero(pareto)
+    frente = frente[np.lexsort((m['tempo_deteccao'][frente], -m['f1'][frente]))]
+    print(f"\nFronteira de Pareto: {len(frente)} combinações (maior F1 primeiro)")
+    vistos = set()
+    for i in frente:
+        chave = (m['sensibilidade'][i], m['especificidade'][i], m['tempo_deteccao'][i])
+        if chave in vistos: continue  # uma combinação por ponto da fronteira
+        vistos.add(chave)
+        print(f"  {formatar(grade, m, i)}")
+        if len(vistos) == args.top: break
+
+    arquivo = args.csv or f"varredura_limiares_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    with open(arquivo, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(list(LIMIARES) + ['sensibilidade', 'especificidade', 'f1', 'tempo_deteccao', 'vp', 'fp', 'vn', 'fn', 'pareto'])
+        colunas = [m['sensibilidade'].round(4), m['especificidade'].round(4), m['f1'].round(4),
+                   m['tempo_deteccao'].round(3), m['vp'], m['fp'], m['vn'], m['fn'], pareto]
+        for linha in zip(*grade.T.tolist(), *(c.tolist() for c in colunas)):
+            writer.writerow(linha)
+    print(f"\nResultados salvos em: {arquivo}")
+
+    if args.verificar:
+        verificar(frames, videos, grade, frame_deteccao, args.verificar, altura, args.tempo_cauda)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Leitura dos vídeos dos datasets para os testadores, com decodificação antecipada.
+
+O `VideoReader` decodifica numa thread própria enquanto o laço do testador
+roda o MediaPipe no frame anterior: a decodificação e o resize do OpenCV
+liberam o GIL, então as duas coisas se sobrepõem. Nada é alocado por frame:
+o frame cru é lido sempre no mesmo array (`cap.read(bruto)`) e reduzido (e,
+com `rgb=True`, convertido para RGB) direto num de poucos buffers de saída
+que circulam entre a thread e o laço. Com `passo` > 1, os frames pulados só
+avançam o decodificador (`grab()`, sem `retrieve()`).
+
+Com um único núcleo não há o que sobrepor e a troca de frames entre as
+threads só custa; por padrão a thread só é usada com mais de uma CPU
+(`antecipar`), e sem ela a leitura acontece no próprio laço, com os mesmos
+buffers.
+
+    with VideoReader(caminho, (640, 360), rgb=True) as leitor:
+        for numero, tempo, frame in leitor:
+            ...
+
+O `frame` entregue só vale até a próxima iteração (o buffer volta para a
+thread de decodificação); quem precisar guardá-lo faz a cópia.
+"""
+
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+def tempo_de_midia(cap, frame, fps):
+    """Instante (s) do `frame`-ésimo frame lido (1 = primeiro) no vídeo; posição do decodificador se o fps for desconhecido."""
+    return (frame - 1) / fps if fps > 0 else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+
+
+class VideoReader:
+    """Frames reduzidos a `tamanho` (largura, altura), com número e instante no vídeo, decodificados à frente do laço."""
+
+    def __init__(self, caminho, tamanho=(640, 360), passo=1, rgb=False, buffers=3, antecipar=None):
+        self.cap = cv2.VideoCapture(caminho)
+        self.aberto = self.cap.isOpened()
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) if self.aberto else 0.0
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)) if self.aberto else 0
+        self.tamanho = tuple(tamanho)
+        self.passo = max(1, int(passo))
+        self.rgb = rgb
+        self.antecipar = (os.cpu_count() or 1) > 1 if antecipar is None else antecipar
+        self.frames = 0                 # frames entregues
+        self.pulados = 0                # frames só avançados com grab()
+        self.tempo_decodificacao = 0.0  # segundos lendo, reduzindo e convertendo
+        self.espera = 0.0               # segundos que o laço do testador ficou esperando frame
+        largura, altura = self.tamanho
+        self._livres = queue.Queue()
+        for _ in range(buffers):
+            self._livres.put(np.empty((altura, largura, 3), np.uint8))
+        self._prontos = queue.Queue()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._decodificar, name="leitura-video", daemon=True)
+        self._entregue = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def __iter__(self):
+        if not self.aberto: return
+        if not self.antecipar:
+            # Sem thread: um buffer só, reescrito a cada frame
+            buffer = self._livres.get()
+            for item in self._ler(lambda: buffer):
+                self.frames += 1
+                yield item
+            return
+        self._thread.start()
+        while True:
+            # O frame da iteração anterior já foi usado: o buffer volta para a decodificação
+            if self._entregue is not None:
+                self._livres.put(self._entregue)
+                self._entregue = None
+            t0 = time.perf_counter()
+            item = self._prontos.get()
+            self.espera += time.perf_counter() - t0
+            if item is None: return
+            if isinstance(item, Exception): raise item
+            numero, tempo, self._entregue = item
+            self.frames += 1
+            yield numero, tempo, self._entregue
+
+    def fechar(self):
+        self._parar.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self.cap.release()
+
+    # --- Thread de decodificação ---
+    def _proximo_buffer(self):
+        while not self._parar.is_set():
+            try: return self._livres.get(timeout=0.1)
+            except queue.Empty: continue
+        return None
+
+    def _decodificar(self):
+        try:
+            for item in self._ler(self._proximo_buffer):
+                self._prontos.put(item)
+        except Exception as e:
+            self._prontos.put(e)
+        finally:
+            self._prontos.put(None)
+
+    def _ler(self, proximo_buffer):
+        """Gera (número, instante, buffer) lendo o vídeo; `proximo_buffer()` dá o destino de cada frame (None encerra)."""
+        cap = self.cap
+        bruto = None
+        reduzido = np.empty((self.tamanho[1], self.tamanho[0], 3), np.uint8) if self.rgb else None
+        numero = 0
+        while not self._parar.is_set():
+            numero += 1
+            t0 = time.perf_counter()
+            if (numero - 1) % self.passo:
+                if not cap.grab(): return
+                self.pulados += 1
+                self.tempo_decodificacao += time.perf_counter() - t0
+                continue
+            ok, bruto = cap.read(bruto)
+            if not ok: return
+            tempo = tempo_de_midia(cap, numero, self.fps)
+            self.tempo_decodificacao += time.perf_counter() - t0
+
+            buffer = proximo_buffer()
+            if buffer is None: return
+            t0 = time.perf_counter()
+            if self.rgb:
+                cv2.resize(bruto, self.tamanho, dst=reduzido)
+                cv2.cvtColor(reduzido, cv2.COLOR_BGR2RGB, dst=buffer)
+            else:
+                cv2.resize(bruto, self.tamanho, dst=buffer)
+            self.tempo_decodificacao += time.perf_counter() - t0
+            yield numero, tempo, buffer
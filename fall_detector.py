@@ -0,0 +1,214 @@
+"""
+Nucleo de deteccao de quedas, compartilhado pelo app e pelos testadores.
+
+Os detectores recebem os 33 landmarks do MediaPipe Pose como um array
+(33, 4) float32 com (x, y, z, visibilidade) normalizados (ver landmarks.py)
+e um instante `t` em segundos, e mantem todo o estado em `__slots__`. Nenhum
+array novo e criado por frame: as medidas do corpo sao calculadas em buffers
+alocados no construtor.
+
+- FallDetector: a maquina de estados do app ("Estavel" -> "Caindo" ->
+  "Instavel" -> queda confirmada apos FALL_CONFIRM_TIME).
+- PostureFallDetector: a regra dos testadores dos datasets (queda rapida com
+  quadril baixo, ou quadril baixo com tronco horizontal e cabeca baixa),
+  confirmada apos FALL_CONFIRM_TIME; cada testador passa os seus limiares.
+"""
+
+import math
+
+from landmarks import BodyFeatures, NOSE, RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE
+
+
+def angulo_com_vertical(dx, dy):
+    """Angulo (graus) entre o vetor (dx, dy) da imagem e a vertical para cima (0, -1)."""
+    norma = math.hypot(dx, dy)
+    if norma == 0: return 0.0
+    return math.degrees(math.acos(max(-1.0, min(1.0, -dy / norma))))
+
+
+class FallDetector:
+    """Estado de queda de uma camera; `ao_confirmar(tempo_confirmacao)` e chamado uma vez por queda."""
+
+    __slots__ = ('ao_confirmar', 'fall_confirm_time', 'y_velocity_threshold', 'torso_vertical_threshold',
+                 'aspect_ratio_upright_threshold', 'largura', 'altura',
+                 'current_state', 'fall_confirmed', 'previous_hip_y', 'time_unstable_start',
+                 'high_velocity_event', 'was_previously_tracking', 'last_stable_hip_y', 'caixa_corpo',
+                 'medidas')
+
+    def __init__(self, ao_confirmar=None, fall_confirm_time=4.5, y_velocity_threshold=20,
+                 torso_vertical_threshold=70, aspect_ratio_upright_threshold=1.2, largura=640, altura=480):
+        self.ao_confirmar = ao_confirmar
+
+        # --- Limiares ---
+        self.fall_confirm_time = fall_confirm_time
+        self.y_velocity_threshold = y_velocity_threshold
+        self.torso_vertical_threshold = torso_vertical_threshold
+        self.aspect_ratio_upright_threshold = aspect_ratio_upright_threshold
+        # Resolucao do frame: a velocidade e a caixa do corpo sao medidas em pixels
+        self.largura = largura
+        self.altura = altura
+
+        # --- Variaveis de estado ---
+        self.current_state = "Estavel"
+        self.fall_confirmed = False
+        self.previous_hip_y = None
+        self.time_unstable_start = None
+        self.high_velocity_event = False
+        self.was_previously_tracking = True
+        self.last_stable_hip_y = None
+        self.caixa_corpo = None  # (x_min, y_min, x_max, y_max) em pixels, usada pelo recorte ROI
+        self.medidas = BodyFeatures()
+
+    def step(self, landmarks, t, pulados=0):
+        """
+        Atualiza o estado com os landmarks (33, 4) de um frame, ou None quando ninguem foi detectado.
+
+        `pulados` e o numero de frames que a inferencia adaptativa deixou de inferir de proposito
+        logo antes deste; frames descartados pelas filas latest-wins nao contam.
+        """
+        if landmarks is None:
+            self.was_previously_tracking = False
+            self.current_state = "Nenhuma pessoa detectada"
+            self.caixa_corpo = None
+            return
+
+        is_reacquiring_track = not self.was_previously_tracking
+        self.was_previously_tracking = True
+        medidas = self.medidas.calcular(landmarks, self.largura, self.altura)
+        current_hip_y = int(medidas.quadril[1] * self.altura)
+
+        limiar = self.y_velocity_threshold
+        if is_reacquiring_track and self.last_stable_hip_y is not None:
+            y_velocity = current_hip_y - self.last_stable_hip_y
+        elif self.previous_hip_y is not None:
+            # Deslocamento bruto desde a inferencia anterior, comparado por frame processado como no
+            # laco original (inclusive quando a fila latest-wins descartou frames). So os frames que a
+            # taxa base pulou de proposito aumentam o limiar, e com a metade deles: uma queda que parte
+            # do repouso dentro do intervalo termina com cerca do dobro da velocidade media
+            y_velocity = current_hip_y - self.previous_hip_y
+            limiar *= max(1.0, (1 + pulados) / 2)
+        else:
+            y_velocity = 0
+
+        if y_velocity > limiar:
+            self.high_velocity_event = True
+            self.current_state = "Caindo"
+        self.previous_hip_y = current_hip_y
+
+        self.caixa_corpo = medidas.caixa
+        is_upright = (medidas.torso_angle > self.torso_vertical_threshold
+                      and medidas.aspect_ratio > self.aspect_ratio_upright_threshold)
+
+        if is_upright:
+            self.current_state = "Estavel"
+            self.time_unstable_start = None
+            self.fall_confirmed = False
+            self.high_velocity_event = False
+            self.last_stable_hip_y = current_hip_y
+        else:
+            if self.high_velocity_event:
+                if self.time_unstable_start is None:
+                    # <<< COLETA DE METRICA DE TEMPO >>>
+                    self.time_unstable_start = t
+                    print(f"[METRICA] Evento de instabilidade iniciado em: {self.time_unstable_start}")
+
+                    self.current_state = "Instavel"
+
+        self.tick(t)
+
+    def tick(self, t):
+        """Confirma a queda quando o estado Instavel dura FALL_CONFIRM_TIME; roda tambem sem nova pose."""
+        if self.current_state == "Instavel" and self.time_unstable_start is not None:
+            if t - self.time_unstable_start >= self.fall_confirm_time:
+                if not self.fall_confirmed:
+                    # <<< COLETA DE METRICA DE TEMPO >>>
+                    tempo_confirmacao = t
+                    tempo_total_deteccao = tempo_confirmacao - self.time_unstable_start
+                    print(f"[METRICA] Queda confirmada em: {tempo_confirmacao}")
+                    print(f"[METRICA] Tempo de Confirmacao da Queda: {tempo_total_deteccao:.2f} segundos")
+
+                    self.fall_confirmed = True
+                    if self.ao_confirmar: self.ao_confirmar(tempo_confirmacao)
+
+    def estado(self):
+        """Copia do estado no instante da decisao: (estado, queda confirmada, inicio do Instavel)."""
+        return self.current_state, self.fall_confirmed, self.time_unstable_start
+
+
+class PostureFallDetector:
+    """
+    Regra de queda dos testadores dos datasets, com os limiares de cada testador.
+
+    Usa o lado direito do corpo: velocidade absoluta do quadril (pixels por
+    frame na `altura` do frame analisado), angulo do tronco e da perna com a
+    vertical, altura do quadril e do nariz. A queda e confirmada quando a
+    condicao se mantem por mais de `fall_confirm_time`; frames sem pessoa nao
+    alteram o estado.
+    """
+
+    __slots__ = ('y_velocity_threshold', 'fall_confirm_time', 'trunk_horizontal_threshold',
+                 'leg_horizontal_threshold', 'lower_body_threshold', 'head_low_threshold', 'altura',
+                 'previous_y', 'time_fallen_start', 'fall_confirmed', 'inicio_neste_frame',
+                 'y_velocity', 'trunk_angle', 'leg_angle', 'hip_y', 'nose_y')
+
+    def __init__(self, y_velocity_threshold=5, fall_confirm_time=0.5, trunk_horizontal_threshold=35,
+                 leg_horizontal_threshold=35, lower_body_threshold=0.55, head_low_threshold=0.7, altura=360):
+        self.y_velocity_threshold = y_velocity_threshold
+        self.fall_confirm_time = fall_confirm_time
+        self.trunk_horizontal_threshold = trunk_horizontal_threshold
+        self.leg_horizontal_threshold = leg_horizontal_threshold
+        self.lower_body_threshold = lower_body_threshold
+        self.head_low_threshold = head_low_threshold
+        self.altura = altura
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Volta ao estado inicial (novo video)."""
+        self.previous_y = None
+        self.time_fallen_start = None
+        self.fall_confirmed = False
+        self.inicio_neste_frame = False  # a condicao de queda comecou neste frame
+        # Ultimas medidas, para logs e overlays
+        self.y_velocity = self.trunk_angle = self.leg_angle = 0.0
+        self.hip_y = self.nose_y = 0.0
+
+    def step(self, landmarks, t):
+        """Atualiza com os landmarks (33, 4) do frame no instante `t`; retorna se a queda esta confirmada."""
+        self.inicio_neste_frame = False
+        if landmarks is None:
+            return self.fall_confirmed
+
+        hip_x, hip_y = float(landmarks[RIGHT_HIP, 0]), float(landmarks[RIGHT_HIP, 1])
+        self.hip_y = hip_y
+        self.nose_y = float(landmarks[NOSE, 1])
+
+        # Calcular velocidade
+        hip_px = hip_y * self.altura
+        self.y_velocity = abs(hip_px - self.previous_y) if self.previous_y is not None else 0.0
+        self.previous_y = hip_px
+
+        # Calcular angulos com a vertical
+        self.trunk_angle = angulo_com_vertical(float(landmarks[RIGHT_SHOULDER, 0]) - hip_x,
+                                               float(landmarks[RIGHT_SHOULDER, 1]) - hip_y)
+        self.leg_angle = angulo_com_vertical(float(landmarks[RIGHT_ANKLE, 0]) - float(landmarks[RIGHT_KNEE, 0]),
+                                             float(landmarks[RIGHT_ANKLE, 1]) - float(landmarks[RIGHT_KNEE, 1]))
+
+        # Condicoes de queda
+        is_fast_drop = self.y_velocity > self.y_velocity_threshold
+        is_low_posture = hip_y > self.lower_body_threshold
+        is_trunk_horizontal = self.trunk_angle > self.trunk_horizontal_threshold
+        is_head_low = self.nose_y > self.head_low_threshold
+        fall_detected = (is_fast_drop and is_low_posture) or (is_low_posture and is_trunk_horizontal and is_head_low)
+
+        if fall_detected:
+            if self.time_fallen_start is None:
+                self.time_fallen_start = t
+                self.inicio_neste_frame = True
+        else:
+            self.time_fallen_start = None
+            self.fall_confirmed = False
+
+        # Confirmar queda
+        if self.time_fallen_start is not None and t - self.time_fallen_start > self.fall_confirm_time:
+            self.fall_confirmed = True
+        return self.fall_confirmed
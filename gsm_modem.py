@@ -0,0 +1,233 @@
+"""
+Driver orientado a eventos para o modulo GSM SIM800L.
+
+Em vez de escrever o comando AT e dormir um tempo fixo antes de ler a
+resposta, uma thread leitora separa as linhas recebidas pela serial e cada
+comando termina assim que chega o seu codigo de resultado final (OK, ERROR,
+">", CONNECT, ...). O timeout passa a ser apenas o limite maximo de espera.
+Linhas intermediarias como "+CMGS: <ref>" ficam na resposta, e o comando so
+termina no OK/ERROR que vem depois delas. Linhas que chegam sem comando
+pendente (RING, +CMTI:, NO CARRIER, ...) sao tratadas como URCs (unsolicited
+result codes) e entregues aos callbacks registrados.
+"""
+
+import threading
+import time
+from collections import deque
+
+import serial
+
+# Codigos que encerram a resposta de um comando
+RESULTADOS_FINAIS = ("OK", "ERROR", "+CME ERROR", "+CMS ERROR", "NO CARRIER", "BUSY",
+                     "NO ANSWER", "NO DIALTONE", "CONNECT", ">")
+RESULTADOS_ERRO = ("ERROR", "+CME ERROR", "+CMS ERROR", "NO CARRIER", "BUSY", "NO ANSWER", "NO DIALTONE")
+
+# Codigos nao solicitados que podem chegar inclusive no meio da resposta de outro comando
+PREFIXOS_URC = ("RING", "+CLIP:", "+CMTI:", "+CMT:", "+CDS:", "+CREG:", "+CPIN:", "+CFUN:",
+                "+CUSD:", "Call Ready", "SMS Ready", "RDY", "UNDER-VOLTAGE", "OVER-VOLTAGE",
+                "NORMAL POWER DOWN")
+
+CTRL_Z = bytes([26])
+
+
+def nome_do_comando(comando):
+    """'AT+CMGS="+55..."' -> 'AT+CMGS'; usado para agrupar as latencias por comando."""
+    comando = comando.upper()
+    if comando.startswith("ATD"): return "ATD"
+    for i, c in enumerate(comando):
+        if c in '=?': return comando[:i]
+    return comando
+
+
+class RespostaAT:
+    """Resposta de um comando: linhas recebidas, codigo final e latencia em segundos."""
+
+    __slots__ = ('comando', 'linhas', 'final', 'ok', 'latencia')
+
+    def __init__(self, comando, linhas, final, ok, latencia):
+        self.comando = comando
+        self.linhas = linhas
+        self.final = final
+        self.ok = ok
+        self.latencia = latencia
+
+    @property
+    def texto(self):
+        return "\n".join(self.linhas)
+
+    def valor(self, prefixo):
+        """Conteudo da primeira linha que comeca com `prefixo` ('+CMGS:' -> '12'), ou None."""
+        for linha in self.linhas:
+            if linha.startswith(prefixo): return linha[len(prefixo):].strip()
+        return None
+
+    def __bool__(self):
+        return self.ok
+
+
+class _ComandoPendente:
+    __slots__ = ('eco', 'linhas', 'final', 't_fim')
+
+    def __init__(self, eco):
+        self.eco = eco
+        self.linhas = []
+        self.final = None
+        self.t_fim = None
+
+
+class SIM800L:
+    """
+    Driver do SIM800L sobre uma porta serial ja aberta (pyserial ou compativel).
+
+    Um comando por vez e enviado ao modulo; a thread leitora completa o comando
+    pendente ao ver o codigo final e encaminha os URCs para `on_urc`.
+    """
+
+    def __init__(self, ser, historico_latencias=100):
+        self.ser = ser
+        # Leituras curtas: a thread leitora precisa perceber o fechamento rapidamente
+        self.ser.timeout = 0.1
+        self._comando_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._pendente = None
+        self._handlers_urc = []
+        self._historico = historico_latencias
+        self.latencias = {}
+        self.urcs = deque(maxlen=100)
+        self._fechado = False
+        self._leitor = threading.Thread(target=self._ler, name="sim800l", daemon=True)
+        self._leitor.start()
+
+    # --- Envio de comandos ---
+    def comando(self, comando, esperado="OK", timeout=5.0):
+        """Envia um comando AT e espera o codigo final; `timeout` e o limite maximo de espera."""
+        return self._executar((comando + '\r\n').encode(), comando, comando, esperado, timeout)
+
+    def enviar_dados(self, dados, esperado="OK", timeout=30.0, nome="DADOS"):
+        """Envia bytes brutos (texto do SMS, conteudo de arquivo) e espera o codigo final."""
+        return self._executar(dados, None, nome, esperado, timeout)
+
+    def _executar(self, bruto, eco, nome, esperado, timeout):
+        with self._comando_lock:
+            pendente = _ComandoPendente(eco)
+            with self._cond:
+                self._pendente = pendente
+            t_envio = time.monotonic()
+            self.ser.write(bruto)
+            with self._cond:
+                self._cond.wait_for(lambda: pendente.final is not None or self._fechado, timeout)
+                self._pendente = None
+            latencia = (pendente.t_fim or time.monotonic()) - t_envio
+            ok = pendente.final is not None and not pendente.final.startswith(RESULTADOS_ERRO) \
+                and any(esperado in linha for linha in pendente.linhas)
+            self._registrar_latencia(nome_do_comando(nome), latencia)
+            return RespostaAT(nome, pendente.linhas, pendente.final, ok, latencia)
+
+    def _registrar_latencia(self, nome, latencia):
+        if nome not in self.latencias:
+            self.latencias[nome] = deque(maxlen=self._historico)
+        self.latencias[nome].append(latencia)
+
+    # --- Operacoes de alto nivel ---
+    def enviar_sms(self, numero, mensagem, timeout=60.0):
+        """
+        Envia um SMS em modo texto; retorna a resposta do texto (linha +CMGS: e OK
+        final, `resposta.valor("+CMGS:")` e a referencia) ou da etapa que falhou.
+        """
+        resposta = self.comando("AT+CMGF=1", timeout=2)
+        if not resposta.ok: return resposta
+        resposta = self.comando(f'AT+CMGS="{numero}"', ">", timeout=5)
+        if not resposta.ok: return resposta
+        return self.enviar_dados(mensagem.encode() + CTRL_Z, "+CMGS:", timeout, nome="AT+CMGS-TEXTO")
+
+    # --- URCs ---
+    def on_urc(self, prefixo, callback):
+        """Registra `callback(linha)` para os URCs que comecam com `prefixo` ("" = todos)."""
+        self._handlers_urc.append((prefixo, callback))
+
+    def _despachar_urc(self, linha):
+        self.urcs.append((time.time(), linha))
+        for prefixo, callback in self._handlers_urc:
+            if linha.startswith(prefixo):
+                try:
+                    callback(linha)
+                except Exception as e:
+                    print(f"[GSM] Erro no tratamento do URC '{linha}': {e}")
+
+    # --- Leitura ---
+    def _ler(self):
+        buffer = b""
+        while not self._fechado:
+            try:
+                dados = self.ser.read(self.ser.in_waiting or 1)
+            except (serial.SerialException, OSError):
+                break
+            if not dados: continue
+            buffer += dados
+            while True:
+                buffer = buffer.lstrip(b"\r\n")
+                # O prompt do AT+CMGS ("> ") chega sem fim de linha
+                if buffer.startswith(b">"):
+                    buffer = buffer[1:].lstrip(b" ")
+                    self._linha(">")
+                    continue
+                fim = buffer.find(b"\n")
+                if fim < 0: break
+                linha = buffer[:fim].strip().decode(errors='ignore')
+                buffer = buffer[fim + 1:]
+                if linha: self._linha(linha)
+        with self._cond:
+            self._fechado = True
+            self._cond.notify_all()
+
+    def _linha(self, linha):
+        with self._cond:
+            pendente = self._pendente
+            if pendente is not None and pendente.final is None and not self._eh_urc(linha, pendente):
+                if linha == pendente.eco: return
+                pendente.linhas.append(linha)
+                if linha.startswith(RESULTADOS_FINAIS):
+                    pendente.final = linha
+                    pendente.t_fim = time.monotonic()
+                    self._cond.notify_all()
+                return
+        # "OK" sem comando pendente e o fim tardio de um comando que ja estourou o timeout
+        if linha != "OK":
+            self._despachar_urc(linha)
+
+    @staticmethod
+    def _eh_urc(linha, pendente):
+        if not linha.startswith(PREFIXOS_URC): return False
+        # "+CREG: 0,1" e resposta (nao URC) quando o comando pendente e o proprio AT+CREG
+        prefixo = linha.split(":", 1)[0]
+        return not (pendente.eco and pendente.eco.upper().startswith("AT" + prefixo.upper()))
+
+    # --- Metricas e encerramento ---
+    def estatisticas(self):
+        """Latencia media/maxima (em ms) e numero de amostras por comando."""
+        return {
+            nome: {'n': len(amostras),
+                   'media_ms': 1000 * sum(amostras) / len(amostras),
+                   'max_ms': 1000 * max(amostras)}
+            for nome, amostras in list(self.latencias.items()) if amostras
+        }
+
+    def fechar(self):
+        with self._cond:
+            self._fechado = True
+            self._cond.notify_all()
+        self._leitor.join(timeout=1.0)
+        self.ser.close()
+
+
+def abrir_modem(porta, baudrate=115200):
+    """Abre a serial do modulo GSM e retorna o driver, ou None se a porta nao abrir."""
+    try:
+        ser = serial.Serial(porta, baudrate=baudrate, timeout=5)
+    except serial.SerialException as e:
+        print(f"ERRO CRITICO: Nao foi possivel abrir a porta serial GSM: {e}")
+        return None
+    print(f"Porta serial GSM {porta} aberta.")
+    modem = SIM800L(ser)
+    modem.on_urc("", lambda linha: print(f"[GSM] URC: {linha}"))
+    return modem
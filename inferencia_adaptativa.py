@@ -0,0 +1,60 @@
+"""
+Taxa de inferencia adaptativa guiada pela maquina de estados de queda.
+
+Com a pessoa em "Estavel" e parada, a pose e estimada so a uma taxa base
+baixa; qualquer sinal de atividade (movimento do quadril, perda do
+rastreamento ou estado diferente de "Estavel") volta a inferencia para a taxa
+cheia (todo frame) e ela so cai de novo apos `tempo_calmo` segundos sem
+atividade. O movimento e o deslocamento bruto do quadril desde a inferencia
+anterior, sem dividir pelos frames pulados: o inicio de uma queda vista a
+taxa base ja volta a taxa cheia antes de a velocidade dela importar para o
+FallDetector. Todo o intervalo "Instavel" -> "Queda confirmada" roda na taxa
+cheia, entao o tempo de confirmacao medido nao muda.
+"""
+
+ESTADO_ESTAVEL = "Estavel"
+
+
+class AdaptiveScheduler:
+    """Decide, frame a frame, se `pose.process` deve rodar."""
+
+    def __init__(self, taxa_base=5.0, limiar_movimento=3.0, tempo_calmo=2.0):
+        self.intervalo_base = 1.0 / taxa_base
+        self.limiar_movimento = limiar_movimento  # pixels do quadril desde a ultima inferencia
+        self.tempo_calmo = tempo_calmo
+        self._ultima_inferencia = float('-inf')
+        self._ultima_atividade = float('-inf')
+        self._ultimo_hip_y = None
+        self.inferidos = 0
+        self.pulados = 0
+        self.pulados_antes = 0  # frames pulados logo antes da inferencia liberada por ultimo
+        self._seguidos = 0
+
+    def taxa_cheia(self, agora):
+        return agora - self._ultima_atividade < self.tempo_calmo
+
+    def deve_inferir(self, agora):
+        if self.taxa_cheia(agora) or agora - self._ultima_inferencia >= self.intervalo_base:
+            self.inferidos += 1
+            self.pulados_antes, self._seguidos = self._seguidos, 0
+            return True
+        self.pulados += 1
+        self._seguidos += 1
+        return False
+
+    def registrar(self, agora, estado, hip_y):
+        """Registra o resultado de uma inferencia; `hip_y` e None quando ninguem foi detectado."""
+        self._ultima_inferencia = agora
+        ativo = estado != ESTADO_ESTAVEL or hip_y is None
+        if not ativo and self._ultimo_hip_y is not None:
+            # Deslocamento bruto desde a ultima inferencia, mesmo que frames tenham sido pulados
+            ativo = abs(hip_y - self._ultimo_hip_y) > self.limiar_movimento
+        if ativo:
+            self._ultima_atividade = agora
+        self._ultimo_hip_y = hip_y
+
+    def relatorio(self, agora):
+        total = self.inferidos + self.pulados
+        fracao = self.pulados / total if total else 0.0
+        modo = "cheia" if self.taxa_cheia(agora) else f"base ({1 / self.intervalo_base:.0f} Hz)"
+        return f"[METRICA] Inferencia adaptativa: taxa {modo} | {fracao:.0%} dos frames sem pose.process ({self.pulados}/{total})"
@@ -0,0 +1,110 @@
+"""
+Sequencia de inicializacao medida do app.
+
+Cada fase (camera, GSM, modelo de pose, pipeline) roda na sua propria thread
+assim que as fases de que depende terminam, entao a descoberta da camera, a
+abertura da serial e o carregamento do MediaPipe acontecem em paralelo e o
+servidor web ja responde enquanto isso. O estado e os tempos de cada fase
+alimentam /health e /ready.
+"""
+
+import threading
+import time
+
+import psutil
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+OK = "ok"
+ERRO = "erro"
+
+
+class Fase:
+    __slots__ = ('nome', 'depende', 'estado', 'inicio', 'duracao', 'erro', 'detalhes', 'concluida')
+
+    def __init__(self, nome, depende):
+        self.nome = nome
+        self.depende = depende
+        self.estado = PENDENTE
+        self.inicio = None    # segundos desde o inicio da sequencia
+        self.duracao = None
+        self.erro = None
+        self.detalhes = {}
+        self.concluida = threading.Event()
+
+    def as_dict(self):
+        return {
+            'estado': self.estado,
+            'depende': list(self.depende),
+            'inicio_ms': round(self.inicio * 1000) if self.inicio is not None else None,
+            'duracao_ms': round(self.duracao * 1000) if self.duracao is not None else None,
+            'erro': self.erro,
+            **self.detalhes,
+        }
+
+
+class StartupSequence:
+    """Executa as fases registradas em paralelo, respeitando as dependencias, e guarda os tempos."""
+
+    def __init__(self):
+        self._t0 = time.monotonic()
+        # Interpretador + imports do modulo principal, antes de a sequencia existir
+        self.antes_da_sequencia = time.time() - psutil.Process().create_time()
+        self._fases = {}
+        self.pronto_em = None
+
+    def fase(self, nome, funcao, depende=()):
+        """Agenda `funcao()`; se ela retornar um dict, ele entra nos detalhes da fase."""
+        fase = self._fases[nome] = Fase(nome, tuple(depende))
+        threading.Thread(target=self._executar, args=(fase, funcao), name=f"init-{nome}", daemon=True).start()
+
+    def _executar(self, fase, funcao):
+        for dependencia in fase.depende:
+            self._fases[dependencia].concluida.wait()
+            if self._fases[dependencia].estado != OK:
+                fase.estado, fase.erro = ERRO, f"dependencia '{dependencia}' falhou"
+                fase.concluida.set()
+                return
+        fase.inicio = time.monotonic() - self._t0
+        fase.estado = EXECUTANDO
+        try:
+            fase.detalhes = funcao() or {}
+            fase.estado = OK
+        except Exception as e:
+            fase.estado, fase.erro = ERRO, str(e)
+            print(f"ERRO na inicializacao ({fase.nome}): {e}")
+        fase.duracao = time.monotonic() - self._t0 - fase.inicio
+        fase.concluida.set()
+
+    def aguardar(self, nome, timeout=None):
+        """Espera a fase terminar; retorna True se ela terminou com sucesso."""
+        fase = self._fases[nome]
+        return fase.concluida.wait(timeout) and fase.estado == OK
+
+    def marcar_pronto(self):
+        self.pronto_em = time.monotonic() - self._t0
+
+    @property
+    def pronto(self):
+        return self.pronto_em is not None
+
+    @property
+    def falhou(self):
+        return any(fase.estado == ERRO for fase in self._fases.values())
+
+    def status(self):
+        total = self.antes_da_sequencia + self.pronto_em if self.pronto else None
+        return {
+            'pronto': self.pronto,
+            'antes_da_sequencia_ms': round(self.antes_da_sequencia * 1000),
+            'pronto_em_ms': round(total * 1000) if total is not None else None,
+            'decorrido_ms': round((time.monotonic() - self._t0) * 1000),
+            'fases': {nome: fase.as_dict() for nome, fase in self._fases.items()},
+        }
+
+    def relatorio(self):
+        partes = [f"{nome} {fase.duracao * 1000:.0f} ms" if fase.duracao is not None else f"{nome} {fase.estado}"
+                  for nome, fase in self._fases.items()]
+        total = f"{(self.antes_da_sequencia + self.pronto_em) * 1000:.0f} ms" if self.pronto else "n/d"
+        return (f"[METRICA] Inicializacao: pronto em {total} desde o inicio do processo"
+                f" (imports {self.antes_da_sequencia * 1000:.0f} ms) | " + " | ".join(partes))
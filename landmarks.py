@@ -0,0 +1,107 @@
+"""
+Landmarks do MediaPipe Pose em arrays NumPy reutilizados.
+
+`LandmarkAdapter` copia o resultado do Pose (NormalizedLandmarkList) para um
+array contiguo (33, 4) float32 com (x, y, z, visibilidade) numa unica passada,
+sem criar listas por landmark nem consultar o enum PoseLandmark. O caminho
+rapido le os floats direto da serializacao do protobuf: cada landmark e uma
+mensagem de tamanho fixo (x, y, z e visibilidade sempre preenchidos pelo Pose,
+presenca opcional), entao os 132 valores sao uma view com strides sobre os
+bytes. Se o formato nao for o esperado, os campos sao lidos um a um.
+
+`BodyFeatures` calcula sobre esse array, com operacoes vetorizadas que
+escrevem em buffers do proprio objeto, as medidas usadas pelo FallDetector:
+ponto medio dos quadris e dos ombros, angulo do tronco, caixa do corpo em
+pixels e razao altura/largura.
+"""
+
+import itertools
+import math
+import operator
+
+import numpy as np
+
+# Indices dos landmarks do MediaPipe Pose
+NOSE = 0
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+RIGHT_KNEE = 26
+RIGHT_ANKLE = 28
+NUM_LANDMARKS = 33
+
+# Ombros e quadris sao vizinhos no array: as fatias 11:13 e 23:25 sao views, sem copia
+OMBROS = slice(LEFT_SHOULDER, RIGHT_SHOULDER + 1)
+QUADRIS = slice(LEFT_HIP, RIGHT_HIP + 1)
+
+_campos = operator.attrgetter('x', 'y', 'z', 'visibility')
+
+# Serializacao de um NormalizedLandmark: 0x0a <tamanho> e os campos float (tag de 1 byte + 4 bytes)
+# x=0x0d, y=0x15, z=0x1d, visibility=0x25 e, quando preenchido, presence=0x2d
+_TAGS = ((2, 0x0d), (7, 0x15), (12, 0x1d), (17, 0x25))
+_TAMANHOS_REGISTRO = (22, 27)   # sem e com o campo presence
+
+
+class LandmarkAdapter:
+    """Buffer (33, 4) float32 preenchido a cada frame com os landmarks do Pose."""
+
+    __slots__ = ('array', '_plano')
+
+    def __init__(self):
+        self.array = np.zeros((NUM_LANDMARKS, 4), np.float32)
+        self._plano = self.array.reshape(-1)
+
+    def preencher(self, pose_landmarks):
+        """Copia `results.pose_landmarks` para o buffer e o retorna; None se ninguem foi detectado."""
+        if not pose_landmarks: return None
+        if not self._da_serializacao(pose_landmarks.SerializeToString()):
+            valores = itertools.chain.from_iterable(map(_campos, pose_landmarks.landmark))
+            self._plano[:] = np.fromiter(valores, np.float32, NUM_LANDMARKS * 4)
+        return self.array
+
+    def _da_serializacao(self, bruto):
+        registro, resto = divmod(len(bruto), NUM_LANDMARKS)
+        if resto or registro not in _TAMANHOS_REGISTRO: return False
+        if bruto[0::registro] != b"\x0a" * NUM_LANDMARKS: return False
+        if bruto[1::registro] != bytes((registro - 2,)) * NUM_LANDMARKS: return False
+        for deslocamento, tag in _TAGS:
+            if bruto[deslocamento::registro] != bytes((tag,)) * NUM_LANDMARKS: return False
+        # x, y, z e visibilidade ficam a 5 bytes um do outro, a partir do byte 3 de cada registro
+        self.array[:] = np.ndarray((NUM_LANDMARKS, 4), '<f4', bruto, 3, (registro, 5))
+        return True
+
+
+class BodyFeatures:
+    """Medidas do corpo de um frame, recalculadas em buffers fixos a cada `calcular`."""
+
+    __slots__ = ('quadril', 'ombro', 'torso_angle', 'caixa', 'aspect_ratio',
+                 '_escala', '_min', '_max', '_torso')
+
+    def __init__(self):
+        self.quadril = np.zeros(2)        # ponto medio dos quadris (x, y) normalizado
+        self.ombro = np.zeros(2)          # ponto medio dos ombros (x, y) normalizado
+        self.torso_angle = 0.0            # graus; ~90 com o tronco na vertical
+        self.caixa = np.zeros(4)          # (x_min, y_min, x_max, y_max) em pixels
+        self.aspect_ratio = 0.0           # altura / largura da caixa
+        self._escala = np.zeros(4)        # (largura, altura, largura, altura)
+        self._min = self.caixa[:2]
+        self._max = self.caixa[2:]
+        self._torso = np.zeros(2)
+
+    def calcular(self, landmarks, largura, altura):
+        """Atualiza as medidas a partir do array (33, 4) de um frame `largura` x `altura`."""
+        np.add.reduce(landmarks[QUADRIS, :2], axis=0, dtype=np.float64, out=self.quadril)
+        self.quadril *= 0.5
+        np.add.reduce(landmarks[OMBROS, :2], axis=0, dtype=np.float64, out=self.ombro)
+        self.ombro *= 0.5
+        np.subtract(self.quadril, self.ombro, out=self._torso)
+        self.torso_angle = abs(math.degrees(math.atan2(self._torso[1], self._torso[0])))
+
+        coordenadas = landmarks[:, :2]
+        np.minimum.reduce(coordenadas, axis=0, out=self._min)
+        np.maximum.reduce(coordenadas, axis=0, out=self._max)
+        self._escala[0::2], self._escala[1::2] = largura, altura
+        self.caixa *= self._escala
+        body_width = float(self.caixa[2] - self.caixa[0])
+        body_height = float(self.caixa[3] - self.caixa[1])
+        self.aspect_ratio = body_height / body_width if body_width > 0 else 0
+        return self
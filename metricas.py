@@ -0,0 +1,199 @@
+"""
+Metricas no formato de exposicao de texto do Prometheus, sem dependencias.
+
+Contadores, gauges e histogramas com buckets fixos, agrupados num `Registry`
+que gera o texto servido em /metrics. No caminho quente cada observacao custa
+uma busca binaria nos limites do bucket e um incremento sob um lock proprio da
+serie; a soma cumulativa dos buckets e a formatacao so acontecem na coleta.
+Valores que ja existem em outro lugar (CPU, RSS, clientes, descartes das
+filas) sao lidos por funcao na hora da coleta, sem custo por frame.
+"""
+
+import bisect
+import math
+import threading
+
+# Segundos; cobrem do passo do detector (~50 us) a uma chamada GSM inteira (~30 s)
+BUCKETS_LATENCIA = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _valor(numero):
+    if math.isinf(numero): return "+Inf" if numero > 0 else "-Inf"
+    if math.isnan(numero): return "NaN"
+    return repr(float(numero)) if not float(numero).is_integer() else str(int(numero))
+
+
+def _rotulos(nomes, valores, extra=None):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra: pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _SerieValor:
+    """Serie de um contador ou gauge: valor incrementado no caminho quente ou lido por funcao."""
+
+    __slots__ = ('valor', 'funcao', '_lock')
+
+    def __init__(self):
+        self.valor = 0.0
+        self.funcao = None
+        self._lock = threading.Lock()
+
+    def inc(self, quantidade=1):
+        with self._lock:
+            self.valor += quantidade
+
+    def set(self, valor):
+        self.valor = valor
+
+    def set_function(self, funcao):
+        """O valor passa a ser `funcao()`, chamada a cada coleta."""
+        self.funcao = funcao
+
+    def ler(self):
+        return self.funcao() if self.funcao else self.valor
+
+
+class _SerieHistograma:
+    __slots__ = ('limites', 'contagens', 'soma', '_lock')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # o ultimo e o bucket +Inf
+        self.soma = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, valor):
+        # bisect_left: um valor igual ao limite conta no bucket "le" dele
+        i = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self.contagens[i] += 1
+            self.soma += valor
+
+    def ler(self):
+        with self._lock:
+            return list(self.contagens), self.soma
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._lock = threading.Lock()
+        if not self.rotulos: self._series[()] = self._nova_serie()  # exposta com 0 desde o inicio
+
+    def labels(self, *valores):
+        """Serie com os valores dos rotulos, na ordem de `rotulos`; criada no primeiro uso e reutilizada."""
+        serie = self._series.get(valores)
+        if serie is None:
+            if len(valores) != len(self.rotulos):
+                raise ValueError(f"{self.nome}: esperados os rotulos {self.rotulos}")
+            with self._lock:
+                serie = self._series.setdefault(valores, self._nova_serie())
+        return serie
+
+    def _nova_serie(self):
+        return _SerieValor()
+
+    def _sem_rotulos(self):
+        if self.rotulos: raise ValueError(f"{self.nome}: use labels({', '.join(self.rotulos)})")
+        return self.labels()
+
+    def exposicao(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._lock:
+            series = list(self._series.items())
+        for valores, serie in series:
+            linhas.extend(self._linhas(valores, serie))
+        return linhas
+
+    def _linhas(self, valores, serie):
+        return [f"{self.nome}{_rotulos(self.rotulos, valores)} {_valor(serie.ler())}"]
+
+
+class Counter(_Metrica):
+    tipo = "counter"
+
+    def inc(self, quantidade=1):
+        self._sem_rotulos().inc(quantidade)
+
+    def set_function(self, funcao):
+        self._sem_rotulos().set_function(funcao)
+
+
+class Gauge(_Metrica):
+    tipo = "gauge"
+
+    def set(self, valor):
+        self._sem_rotulos().set(valor)
+
+    def set_function(self, funcao):
+        self._sem_rotulos().set_function(funcao)
+
+
+class Histogram(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), buckets=BUCKETS_LATENCIA):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(nome, ajuda, rotulos)
+
+    def _nova_serie(self):
+        return _SerieHistograma(self.buckets)
+
+    def observe(self, valor):
+        self._sem_rotulos().observe(valor)
+
+    def _linhas(self, valores, serie):
+        contagens, soma = serie.ler()
+        linhas = []
+        acumulado = 0
+        for limite, contagem in zip(self.buckets + (math.inf,), contagens):
+            acumulado += contagem
+            le = f'le="{_valor(limite)}"'
+            linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, valores, le)} {acumulado}")
+        linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, valores)} {_valor(soma)}")
+        linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, valores)} {acumulado}")
+        return linhas
+
+
+class Registry:
+    """Conjunto de metricas de um processo, exposto por `exposicao()` no formato de texto 0.0.4."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica):
+        with self._lock:
+            if metrica.nome in self._metricas:
+                raise ValueError(f"metrica '{metrica.nome}' ja registrada")
+            self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def counter(self, nome, ajuda, rotulos=()):
+        return self._registrar(Counter(nome, ajuda, rotulos))
+
+    def gauge(self, nome, ajuda, rotulos=()):
+        return self._registrar(Gauge(nome, ajuda, rotulos))
+
+    def histogram(self, nome, ajuda, rotulos=(), buckets=BUCKETS_LATENCIA):
+        return self._registrar(Histogram(nome, ajuda, rotulos, buckets))
+
+    def exposicao(self):
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.exposicao())
+        return "\n".join(linhas) + "\n"
@@ -0,0 +1,139 @@
+"""
+Monitoramento de uma camera: pose, maquina de estados e overlay.
+
+`CameraMonitor` junta a instancia do MediaPipe Pose, o FallDetector e as
+otimizacoes da inferencia (gate de movimento, taxa adaptativa e recorte ROI)
+de uma unica camera. O app.py usa um monitor; o multicamera.py cria um por
+processo, sem estado compartilhado entre as cameras.
+"""
+
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from inferencia_adaptativa import AdaptiveScheduler
+from landmarks import LandmarkAdapter
+from movimento import MotionGate
+from roi import RoiCropper
+
+mp_pose = mp.solutions.pose
+mp_drawing = mp.solutions.drawing_utils
+
+
+class CameraMonitor:
+    """Estima a pose dos frames de uma camera e atualiza o detector de queda dela."""
+
+    def __init__(self, detector, inferencia_adaptativa=True, gate_movimento=True, usar_roi=True):
+        self.pose = mp_pose.Pose(min_detection_confidence=0.6, model_complexity=1)
+        # Recortes vao para uma instancia propria do Pose: o rastreamento entre chamadas do modo video
+        # de cada instancia ve sempre o mesmo tipo de entrada (frame inteiro, ou recorte centrado no corpo)
+        self.pose_recorte = mp_pose.Pose(min_detection_confidence=0.6, model_complexity=1) if usar_roi else None
+        self.detector = detector
+        # Em "Estavel" e sem movimento a pose e estimada a 5 Hz; qualquer atividade volta para todo frame
+        self.agendador = AdaptiveScheduler(taxa_base=5.0, limiar_movimento=3.0, tempo_calmo=2.0) if inferencia_adaptativa else None
+        # Frames quase identicos ao ultimo inferido (quarto vazio, pessoa dormindo) reaproveitam a pose anterior
+        self.gate = MotionGate(limiar_pixel=12, fracao_minima=0.005, intervalo_maximo=2.0) if gate_movimento else None
+        # A pose do proximo frame e estimada num recorte em volta da ultima caixa do corpo
+        self.roi = RoiCropper(margem=0.25, lado_minimo=96, area_maxima=0.6) if usar_roi else None
+        self.ultimo_resultado = None
+        self.landmarks = LandmarkAdapter()
+        self.duracao_estado = 0.0  # tempo do ultimo detector.step (s)
+        self.t_decisao = None      # instante (time.time()) passado ao detector no ultimo frame
+
+    def aquecer(self, largura=640, altura=480):
+        """Roda o Pose uma vez num frame preto: a primeira chamada carrega os modelos e cria o delegate."""
+        t0 = time.monotonic()
+        self.pose.process(np.zeros((altura, largura, 3), np.uint8))
+        if self.pose_recorte: self.pose_recorte.process(np.zeros((altura // 2, largura // 4, 3), np.uint8))
+        return time.monotonic() - t0
+
+    def estimar_pose(self, frame):
+        """
+        pose.process no recorte em volta do ultimo corpo; sem pose no recorte, tenta o frame inteiro.
+
+        O retorno custa uma segunda inferencia no mesmo frame; o RoiCropper mede quantas vezes
+        isso acontece e o tempo de cada tipo de chamada, para o relatorio pesar o ganho real.
+        """
+        h, w, _ = frame.shape
+        regiao = self.roi.regiao(self.detector.caixa_corpo, w, h) if self.roi else None
+        if regiao is not None:
+            x0, y0, x1, y1 = regiao
+            t0 = time.monotonic()
+            results = self.pose_recorte.process(cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2RGB))
+            self.roi.registrar_recorte(time.monotonic() - t0, results.pose_landmarks is not None)
+            if results.pose_landmarks:
+                self.roi.mapear(results.pose_landmarks, regiao, w, h)
+                return results
+        t0 = time.monotonic()
+        results = self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if self.roi: self.roi.registrar_frame_inteiro(time.monotonic() - t0)
+        return results
+
+    def inferir(self, pacote):
+        """
+        Preenche `pacote.results` e `pacote.estado`; pula o MediaPipe quando o gate ou a taxa base permitem.
+
+        Retorna True se a pose foi estimada neste frame e False se a anterior foi reaproveitada.
+        """
+        pacote.frame = cv2.flip(pacote.frame, 1)
+        agora = time.monotonic()
+        if self.ultimo_resultado is None or (
+                (self.gate is None or self.gate.mudou(pacote.frame, agora))
+                and (self.agendador is None or self.agendador.deve_inferir(agora))):
+            t_pose = time.monotonic()
+            pacote.results = self.ultimo_resultado = self.estimar_pose(pacote.frame)
+            if self.gate: self.gate.registrar_inferencia(agora, time.monotonic() - t_pose)
+            h, w, _ = pacote.frame.shape
+            self.detector.largura, self.detector.altura = w, h
+            t_estado = time.monotonic()
+            landmarks = self.landmarks.preencher(pacote.results.pose_landmarks)
+            self.t_decisao = time.time()
+            # Frames pulados pela taxa base (nao os descartados pela fila) escalam o limiar de velocidade
+            self.detector.step(landmarks, self.t_decisao, self.agendador.pulados_antes if self.agendador else 0)
+            self.duracao_estado = time.monotonic() - t_estado
+            if self.agendador:
+                self.agendador.registrar(agora, self.detector.current_state,
+                                         self.detector.previous_hip_y if landmarks is not None else None)
+            inferido = True
+        else:
+            # Frame sem inferencia (parado ou fora da taxa base): mantem a ultima pose e
+            # so deixa o relogio de confirmacao correr, entao FALL_CONFIRM_TIME e respeitado
+            pacote.results = self.ultimo_resultado
+            self.t_decisao = time.time()
+            self.detector.tick(self.t_decisao)
+            inferido = False
+        # Copia do estado no instante da decisao, usada pelo estagio de renderizacao
+        pacote.estado = self.detector.estado()
+        return inferido
+
+    @staticmethod
+    def desenhar(pacote):
+        """Desenha landmarks, estado e tempo Instavel sobre o frame do pacote."""
+        frame = pacote.frame
+        estado, confirmada, inicio_instavel = pacote.estado
+        if pacote.results.pose_landmarks:
+            mp_drawing.draw_landmarks(frame, pacote.results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+
+        if confirmada: cv2.putText(frame, "QUEDA CONFIRMADA!", (50, 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 4)
+        cv2.putText(frame, f"Estado: {estado}", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+        if estado == "Instavel" and inicio_instavel is not None:
+             time_in_unstable_state = time.time() - inicio_instavel
+             cv2.putText(frame, f"Tempo Instavel: {time_in_unstable_state:.1f}s", (50, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+
+    def relatorios(self, agora):
+        """Linhas [METRICA] das otimizacoes de inferencia ativas."""
+        linhas = []
+        if self.agendador: linhas.append(self.agendador.relatorio(agora))
+        if self.roi: linhas.append(self.roi.relatorio())
+        if self.gate: linhas.append(self.gate.relatorio())
+        return linhas
+
+
+def codificar_jpeg(frame, tier):
+    """JPEG do frame na resolucao e qualidade do tier (largura 0 = resolucao original)."""
+    if tier.largura and (tier.largura, tier.altura) != (frame.shape[1], frame.shape[0]):
+        frame = cv2.resize(frame, (tier.largura, tier.altura), interpolation=cv2.INTER_AREA)
+    ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, tier.qualidade])
+    return buffer.tobytes()
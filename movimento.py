@@ -0,0 +1,60 @@
+"""
+Gate de movimento barato antes da estimativa de pose.
+
+Cada frame e reduzido para uma miniatura em tons de cinza e comparado com a
+miniatura do ultimo frame que passou pelo MediaPipe. Se quase nenhum pixel
+mudou (quarto vazio, pessoa dormindo), a pose e o estado anteriores sao
+reaproveitados e `pose.process` nao roda. A comparacao e sempre contra a
+referencia da ultima inferencia, entao uma mudanca lenta se acumula ate
+ultrapassar o limiar em vez de passar despercebida frame a frame.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decide se o frame mudou o suficiente para justificar uma nova inferencia."""
+
+    def __init__(self, limiar_pixel=12, fracao_minima=0.005, largura=64, altura=48, intervalo_maximo=2.0):
+        self.limiar_pixel = limiar_pixel      # diferenca em niveis de cinza para um pixel contar como mudado
+        self.fracao_minima = fracao_minima    # fracao de pixels mudados que libera a inferencia
+        self.tamanho = (largura, altura)
+        self.intervalo_maximo = intervalo_maximo  # segundos; forca uma inferencia mesmo sem movimento
+        self._referencia = None
+        self._tempo_referencia = float('-inf')
+        self._atual = None
+        self.pulados = 0
+        self.inferencias = 0
+        self.custo_gate = 0.0
+        self.custo_inferencia = 0.0
+
+    def mudou(self, frame, agora):
+        t0 = time.monotonic()
+        miniatura = cv2.resize(frame, self.tamanho, interpolation=cv2.INTER_AREA)
+        self._atual = cv2.cvtColor(miniatura, cv2.COLOR_BGR2GRAY)
+        if self._referencia is None or agora - self._tempo_referencia >= self.intervalo_maximo:
+            mudou = True
+        else:
+            diferenca = cv2.absdiff(self._atual, self._referencia)
+            mudou = np.count_nonzero(diferenca > self.limiar_pixel) > self.fracao_minima * diferenca.size
+        # O frame liberado so conta em `registrar_inferencia`: a taxa adaptativa ainda pode pula-lo
+        if not mudou: self.pulados += 1
+        self.custo_gate += time.monotonic() - t0
+        return mudou
+
+    def registrar_inferencia(self, agora, duracao):
+        """O ultimo frame avaliado passou pelo MediaPipe: vira a nova referencia."""
+        self._referencia, self._tempo_referencia = self._atual, agora
+        self.inferencias += 1
+        self.custo_inferencia += duracao
+
+    def relatorio(self):
+        total = self.inferencias + self.pulados
+        if not total: return "[METRICA] Gate de movimento: sem frames"
+        custo_pose = self.custo_inferencia / self.inferencias if self.inferencias else 0.0
+        poupado = self.pulados * custo_pose - self.custo_gate
+        return (f"[METRICA] Gate de movimento: {self.pulados / total:.0%} dos frames sem pose.process ({self.pulados}/{total})"
+                f" | CPU poupada ~{poupado:.1f}s (pose {custo_pose * 1000:.1f} ms, gate {self.custo_gate / total * 1000:.2f} ms/frame)")
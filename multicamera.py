@@ -0,0 +1,326 @@
+# multicamera.py - Monitoramento de varios comodos, um processo por camera
+"""
+Modo multi-camera do sistema de deteccao de quedas.
+
+Cada camera roda em um processo proprio, com sua instancia do MediaPipe Pose,
+seu FallDetector e seu pipeline de captura/inferencia, entao as cameras usam
+nucleos diferentes do Raspberry Pi em vez de disputar o GIL de um processo so.
+
+O processo principal e dono do modem GSM e do servidor web:
+  - recebe dos trabalhadores os eventos de queda e envia os alertas com o nome
+    do comodo para os destinos configurados para aquele comodo;
+  - recebe os JPEGs (so enquanto alguem assiste aquele comodo) e os difunde em
+    /video_feed/<sala>;
+  - junta o estado de todos os comodos em /status;
+  - reinicia o processo de um comodo que morreu (ou cuja camera nao abriu),
+    com espera crescente entre as tentativas.
+
+Uso:
+    python multicamera.py                                   # comodos de CAMERAS
+    python multicamera.py --camera Quarto=0 --camera Banheiro=/dev/video2
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import psutil
+from flask import Flask, Response, jsonify, render_template
+
+from alertas import AlertDispatcher, alertar_queda, criar_handlers_gsm
+from broadcast import FrameHub, TIERS
+from gsm_modem import abrir_modem
+
+# --- CONFIGURACAO DOS COMODOS ---
+# fonte: indice ou caminho da camera; destinos: numeros que recebem o SMS (a chamada vai para o primeiro)
+numero_alerta = "+5535999092107"
+CAMERAS = {
+    "Quarto": {"fonte": 0, "destinos": [numero_alerta]},
+    "Banheiro": {"fonte": 2, "destinos": [numero_alerta]},
+    "Escritorio": {"fonte": 4, "destinos": [numero_alerta]},
+}
+porta_serial_gsm = "/dev/serial0"
+
+# Tier unico codificado pelos trabalhadores: os JPEGs atravessam a fila entre processos
+TIER_MULTICAMERA = TIERS['media']
+INTERVALO_STATUS = 1.0
+
+# Reinicio de um processo de camera que morreu: espera dobra a cada falha seguida, ate o maximo,
+# e volta ao minimo se o processo tinha rodado por TEMPO_ESTAVEL antes de morrer
+ESPERA_REINICIO_MIN = 1.0
+ESPERA_REINICIO_MAX = 60.0
+TEMPO_ESTAVEL = 60.0
+
+
+# --- PROCESSO DE UMA CAMERA ---
+def trabalhador_camera(sala, fonte, eventos, frames, espectadores, parar):
+    """
+    Captura, pose e maquina de estados de um comodo; roda em um processo separado.
+
+    `frames` e a fila de um lugar so deste comodo: o JPEG novo substitui o que o
+    pai ainda nao leu, entao um comodo nunca ocupa o espaco dos outros.
+    """
+    # Imports pesados so dentro do processo filho (spawn): o pai nao carrega o MediaPipe
+    import cv2
+    from fall_detector import FallDetector
+    from monitor import CameraMonitor, codificar_jpeg
+    from pipeline import CaptureStage, LatestQueue, ProcessingStage, StageStats
+
+    cap = cv2.VideoCapture(fonte)
+    if not cap.isOpened():
+        eventos.put(("erro", sala, f"camera {fonte} nao abriu"))
+        return
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) # V4L2: nao deixar frames velhos acumulando no driver
+
+    detector = FallDetector(ao_confirmar=lambda tempo_confirmacao: eventos.put(("queda", sala, tempo_confirmacao)))
+    monitor = CameraMonitor(detector)
+    fila_captura = LatestQueue(1)
+    stats_captura, stats_inferencia = StageStats("Captura"), StageStats("Inferencia")
+    ultimo = {"status": 0.0, "frame": 0.0}
+
+    def inferir(pacote):
+        monitor.inferir(pacote)
+        agora = time.monotonic()
+        # Overlay e JPEG so enquanto o processo principal tem clientes para este comodo
+        if espectadores.value and agora - ultimo["frame"] >= 0.9 / TIER_MULTICAMERA.max_fps:
+            ultimo["frame"] = agora
+            monitor.desenhar(pacote)
+            publicar_frame(frames, codificar_jpeg(pacote.frame, TIER_MULTICAMERA))
+        if agora - ultimo["status"] >= INTERVALO_STATUS:
+            ultimo["status"] = agora
+            estado, confirmada, inicio_instavel = pacote.estado
+            eventos.put(("status", sala, {
+                "estado": estado, "queda_confirmada": confirmada, "inicio_instavel": inicio_instavel,
+                "captura": stats_captura.relatorio(), "inferencia": stats_inferencia.relatorio(),
+                "descartados_captura": fila_captura.descartados,
+                "metricas": monitor.relatorios(agora), "pid": os.getpid(),
+            }))
+
+    captura = CaptureStage(cap, fila_captura, stats_captura)
+    inferencia = ProcessingStage("inferencia", inferir, fila_captura, None, stats_inferencia)
+    captura.start(); inferencia.start()
+    while not parar.is_set() and inferencia.is_alive():
+        parar.wait(0.5)
+    captura.parar()
+    inferencia.join(timeout=2)
+    cap.release()
+    eventos.put(("fim", sala, None))
+
+
+def publicar_frame(frames, jpeg):
+    """Latest-wins entre processos: troca o frame ainda nao lido pelo novo, sem nunca bloquear."""
+    try:
+        frames.put_nowait(jpeg)
+    except queue.Full:
+        try: frames.get_nowait()
+        except queue.Empty: pass
+        # Se o pai pegou o antigo no meio tempo o lugar esta livre; senao o frame novo e descartado
+        try: frames.put_nowait(jpeg)
+        except queue.Full: pass
+
+
+# --- PROCESSO PRINCIPAL ---
+class Sala:
+    """Estado do lado do processo principal para um comodo."""
+
+    def __init__(self, nome, fonte, destinos, contexto):
+        self.nome = nome
+        self.fonte = fonte
+        self.destinos = destinos
+        self.hub = FrameHub()
+        self.espectadores = contexto.Value('b', 0, lock=False)
+        self.frames = None  # fila de um lugar, recriada a cada processo
+        self.status = {}
+        self.atualizado_em = None
+        self.erro = None
+        self.processo = None
+        self.iniciado_em = None
+        self.reinicios = 0
+        self.espera_reinicio = ESPERA_REINICIO_MIN
+        self.reiniciar_em = None  # instante (monotonic) do proximo reinicio, com o processo morto
+
+    def as_dict(self):
+        return {"sala": self.nome, "fonte": self.fonte, "ativo": bool(self.processo and self.processo.is_alive()),
+                "pid": self.processo.pid if self.processo else None, "clientes": self.hub.clientes,
+                "atualizado_em": self.atualizado_em, "erro": self.erro, "reinicios": self.reinicios,
+                **self.status}
+
+
+class MultiCameraMonitor:
+    """Inicia um processo por comodo e encaminha seus eventos, frames e alertas."""
+
+    def __init__(self, cameras, modem):
+        # spawn: o processo principal ja tem threads (Flask, despachante, leitor GSM)
+        self.contexto = multiprocessing.get_context("spawn")
+        self.salas = {nome: Sala(nome, cfg["fonte"], cfg["destinos"], self.contexto) for nome, cfg in cameras.items()}
+        self.eventos = self.contexto.Queue()
+        self.parar = self.contexto.Event()
+        self.modem = modem
+        self.despachante = AlertDispatcher(criar_handlers_gsm(modem))
+        self._processos_cpu = {}  # pid -> psutil.Process, para o cpu_percent entre relatorios
+
+    def iniciar(self):
+        self.despachante.start()
+        self._processo_cpu(os.getpid())
+        for sala in self.salas.values():
+            self._iniciar_sala(sala)
+            threading.Thread(target=self._receber_frames, args=(sala,), name=f"frames-{sala.nome}", daemon=True).start()
+        threading.Thread(target=self._receber_eventos, name="eventos", daemon=True).start()
+        threading.Thread(target=self._supervisionar, name="supervisor", daemon=True).start()
+
+    def _iniciar_sala(self, sala):
+        # Fila nova a cada processo: um trabalhador morto no meio de um get/put pode deixar a anterior travada
+        sala.frames = self.contexto.Queue(maxsize=1)
+        sala.processo = self.contexto.Process(
+            target=trabalhador_camera, name=f"camera-{sala.nome}", daemon=True,
+            args=(sala.nome, sala.fonte, self.eventos, sala.frames, sala.espectadores, self.parar))
+        sala.processo.start()
+        sala.iniciado_em, sala.reiniciar_em = time.monotonic(), None
+        self._processo_cpu(sala.processo.pid)
+        print(f"Camera {sala.fonte} -> {sala.nome} (pid {sala.processo.pid})")
+
+    def _processo_cpu(self, pid):
+        try:
+            processo = self._processos_cpu[pid] = psutil.Process(pid)
+            processo.cpu_percent() # primeira leitura so define a referencia
+        except psutil.NoSuchProcess:
+            pass
+
+    def _supervisionar(self):
+        """Reinicia o processo de um comodo que morreu, com espera crescente entre as tentativas."""
+        while not self.parar.wait(0.5):
+            agora = time.monotonic()
+            for sala in self.salas.values():
+                if sala.processo.is_alive(): continue
+                if sala.reiniciar_em is None:
+                    # Morreu agora: um processo que rodou bem por TEMPO_ESTAVEL recomeca da espera minima
+                    if agora - sala.iniciado_em >= TEMPO_ESTAVEL:
+                        sala.espera_reinicio = ESPERA_REINICIO_MIN
+                    sala.reiniciar_em = agora + sala.espera_reinicio
+                    sala.erro = sala.erro or f"processo encerrado (codigo {sala.processo.exitcode})"
+                    self._processos_cpu.pop(sala.processo.pid, None)
+                    print(f"[{sala.nome}] Processo da camera parou (codigo {sala.processo.exitcode});"
+                          f" reiniciando em {sala.espera_reinicio:.0f}s")
+                elif agora >= sala.reiniciar_em:
+                    sala.reinicios += 1
+                    sala.espera_reinicio = min(ESPERA_REINICIO_MAX, 2 * sala.espera_reinicio)
+                    self._iniciar_sala(sala)
+
+    def encerrar(self):
+        self.parar.set()
+        for sala in self.salas.values():
+            if sala.processo: sala.processo.join(timeout=5)
+        self.despachante.parar()
+
+    def _receber_eventos(self):
+        while True:
+            # Um evento com problema (ou um erro no envio do alerta) nao pode parar os alertas dos outros comodos
+            try:
+                self._tratar_evento(*self.eventos.get())
+            except Exception as e:
+                print(f"[MULTICAMERA] Erro ao tratar evento de camera: {e!r}")
+
+    def _tratar_evento(self, tipo, nome, dados):
+        sala = self.salas[nome]
+        if tipo == "status":
+            sala.status, sala.atualizado_em, sala.erro = dados, time.time(), None
+        elif tipo == "queda":
+            print(f"[{nome}] Queda confirmada: alertando {', '.join(sala.destinos)}")
+            alertar_queda(self.despachante, sala.destinos, nome, dados)
+        elif tipo == "erro":
+            sala.erro = dados
+            print(f"[{nome}] ERRO: {dados}")
+        elif tipo == "fim":
+            print(f"[{nome}] Processo da camera encerrado")
+
+    def _receber_frames(self, sala):
+        while not self.parar.is_set():
+            try:
+                sala.hub.publicar(TIER_MULTICAMERA, sala.frames.get(timeout=0.5))
+            except queue.Empty:
+                pass
+            except (EOFError, OSError):
+                time.sleep(0.5) # fila do processo anterior fechada durante um reinicio
+            # Avisa o trabalhador se ainda ha alguem assistindo o comodo dele
+            sala.espectadores.value = sala.hub.clientes > 0
+
+    def status(self):
+        return [sala.as_dict() for sala in self.salas.values()]
+
+    def relatorio(self):
+        """Linha [METRICA] com CPU total (pai + cameras) e vazao de inferencia por comodo."""
+        cpu = 0.0
+        for p in list(self._processos_cpu.values()):
+            try: cpu += p.cpu_percent()
+            except psutil.NoSuchProcess: pass
+        partes = []
+        for sala in self.salas.values():
+            inferencia = sala.status.get("inferencia")
+            if inferencia and sala.processo and sala.processo.is_alive():
+                partes.append(f"{sala.nome}: {sala.status['estado']}, {inferencia['fps']:.1f} fps"
+                              f" ({inferencia['duracao_media_ms']:.0f} ms/frame)")
+            else:
+                partes.append(f"{sala.nome}: {sala.erro or 'sem dados'}")
+        return f"[METRICA] Multicamera | CPU total: {cpu:.1f}% | " + " | ".join(partes)
+
+
+def criar_app(monitor):
+    app = Flask(__name__)
+
+    def generate_frames(hub):
+        for frame in hub.subscribe(TIER_MULTICAMERA):
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+
+    @app.route('/')
+    def index(): return render_template('multicamera.html', salas=list(monitor.salas))
+    @app.route('/video_feed/<sala>')
+    def video_feed(sala):
+        if sala not in monitor.salas: return f"Comodo desconhecido: {sala}", 404
+        return Response(generate_frames(monitor.salas[sala].hub), mimetype='multipart/x-mixed-replace; boundary=frame')
+    @app.route('/status')
+    def status(): return jsonify(salas=monitor.status())
+    @app.route('/alertas')
+    def alertas(): return jsonify(pendentes=monitor.despachante.pendentes(), alertas=monitor.despachante.status(),
+                                 latencia_gsm=monitor.modem.estatisticas() if monitor.modem else {})
+    return app
+
+
+def cameras_da_linha_de_comando(especificacoes):
+    """['Quarto=0', 'Banheiro=/dev/video2'] -> dicionario no formato de CAMERAS."""
+    cameras = {}
+    for especificacao in especificacoes:
+        nome, _, fonte = especificacao.partition("=")
+        if not nome or not fonte:
+            raise argparse.ArgumentTypeError(f"Camera invalida: {especificacao} (use SALA=INDICE ou SALA=/dev/videoN)")
+        destinos = CAMERAS.get(nome, {}).get("destinos", [numero_alerta])
+        cameras[nome] = {"fonte": int(fonte) if fonte.isdigit() else fonte, "destinos": destinos}
+    return cameras
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Deteccao de quedas com uma camera por comodo")
+    parser.add_argument("--camera", action="append", default=[], metavar="SALA=FONTE",
+                        help="comodo e indice/caminho da camera (repetivel); padrao: CAMERAS")
+    parser.add_argument("--porta-gsm", default=porta_serial_gsm)
+    parser.add_argument("--porta", type=int, default=5000)
+    args = parser.parse_args()
+
+    monitor = MultiCameraMonitor(cameras_da_linha_de_comando(args.camera) if args.camera else CAMERAS,
+                                 abrir_modem(args.porta_gsm))
+    monitor.iniciar()
+
+    def imprimir_metricas():
+        # <<< COLETA DE METRICAS DE SISTEMA >>>
+        while True:
+            time.sleep(5.0)
+            print(monitor.relatorio())
+    threading.Thread(target=imprimir_metricas, name="metricas", daemon=True).start()
+
+    try:
+        criar_app(monitor).run(host='0.0.0.0', port=args.porta, debug=False)
+    finally:
+        monitor.encerrar()
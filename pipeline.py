@@ -0,0 +1,173 @@
+"""
+Pipeline em estagios do app: captura -> inferencia -> renderizacao.
+
+Cada estagio roda em sua propria thread e os estagios sao ligados por filas
+"latest-wins" de tamanho limitado: quando um estagio fica para tras, o frame
+mais antigo e descartado em vez de acumular, de modo que o detector trabalha
+sempre sobre o frame mais recente da camera.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class LatestQueue:
+    """Fila limitada onde, quando cheia, o item mais antigo e descartado."""
+
+    def __init__(self, maxsize=1):
+        self._itens = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.fechada = False
+        self.descartados = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._itens) == self._itens.maxlen:
+                self.descartados += 1
+            self._itens.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Retorna o proximo item, ou None em timeout / fila fechada e vazia."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._itens or self.fechada, timeout)
+            return self._itens.popleft() if self._itens else None
+
+    def close(self):
+        with self._cond:
+            self.fechada = True
+            self._cond.notify_all()
+
+
+class StageStats:
+    """
+    Vazao, tempo de processamento e idade do frame na saida de um estagio.
+
+    `histograma` (opcional, serie de metricas.Histogram) recebe tambem cada
+    tempo de processamento, para o /metrics.
+    """
+
+    def __init__(self, nome, janela=256, histograma=None):
+        self.nome = nome
+        self.histograma = histograma
+        self.total = 0
+        self._lock = threading.Lock()
+        self._inicio_janela = time.monotonic()
+        self._frames_janela = 0
+        self._duracoes = deque(maxlen=janela)
+        self._latencias = deque(maxlen=janela)
+
+    def registrar(self, duracao, latencia=None):
+        with self._lock:
+            self.total += 1
+            self._frames_janela += 1
+            self._duracoes.append(duracao)
+            if latencia is not None:
+                self._latencias.append(latencia)
+        if self.histograma: self.histograma.observe(duracao)
+
+    def duracao_media(self):
+        """Tempo medio de processamento (s) nas ultimas amostras, sem iniciar nova janela."""
+        with self._lock:
+            return sum(self._duracoes) / len(self._duracoes) if self._duracoes else 0.0
+
+    def relatorio(self):
+        """Retorna as metricas da janela atual e inicia uma nova janela de vazao."""
+        with self._lock:
+            agora = time.monotonic()
+            decorrido = agora - self._inicio_janela
+            fps = self._frames_janela / decorrido if decorrido > 0 else 0.0
+            self._inicio_janela = agora
+            self._frames_janela = 0
+            duracoes = list(self._duracoes)
+            latencias = list(self._latencias)
+        return {
+            'estagio': self.nome,
+            'fps': fps,
+            'total': self.total,
+            'duracao_media_ms': 1000 * sum(duracoes) / len(duracoes) if duracoes else 0.0,
+            'latencia_media_ms': 1000 * sum(latencias) / len(latencias) if latencias else None,
+            'latencia_max_ms': 1000 * max(latencias) if latencias else None,
+        }
+
+
+class FramePacket:
+    """Frame capturado e tudo o que os estagios seguintes anexam a ele."""
+
+    __slots__ = ('seq', 't_captura', 'frame', 'results', 'estado')
+
+    def __init__(self, seq, t_captura, frame):
+        self.seq = seq
+        self.t_captura = t_captura
+        self.frame = frame
+        self.results = None
+        self.estado = None
+
+
+class CaptureStage(threading.Thread):
+    """Le a camera continuamente e publica sempre o frame mais recente."""
+
+    def __init__(self, cap, saida, stats):
+        super().__init__(name="captura", daemon=True)
+        self.cap = cap
+        self.saida = saida
+        self.stats = stats
+        self._parar = threading.Event()
+
+    def run(self):
+        seq = 0
+        while not self._parar.is_set():
+            t0 = time.monotonic()
+            success, frame = self.cap.read()
+            if not success: break
+            # Instante em que o frame ficou disponivel: inicio da latencia "vidro -> decisao"
+            t_captura = time.monotonic()
+            seq += 1
+            self.saida.put(FramePacket(seq, t_captura, frame))
+            self.stats.registrar(t_captura - t0)
+        self.saida.close()
+
+    def parar(self):
+        self._parar.set()
+
+
+class ProcessingStage(threading.Thread):
+    """Aplica `funcao` a cada pacote da entrada e envia o resultado para a saida."""
+
+    def __init__(self, nome, funcao, entrada, saida, stats):
+        super().__init__(name=nome, daemon=True)
+        self.funcao = funcao
+        self.entrada = entrada
+        self.saida = saida
+        self.stats = stats
+
+    def run(self):
+        while True:
+            pacote = self.entrada.get(timeout=0.5)
+            if pacote is None:
+                if self.entrada.fechada: break
+                continue
+            t0 = time.monotonic()
+            resultado = self.funcao(pacote)
+            t1 = time.monotonic()
+            # Latencia = idade do frame ao sair deste estagio (desde a captura)
+            self.stats.registrar(t1 - t0, t1 - pacote.t_captura)
+            if resultado is not None and self.saida is not None:
+                self.saida.put(resultado)
+        if self.saida is not None:
+            self.saida.close()
+
+
+def formatar_relatorio(stats, filas=()):
+    """Monta a linha de [METRICA] com vazao por estagio e frames descartados por fila."""
+    partes = []
+    for s in stats:
+        r = s.relatorio()
+        texto = f"{r['estagio']}: {r['fps']:.1f} fps ({r['duracao_media_ms']:.1f} ms/frame"
+        if r['latencia_media_ms'] is not None:
+            texto += f", idade media {r['latencia_media_ms']:.0f} ms, max {r['latencia_max_ms']:.0f} ms"
+        partes.append(texto + ")")
+    for nome, fila in filas:
+        partes.append(f"descartados {nome}: {fila.descartados}")
+    return "[METRICA] Pipeline | " + " | ".join(partes)
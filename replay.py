@@ -0,0 +1,194 @@
+# replay.py - Reproduz landmarks gravados no FallDetector, com relogio simulado
+"""
+Replay offline da maquina de estados de queda.
+
+Alimenta o mesmo FallDetector do app.py com landmarks gravados, usando como
+relogio os instantes gravados (nenhum sleep, nenhum time.time()), entao um dia
+de telemetria roda em segundos e os limiares podem ser ajustados sem rodar o
+MediaPipe de novo. Fontes aceitas:
+
+  - telemetria do app (telemetria/landmarks_AAAAMMDD.npy): cada registro e
+    reproduzido como no app (step nos frames inferidos, tick nos demais) e as
+    decisoes sao comparadas com as gravadas;
+  - arrays (N, 33, 4) float32 de landmarks por frame, com NaN nos frames sem
+    pessoa (ex.: extraidos de um video de dataset), com relogio frame/fps.
+
+Com --adaptativa, o AdaptiveScheduler do app decide no relogio simulado quais
+frames passam pela pose (os demais so fazem tick), para comparar o instante
+das confirmacoes com e sem a inferencia adaptativa.
+
+Uso:
+    python replay.py telemetria/landmarks_20250101.npy
+    python replay.py telemetria/*.npy --y-velocity 15 --confirmacao 3.0 --transicoes
+    python replay.py video_landmarks.npy --fps 30 --largura 640 --altura 480
+    python replay.py video_landmarks.npy --fps 30 --adaptativa
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from fall_detector import FallDetector
+from inferencia_adaptativa import AdaptiveScheduler
+from landmarks import NUM_LANDMARKS
+import telemetria
+
+BLOCO = 65536  # registros convertidos por vez (~35 MB de landmarks float32)
+
+
+class Bloco:
+    """Trecho de uma gravacao pronto para o replay."""
+
+    __slots__ = ('t', 'seq', 'inferido', 'pessoa', 'landmarks', 'estado', 'confirmada')
+
+    def __init__(self, t, seq, inferido, pessoa, landmarks, estado=None, confirmada=None):
+        self.t = t                    # instantes (s) do relogio simulado
+        self.seq = seq                # numero do frame da camera
+        self.inferido = inferido      # True: step com nova pose; False: so tick
+        self.pessoa = pessoa          # landmarks validos
+        self.landmarks = landmarks    # (N, 33, 4) float32
+        self.estado = estado          # decisoes gravadas pelo app (so na telemetria)
+        self.confirmada = confirmada
+
+
+def resolucao_da_telemetria(registros):
+    """(largura, altura) do frame no app, deduzida da caixa em pixels e dos landmarks normalizados."""
+    com_pessoa = np.flatnonzero(registros['flags'] & telemetria.PESSOA)
+    for i in com_pessoa[:100]:
+        registro = registros[i]
+        x_max, y_max = registro['xy'].max(axis=0)
+        if x_max > 0 and y_max > 0:
+            return round(float(registro['caixa'][2]) / float(x_max)), round(float(registro['caixa'][3]) / float(y_max))
+    return None
+
+
+def blocos_telemetria(caminho):
+    registros = telemetria.ler(caminho)
+    for inicio in range(0, len(registros), BLOCO):
+        trecho = registros[inicio:inicio + BLOCO]
+        estados = [telemetria.ESTADOS[c] if c < len(telemetria.ESTADOS) else None for c in trecho['estado'].tolist()]
+        yield Bloco(trecho['t'].tolist(), trecho['seq'].tolist(),
+                    (trecho['flags'] & telemetria.INFERIDO).astype(bool).tolist(),
+                    (trecho['flags'] & telemetria.PESSOA).astype(bool).tolist(),
+                    telemetria.landmarks_de(trecho), estados,
+                    (trecho['flags'] & telemetria.CONFIRMADA).astype(bool).tolist())
+
+
+def blocos_array(caminho, fps):
+    landmarks = np.load(caminho, mmap_mode='r')
+    if landmarks.ndim != 3 or landmarks.shape[1:] != (NUM_LANDMARKS, 4):
+        raise ValueError(f"{caminho}: esperado um array (N, {NUM_LANDMARKS}, 4), encontrado {landmarks.shape}")
+    for inicio in range(0, len(landmarks), BLOCO):
+        trecho = np.ascontiguousarray(landmarks[inicio:inicio + BLOCO], np.float32)
+        indices = range(inicio, inicio + len(trecho))
+        yield Bloco([i / fps for i in indices], [i + 1 for i in indices], [True] * len(trecho),
+                    (~np.isnan(trecho[:, :, 0]).any(axis=1)).tolist(), trecho)
+
+
+class ReplayResult:
+    def __init__(self):
+        self.frames = 0
+        self.inicio = self.fim = None
+        self.transicoes = []    # (t, estado anterior, novo estado)
+        self.alertas = []       # instantes de confirmacao (quando o app enviaria SMS e chamada)
+        self.comparados = 0
+        self.divergencias = []  # (t, decisao gravada, decisao do replay)
+        self.duracao_cpu = 0.0
+
+    @property
+    def duracao_simulada(self):
+        return self.fim - self.inicio if self.frames else 0.0
+
+
+def reproduzir(blocos, detector, resultado=None, agendador=None):
+    """
+    Roda o detector sobre os blocos; registra transicoes, alertas e divergencias das decisoes gravadas.
+
+    Com `agendador` (AdaptiveScheduler), os frames inferidos so passam pela pose quando ele libera.
+    """
+    resultado = resultado or ReplayResult()
+    alertas = resultado.alertas
+    anterior_ao_confirmar = detector.ao_confirmar
+    detector.ao_confirmar = alertas.append
+    anterior = detector.current_state
+    t0 = time.process_time()
+    for bloco in blocos:
+        if resultado.inicio is None and bloco.t: resultado.inicio = bloco.t[0]
+        landmarks = bloco.landmarks
+        for i, t in enumerate(bloco.t):
+            if bloco.inferido[i] and (agendador is None or agendador.deve_inferir(t)):
+                detector.step(landmarks[i] if bloco.pessoa[i] else None, t, agendador.pulados_antes if agendador else 0)
+                if agendador:
+                    agendador.registrar(t, detector.current_state,
+                                        detector.previous_hip_y if bloco.pessoa[i] else None)
+            else:
+                detector.tick(t)
+            estado = detector.current_state
+            if estado != anterior:
+                resultado.transicoes.append((t, anterior, estado))
+                anterior = estado
+            if bloco.estado is not None:
+                resultado.comparados += 1
+                if (estado, detector.fall_confirmed) != (bloco.estado[i], bloco.confirmada[i]):
+                    resultado.divergencias.append((t, (bloco.estado[i], bloco.confirmada[i]), (estado, detector.fall_confirmed)))
+        resultado.frames += len(bloco.t)
+        if bloco.t: resultado.fim = bloco.t[-1]
+    resultado.duracao_cpu += time.process_time() - t0
+    detector.ao_confirmar = anterior_ao_confirmar
+    return resultado
+
+
+def formatar_instante(t, inicio):
+    # Telemetria usa time.time(); arrays de dataset comecam em 0
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)) if t > 1e9 else f"{t - inicio:9.2f}s"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay do FallDetector sobre landmarks gravados")
+    parser.add_argument("arquivos", nargs="+", help="telemetria landmarks_*.npy ou arrays (N, 33, 4)")
+    parser.add_argument("--fps", type=float, default=30.0, help="relogio dos arrays (N, 33, 4) sem instantes")
+    parser.add_argument("--largura", type=int, help="resolucao do frame (padrao: deduzida da telemetria, ou 640)")
+    parser.add_argument("--altura", type=int)
+    parser.add_argument("--y-velocity", type=float, default=20, help="Y_VELOCITY_THRESHOLD (pixels/frame)")
+    parser.add_argument("--torso-vertical", type=float, default=70, help="TORSO_VERTICAL_THRESHOLD (graus)")
+    parser.add_argument("--aspect-ratio", type=float, default=1.2, help="ASPECT_RATIO_UPRIGHT_THRESHOLD")
+    parser.add_argument("--confirmacao", type=float, default=4.5, help="FALL_CONFIRM_TIME (s)")
+    parser.add_argument("--adaptativa", action="store_true", help="simula a inferencia adaptativa do app")
+    parser.add_argument("--transicoes", action="store_true", help="lista cada transicao de estado")
+    parser.add_argument("--verbose", action="store_true", help="mostra os prints [METRICA] do detector")
+    args = parser.parse_args()
+
+    for caminho in args.arquivos:
+        e_telemetria = np.load(caminho, mmap_mode='r').dtype == telemetria.REGISTRO
+        largura, altura = args.largura, args.altura
+        if e_telemetria and not (largura and altura):
+            largura, altura = resolucao_da_telemetria(telemetria.ler(caminho)) or (640, 480)
+        largura, altura = largura or 640, altura or 480
+        detector = FallDetector(fall_confirm_time=args.confirmacao, y_velocity_threshold=args.y_velocity,
+                                torso_vertical_threshold=args.torso_vertical,
+                                aspect_ratio_upright_threshold=args.aspect_ratio, largura=largura, altura=altura)
+        blocos = blocos_telemetria(caminho) if e_telemetria else blocos_array(caminho, args.fps)
+        # Mesmos parametros do CameraMonitor
+        agendador = AdaptiveScheduler(taxa_base=5.0, limiar_movimento=3.0, tempo_calmo=2.0) if args.adaptativa else None
+        # Os prints [METRICA] de cada instabilidade ficam de fora, a nao ser com --verbose
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+            resultado = reproduzir(blocos, detector, agendador=agendador)
+
+        print(f"=== {caminho} ({'telemetria' if e_telemetria else f'array a {args.fps:g} fps'}, {largura}x{altura}) ===")
+        if args.transicoes:
+            for t, de, para in resultado.transicoes:
+                print(f"  {formatar_instante(t, resultado.inicio)}  {de} -> {para}")
+        for t in resultado.alertas:
+            print(f"  {formatar_instante(t, resultado.inicio)}  QUEDA CONFIRMADA -> SMS e chamada")
+        velocidade = resultado.duracao_simulada / resultado.duracao_cpu if resultado.duracao_cpu else float('inf')
+        print(f"[METRICA] Replay: {resultado.frames} frames | {resultado.duracao_simulada:.1f}s simulados em "
+              f"{resultado.duracao_cpu:.3f}s de CPU ({velocidade:.0f}x tempo real) | "
+              f"{len(resultado.transicoes)} transicoes | {len(resultado.alertas)} alertas")
+        if agendador: print(agendador.relatorio(resultado.fim))
+        if resultado.comparados:
+            print(f"[METRICA] Decisoes iguais as gravadas: {resultado.comparados - len(resultado.divergencias)}/{resultado.comparados}")
+            for t, gravada, nova in resultado.divergencias[:10]:
+                print(f"  {formatar_instante(t, resultado.inicio)}  gravado {gravada} | replay {nova}")
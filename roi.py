@@ -0,0 +1,83 @@
+"""
+Recorte da regiao de interesse (ROI) para a estimativa de pose.
+
+A caixa do corpo calculada a partir dos landmarks de um frame (a mesma usada
+na razao de aspecto) vira, com uma margem, o recorte enviado ao MediaPipe no
+frame seguinte. Os landmarks obtidos no recorte sao convertidos de volta para
+coordenadas normalizadas do frame inteiro, de modo que o restante da deteccao
+nao percebe a diferenca.
+
+Quando o recorte nao tem pose, o mesmo frame e processado inteiro: uma segunda
+inferencia. O relatorio mostra quantas vezes isso aconteceu e o tempo medio de
+cada tipo de chamada, e estima o ganho contra processar todo frame inteiro.
+"""
+
+
+class RoiCropper:
+    """Calcula o recorte em volta da ultima caixa do corpo e mapeia os landmarks de volta."""
+
+    def __init__(self, margem=0.25, lado_minimo=96, area_maxima=0.6):
+        self.margem = margem            # fracao da altura/largura do corpo adicionada em cada lado
+        self.lado_minimo = lado_minimo  # pixels; recortes menores que isso sao ampliados
+        self.area_maxima = area_maxima  # acima desta fracao do frame, usa o frame inteiro
+        self.frames = 0
+        self.frames_recortados = 0
+        self.fracao_pixels = 0.0
+        self.retornos_frame_inteiro = 0  # recortes sem pose, processados de novo no frame inteiro
+        self.tempo_recortes = 0.0
+        self.frames_inteiros = 0         # chamadas no frame inteiro, incluindo os retornos
+        self.tempo_frames_inteiros = 0.0
+
+    def regiao(self, caixa, w, h):
+        """Regiao (x0, y0, x1, y1) em pixels para a caixa do corpo, ou None para usar o frame inteiro."""
+        self.frames += 1
+        if caixa is None:
+            self.fracao_pixels += 1.0
+            return None
+        x_min, y_min, x_max, y_max = caixa
+        mx = max((x_max - x_min) * self.margem, (self.lado_minimo - (x_max - x_min)) / 2)
+        my = max((y_max - y_min) * self.margem, (self.lado_minimo - (y_max - y_min)) / 2)
+        x0, y0 = max(0, int(x_min - mx)), max(0, int(y_min - my))
+        x1, y1 = min(w, int(x_max + mx) + 1), min(h, int(y_max + my) + 1)
+        area = (x1 - x0) * (y1 - y0) / float(w * h)
+        if x1 <= x0 or y1 <= y0 or area > self.area_maxima:
+            self.fracao_pixels += 1.0
+            return None
+        self.frames_recortados += 1
+        self.fracao_pixels += area
+        return x0, y0, x1, y1
+
+    def registrar_recorte(self, duracao, achou):
+        self.tempo_recortes += duracao
+        if not achou: self.retornos_frame_inteiro += 1
+
+    def registrar_frame_inteiro(self, duracao):
+        self.frames_inteiros += 1
+        self.tempo_frames_inteiros += duracao
+
+    @staticmethod
+    def mapear(pose_landmarks, regiao, w, h):
+        """Converte, no proprio objeto do MediaPipe, landmarks do recorte para o frame inteiro."""
+        x0, y0, x1, y1 = regiao
+        escala_x, escala_y = (x1 - x0) / w, (y1 - y0) / h
+        desloc_x, desloc_y = x0 / w, y0 / h
+        for lm in pose_landmarks.landmark:
+            lm.x = desloc_x + lm.x * escala_x
+            lm.y = desloc_y + lm.y * escala_y
+            lm.z = lm.z * escala_x  # z usa a mesma escala de x no MediaPipe
+
+    def relatorio(self):
+        if not self.frames: return "[METRICA] ROI: sem frames"
+        falhas = self.retornos_frame_inteiro / self.frames_recortados if self.frames_recortados else 0.0
+        chamadas = (self.frames_recortados + self.frames_inteiros) / self.frames
+        texto = (f"[METRICA] ROI: {self.frames_recortados / self.frames:.0%} dos frames com recorte"
+                 f" | {self.fracao_pixels / self.frames:.0%} dos pixels enviados ao MediaPipe"
+                 f" | recorte sem pose: {self.retornos_frame_inteiro}/{self.frames_recortados} ({falhas:.0%}),"
+                 f" todos refeitos no frame inteiro | {chamadas:.2f} pose.process por frame")
+        if self.frames_recortados and self.frames_inteiros:
+            recorte = self.tempo_recortes / self.frames_recortados
+            inteiro = self.tempo_frames_inteiros / self.frames_inteiros
+            # Ganho real: tempo gasto (recortes + frames inteiros + retornos) contra todo frame inteiro
+            ganho = 1 - (self.tempo_recortes + self.tempo_frames_inteiros) / (self.frames * inteiro)
+            texto += f" | recorte {recorte * 1000:.1f} ms, frame inteiro {inteiro * 1000:.1f} ms | ganho {ganho:.0%}"
+        return texto
@@ -0,0 +1,205 @@
+# sim800l_simulador.py - Modulo SIM800L simulado em um pseudo-terminal (Linux)
+"""
+Simulador do SIM800L sobre um pty, para testar o caminho de alerta sem o
+hardware GSM. O lado "escravo" do pty se comporta como a porta /dev/serial0:
+basta abrir `simulador.porta` com pyserial (ou passar a porta para app.py,
+test_gsm.py, test_gsm_sos.py ou upload_audio.py).
+
+Responde ao subconjunto de comandos AT usado pelo projeto (AT, ATE, AT+CMGF,
+AT+CMGS, ATD, AT+VTS, ATH, AT+FSDRIVE, AT+FSDEL, AT+FSWRITE, AT+CREG?, AT+CSQ),
+com atrasos e erros configuraveis por comando e injecao de URCs.
+"""
+
+import argparse
+import os
+import pty
+import select
+import threading
+import time
+import tty
+
+from gsm_modem import nome_do_comando
+
+CTRL_Z = 0x1A
+ESC = 0x1B
+
+
+class SimuladorSIM800L:
+    """
+    Modulo SIM800L simulado.
+
+    - `atrasos`: segundos ate a resposta, por comando (ex.: {"ATD": 2.0});
+    - `atraso_rede_sms`: tempo entre o Ctrl+Z do texto do SMS e o "+CMGS:";
+    - `atraso_ok_sms`: tempo entre o "+CMGS:" e o OK final do SMS;
+    - `erros`: comandos que respondem com erro (ex.: {"AT+CMGS": "+CMS ERROR: 500"});
+    - `urcs_apos`: URCs enviados apos um comando (ex.: {"ATD": [(5.0, "NO CARRIER")]}).
+    """
+
+    def __init__(self, atrasos=None, atraso_padrao=0.005, atraso_rede_sms=2.0, erros=None,
+                 urcs_apos=None, eco=True, atraso_ok_sms=0.0):
+        self.atrasos = atrasos or {}
+        self.atraso_padrao = atraso_padrao
+        self.atraso_rede_sms = atraso_rede_sms
+        self.atraso_ok_sms = atraso_ok_sms
+        self.erros = erros or {}
+        self.urcs_apos = urcs_apos or {}
+        self.eco = eco
+        self.comandos_recebidos = []
+        self.sms_enviados = []
+        self.arquivos = {}
+        self._mestre, self._escravo = pty.openpty()
+        tty.setraw(self._escravo)
+        self.porta = os.ttyname(self._escravo)
+        self._escrita_lock = threading.Lock()
+        self._parar = threading.Event()
+        self._referencia_sms = 0
+        # Modos de entrada de dados brutos: texto do SMS ou conteudo do AT+FSWRITE
+        self._sms_destino = None
+        self._sms_texto = bytearray()
+        self._arquivo_nome = None
+        self._arquivo_restante = 0
+        self._arquivo_dados = bytearray()
+        self._thread = threading.Thread(target=self._ler_entrada, name="sim800l-simulador", daemon=True)
+
+    # --- Ciclo de vida ---
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join(timeout=1.0)
+        os.close(self._mestre)
+        os.close(self._escravo)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    # --- Saida ---
+    def _escrever(self, dados):
+        with self._escrita_lock:
+            os.write(self._mestre, dados)
+
+    def _responder(self, linhas, atraso=0.0, prompt=False):
+        def enviar():
+            if atraso > 0: time.sleep(atraso)
+            if self._parar.is_set(): return
+            texto = "".join(f"\r\n{linha}\r\n" for linha in linhas)
+            self._escrever(texto.encode() + (b"\r\n> " if prompt else b""))
+        if atraso > 0:
+            threading.Thread(target=enviar, daemon=True).start()
+        else:
+            enviar()
+
+    def injetar_urc(self, linha, atraso=0.0):
+        """Envia um codigo nao solicitado (RING, +CMTI: ..., NO CARRIER, ...)."""
+        self._responder([linha], atraso)
+
+    # --- Entrada ---
+    def _ler_entrada(self):
+        buffer = bytearray()
+        while not self._parar.is_set():
+            prontos, _, _ = select.select([self._mestre], [], [], 0.1)
+            if not prontos: continue
+            try:
+                dados = os.read(self._mestre, 4096)
+            except OSError:
+                break
+            for byte in dados:
+                if self._arquivo_nome is not None:
+                    self._receber_arquivo(byte)
+                elif self._sms_destino is not None:
+                    self._receber_texto_sms(byte)
+                elif byte in (0x0D, 0x0A):
+                    if buffer:
+                        comando = buffer.decode(errors='ignore').strip()
+                        buffer.clear()
+                        if self.eco: self._escrever(comando.encode() + b"\r")
+                        self._tratar_comando(comando)
+                else:
+                    buffer.append(byte)
+
+    def _receber_texto_sms(self, byte):
+        if byte == ESC:
+            self._sms_destino = None
+            self._sms_texto.clear()
+            self._responder(["OK"])
+        elif byte == CTRL_Z:
+            texto = self._sms_texto.decode(errors='ignore')
+            if self.eco: self._escrever(self._sms_texto + b"\x1a")
+            self.sms_enviados.append((self._sms_destino, texto))
+            self._sms_destino = None
+            self._sms_texto.clear()
+            self._referencia_sms += 1
+            if self.atraso_ok_sms > 0:
+                self._responder([f"+CMGS: {self._referencia_sms}"], self.atraso_rede_sms)
+                self._responder(["OK"], self.atraso_rede_sms + self.atraso_ok_sms)
+            else:
+                self._responder([f"+CMGS: {self._referencia_sms}", "OK"], self.atraso_rede_sms)
+        else:
+            self._sms_texto.append(byte)
+
+    def _receber_arquivo(self, byte):
+        self._arquivo_dados.append(byte)
+        self._arquivo_restante -= 1
+        if self._arquivo_restante == 0:
+            self.arquivos[self._arquivo_nome] = bytes(self._arquivo_dados)
+            self._arquivo_nome = None
+            self._arquivo_dados.clear()
+            self._responder(["OK"], self.atrasos.get("AT+FSWRITE-DADOS", self.atraso_padrao))
+
+    def _tratar_comando(self, comando):
+        self.comandos_recebidos.append((time.time(), comando))
+        nome = nome_do_comando(comando)
+        atraso = self.atrasos.get(nome, self.atraso_padrao)
+
+        for espera, urc in self.urcs_apos.get(nome, ()):
+            self.injetar_urc(urc, atraso + espera)
+
+        if nome in self.erros:
+            self._responder([self.erros[nome]], atraso)
+        elif nome in ("AT", "ATE0", "ATE1", "AT+CMGF", "ATH", "AT+VTS", "AT+FSDRIVE") or nome.startswith("ATD"):
+            if nome == "ATE0": self.eco = False
+            if nome == "ATE1": self.eco = True
+            self._responder(["OK"], atraso)
+        elif nome == "AT+CMGS":
+            self._sms_destino = comando.split("=", 1)[1].strip('"')
+            self._responder([], atraso, prompt=True)
+        elif nome == "AT+FSDEL":
+            existia = self.arquivos.pop(comando.split("=", 1)[1], None) is not None
+            self._responder(["OK" if existia else "ERROR"], atraso)
+        elif nome == "AT+FSWRITE":
+            arquivo, _modo, tamanho, _timeout = comando.split("=", 1)[1].split(",")
+            self._arquivo_nome = arquivo
+            self._arquivo_restante = int(tamanho)
+            self._responder(["CONNECT"], atraso)
+        elif nome == "AT+CREG":
+            self._responder(["+CREG: 0,1", "OK"], atraso)
+        elif nome == "AT+CSQ":
+            self._responder(["+CSQ: 20,0", "OK"], atraso)
+        else:
+            self._responder(["ERROR"], atraso)
+
+
+# --- EXECUCAO COMO SERVIDOR ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SIM800L simulado em um pseudo-terminal")
+    parser.add_argument("--atraso-rede-sms", type=float, default=2.0, help="segundos ate o +CMGS:")
+    parser.add_argument("--atraso-padrao", type=float, default=0.005, help="segundos ate o OK dos demais comandos")
+    parser.add_argument("--atraso-chamada", type=float, default=0.5, help="segundos ate o OK do ATD")
+    args = parser.parse_args()
+
+    simulador = SimuladorSIM800L(atrasos={"ATD": args.atraso_chamada},
+                                 atraso_padrao=args.atraso_padrao,
+                                 atraso_rede_sms=args.atraso_rede_sms)
+    with simulador:
+        print(f"SIM800L simulado na porta {simulador.porta}")
+        print("Use essa porta no lugar de /dev/serial0. Ctrl+C para encerrar.")
+        try:
+            while True: time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(f"\nComandos recebidos: {len(simulador.comandos_recebidos)} | SMS enviados: {len(simulador.sms_enviados)}")
@@ -0,0 +1,220 @@
+"""
+Log continuo dos landmarks e do estado do detector, em formato binario fixo.
+
+Cada frame que passou pelo MediaPipe (ou que mudou o estado) vira um registro
+de tamanho fixo (`REGISTRO`): instante, numero do frame, estado, os 33
+landmarks e as medidas do corpo. Os arquivos sao .npy comuns, um por dia
+(`landmarks_AAAAMMDD.npy`), entao um dia inteiro e lido sem parsing com
+
+    registros = np.load("telemetria/landmarks_20250101.npy", mmap_mode="r")
+
+O cabecalho .npy e reservado com espaco para qualquer contagem e reescrito a
+cada lote gravado; se o processo morrer no meio de um lote, o arquivo continua
+valido com os registros anteriores.
+
+No laco de deteccao, `registrar` so copia os valores para uma linha de um lote
+pre-alocado; os lotes cheios (ou com mais de `intervalo` segundos) vao para
+uma thread que grava, rotaciona por dia e apaga os dias alem da retencao.
+"""
+
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+ESTADOS = ("Estavel", "Caindo", "Instavel", "Nenhuma pessoa detectada")
+ESTADO_DESCONHECIDO = 255
+_CODIGOS = {estado: codigo for codigo, estado in enumerate(ESTADOS)}
+
+# flags
+PESSOA = 1       # landmarks validos neste registro
+INFERIDO = 2     # pose estimada neste frame (senao e um frame reaproveitado que mudou o estado)
+CONFIRMADA = 4   # queda confirmada no instante do registro
+
+REGISTRO = np.dtype([
+    ('t', '<f8'),                              # time.time() da decisao
+    ('seq', '<u4'),                            # frame da camera
+    ('estado', 'u1'),                          # indice em ESTADOS
+    ('flags', 'u1'),
+    ('_', 'V2'),
+    ('xy', '<f4', (NUM_LANDMARKS, 2)),         # normalizados; float32 para o replay reproduzir as decisoes
+    ('z', '<f2', (NUM_LANDMARKS,)),
+    ('visibilidade', '<f2', (NUM_LANDMARKS,)),
+    ('quadril', '<f4', (2,)),                  # ponto medio dos quadris, normalizado
+    ('torso_angle', '<f4'),
+    ('aspect_ratio', '<f4'),
+    ('caixa', '<f4', (4,)),                    # caixa do corpo em pixels
+])
+
+_PREFIXO = "landmarks_"
+_MAGICA = b"\x93NUMPY\x01\x00"
+_DICIONARIO = "{'descr': %r, 'fortran_order': False, 'shape': (%%d,), }" % (np.lib.format.dtype_to_descr(REGISTRO),)
+# Tamanho fixo do cabecalho (multiplo de 64), com espaco para uma contagem de 20 digitos
+_TAMANHO_CABECALHO = -(-(len(_MAGICA) + 2 + len(_DICIONARIO % 0) + 19 + 1) // 64) * 64
+
+
+def _cabecalho(contagem):
+    texto = _DICIONARIO % contagem
+    espaco = _TAMANHO_CABECALHO - len(_MAGICA) - 2 - 1
+    return _MAGICA + (espaco + 1).to_bytes(2, 'little') + texto.ljust(espaco).encode('latin1') + b"\n"
+
+
+def arquivos(pasta):
+    """Arquivos de telemetria da pasta, do dia mais antigo ao mais novo."""
+    return sorted(glob.glob(os.path.join(pasta, f"{_PREFIXO}*.npy")))
+
+
+def ler(caminho):
+    """Registros de um arquivo como array estruturado mapeado em memoria (somente leitura)."""
+    return np.load(caminho, mmap_mode='r')
+
+
+def landmarks_de(registros, out=None):
+    """Landmarks (N, 33, 4) float32 no formato dos detectores, a partir dos registros."""
+    if out is None: out = np.empty((len(registros), NUM_LANDMARKS, 4), np.float32)
+    out[..., :2] = registros['xy']
+    out[..., 2] = registros['z']
+    out[..., 3] = registros['visibilidade']
+    return out
+
+
+class TelemetryLog:
+    """Grava os registros em lotes, numa thread propria, com um arquivo por dia."""
+
+    def __init__(self, pasta="telemetria", dias_retencao=7, tamanho_lote=256, intervalo=1.0, lotes=4):
+        self.pasta = pasta
+        self.dias_retencao = dias_retencao
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.registros = 0
+        self.descartados = 0   # registros perdidos porque todos os lotes estavam na fila de gravacao
+        self.bytes_gravados = 0
+        self.tempo_gravacao = 0.0
+        self._livres = queue.Queue()
+        for _ in range(lotes):
+            self._livres.put(np.zeros(tamanho_lote, REGISTRO))
+        self._cheios = queue.Queue()
+        self._lote = None
+        self._n = 0
+        self._inicio_lote = 0.0
+        self._arquivo = None
+        self._dia = None
+        self._contagem = 0
+        self._thread = threading.Thread(target=self._gravar, name="telemetria", daemon=True)
+
+    def start(self):
+        os.makedirs(self.pasta, exist_ok=True)
+        self._thread.start()
+
+    def parar(self):
+        """Envia o lote parcial e espera a gravacao terminar."""
+        self._enviar()
+        self._cheios.put(None)
+        self._thread.join(timeout=5)
+
+    # --- Chamado pelo laco de deteccao ---
+    def registrar(self, t, seq, estado, confirmada, inferido, landmarks, medidas):
+        """Copia um frame para o lote atual. `landmarks` e o array (33, 4) ou None; `medidas` e o BodyFeatures."""
+        if self._lote is None:
+            try: self._lote = self._livres.get_nowait()
+            except queue.Empty:
+                self.descartados += 1
+                return
+            self._n = 0
+            self._inicio_lote = t
+        linha = self._lote[self._n]
+        linha['t'] = t
+        linha['seq'] = seq
+        linha['estado'] = _CODIGOS.get(estado, ESTADO_DESCONHECIDO)
+        flags = (INFERIDO if inferido else 0) | (CONFIRMADA if confirmada else 0)
+        if landmarks is not None:
+            flags |= PESSOA
+            linha['xy'] = landmarks[:, :2]
+            linha['z'] = landmarks[:, 2]
+            linha['visibilidade'] = landmarks[:, 3]
+            linha['quadril'] = medidas.quadril
+            linha['torso_angle'] = medidas.torso_angle
+            linha['aspect_ratio'] = medidas.aspect_ratio
+            linha['caixa'] = medidas.caixa
+        else:
+            linha['xy'] = linha['z'] = linha['visibilidade'] = 0
+            linha['quadril'] = linha['caixa'] = 0
+            linha['torso_angle'] = linha['aspect_ratio'] = 0
+        linha['flags'] = flags
+        self._n += 1
+        self.registros += 1
+        if self._n == self.tamanho_lote or t - self._inicio_lote >= self.intervalo:
+            self._enviar()
+
+    def _enviar(self):
+        if self._lote is None: return
+        self._cheios.put((self._lote, self._n))
+        self._lote = None
+
+    # --- Thread de gravacao ---
+    def _gravar(self):
+        while True:
+            item = self._cheios.get()
+            if item is None: break
+            lote, n = item
+            t0 = time.monotonic()
+            try:
+                self._escrever(lote[:n])
+            except Exception as e:
+                # A thread nunca morre: um lote com erro e perdido, os seguintes continuam sendo gravados
+                print(f"ERRO ao gravar a telemetria: {e!r}")
+            self.tempo_gravacao += time.monotonic() - t0
+            self._livres.put(lote)
+        if self._arquivo: self._arquivo.close()
+
+    def _escrever(self, registros):
+        # O lote inteiro vai para o arquivo do dia do primeiro registro
+        dia = time.strftime("%Y%m%d", time.localtime(float(registros['t'][0])))
+        if dia != self._dia:
+            self._abrir(dia)
+        self._arquivo.seek(0, os.SEEK_END)
+        self._arquivo.write(registros.tobytes())
+        self._contagem += len(registros)
+        self._arquivo.seek(0)
+        self._arquivo.write(_cabecalho(self._contagem))
+        self._arquivo.flush()
+        self.bytes_gravados += registros.nbytes
+
+    def _abrir(self, dia):
+        if self._arquivo: self._arquivo.close()
+        caminho = os.path.join(self.pasta, f"{_PREFIXO}{dia}.npy")
+        self._contagem = 0
+        if os.path.exists(caminho):
+            # Reinicio no mesmo dia: continua depois dos registros validos do cabecalho
+            try: self._contagem = len(ler(caminho))
+            except (OSError, ValueError): os.replace(caminho, caminho + ".corrompido")
+        self._arquivo = open(caminho, "r+b" if os.path.exists(caminho) else "w+b")
+        self._arquivo.truncate(_TAMANHO_CABECALHO + self._contagem * REGISTRO.itemsize)
+        self._arquivo.seek(0)
+        self._arquivo.write(_cabecalho(self._contagem))
+        self._dia = dia
+        self._apagar_antigos()
+
+    def _apagar_antigos(self):
+        vivos = arquivos(self.pasta)
+        antigos = vivos[:-self.dias_retencao]
+        # Arquivos danificados renomeados em _abrir (landmarks_AAAAMMDD.npy.corrompido) seguem a mesma
+        # retencao: saem quando o dia deles fica antes do dia mais antigo mantido, e nunca passam de
+        # `dias_retencao` arquivos
+        corrompidos = sorted(glob.glob(os.path.join(self.pasta, f"{_PREFIXO}*.npy.corrompido")))
+        mais_antigo = os.path.basename(vivos[-self.dias_retencao:][0]) if vivos else ""
+        antigos += [caminho for i, caminho in enumerate(corrompidos)
+                    if os.path.basename(caminho) < mais_antigo or i < len(corrompidos) - self.dias_retencao]
+        for caminho in antigos:
+            try: os.remove(caminho)
+            except OSError: pass
+
+    def relatorio(self):
+        return (f"[METRICA] Telemetria: {self.registros} registros ({REGISTRO.itemsize} bytes cada)"
+                f" | {self.bytes_gravados / 1024 / 1024:.1f} MB gravados | gravacao {self.tempo_gravacao:.2f}s"
+                f" | descartados: {self.descartados}")
@@ -6,6 +6,8 @@ import time
 from gtts import gTTS
 import os
 
+from gsm_modem import SIM800L
+
 # --- CONFIGURACOES ---
 numero_destino = "+5535999092107" # EDITE com o numero do seu celular
 mensagem_sms = "ALERTA DE QUEDA: Ligando em seguida com uma mensagem de voz."
@@ -19,6 +21,8 @@ texto_do_alerta = "Olá, meu nome é Alexandre Rodrigues. Estou no endereço Rua
 try:
     ser = serial.Serial(porta_serial, baudrate=115200, timeout=5)
     print(f"Porta serial {porta_serial} aberta com sucesso.")
+    modem = SIM800L(ser)
+    modem.on_urc("", lambda linha: print(f"URC do modulo: {linha}"))
 except serial.SerialException as e:
     print(f"Erro ao abrir a porta serial: {e}")
     exit()
@@ -42,25 +46,16 @@ def gerar_audio_de_alerta():
 
 def enviar_comando_at(comando, resposta_esperada="OK", timeout=2):
     print(f"Enviando comando: {comando}")
-    ser.write((comando + '\r\n').encode())
-    time.sleep(timeout)
-    resposta = ser.read_all().decode(errors='ignore').strip()
-    print(f"Resposta do modulo: {resposta}")
-    return resposta_esperada in resposta
+    resposta = modem.comando(comando, resposta_esperada, timeout)
+    print(f"Resposta do modulo: {resposta.texto} ({resposta.latencia * 1000:.0f} ms)")
+    return resposta.ok
     
-# --- FUNCOES GSM (enviar_sms nao mudou) ---
+# --- FUNCOES GSM ---
 def enviar_sms(numero, mensagem):
-    # (Esta funcao permanece a mesma do script anterior)
     print("\n--- Tentando enviar SMS ---")
-    if not enviar_comando_at("AT+CMGF=1"): return False
-    if not enviar_comando_at(f'AT+CMGS="{numero}"', ">"): return False
-    ser.write(mensagem.encode())
-    time.sleep(0.5)
-    ser.write(bytes([26]))
-    time.sleep(5)
-    resposta = ser.read_all().decode(errors='ignore')
-    if "+CMGS:" in resposta:
-        print(">>> SMS enviado com sucesso!")
+    resposta = modem.enviar_sms(numero, mensagem)
+    if resposta.ok:
+        print(f">>> SMS enviado com sucesso! ({resposta.latencia:.2f} s)")
         return True
     else:
         print(">>> Falha ao enviar SMS.")
@@ -69,7 +64,7 @@ def enviar_sms(numero, mensagem):
 # --- FUNCAO FAZER_CHAMADA ATUALIZADA ---
 def fazer_chamada_com_audio(numero):
     print("\n--- Tentando fazer chamada com audio ---")
-    if not enviar_comando_at(f"ATD{numero};", "OK", timeout=5):
+    if not enviar_comando_at(f"ATD{numero};", "OK", timeout=20):
         print(">>> Falha ao iniciar a chamada.")
         return False
     
@@ -97,7 +92,7 @@ def fazer_chamada_com_audio(numero):
 if __name__ == "__main__":
     # 1. Gera o audio (se necessario)
     if not gerar_audio_de_alerta():
-        ser.close()
+        modem.fechar()
         exit()
 
     # 2. Testa a conexao com o modulo
@@ -115,5 +110,5 @@ if __name__ == "__main__":
     else:
         print("\n>>> Falha na comunicacao com o modulo. Verifique as conexoes e a alimentacao.")
     
-    ser.close()
+    modem.fechar()
     print("\nTeste finalizado. Porta serial fechada.")
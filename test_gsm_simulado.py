@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# test_gsm_simulado.py - Verificacoes do driver SIM800L contra o modulo simulado (sem hardware)
+"""
+Roda o driver SIM800L contra o SimuladorSIM800L em pty e confere casos que
+o hardware so mostra de vez em quando:
+
+- SMS seguido imediatamente de ATD (o que o app faz ao confirmar uma queda),
+  com o OK final do SMS chegando um tempo depois do "+CMGS:". O SMS so pode
+  terminar no OK; se terminasse no "+CMGS:", o OK atrasado completaria o ATD
+  antes da resposta da chamada.
+
+Uso:
+    python test_gsm_simulado.py
+"""
+
+import time
+
+import serial
+
+from gsm_modem import SIM800L
+from sim800l_simulador import SimuladorSIM800L
+
+ATRASO_REDE_SMS = 0.3
+ATRASO_OK_SMS = 0.3
+ATRASO_CHAMADA = 0.5
+
+
+def verificar_sms_seguido_de_chamada():
+    simulador = SimuladorSIM800L(atrasos={"ATD": ATRASO_CHAMADA}, atraso_rede_sms=ATRASO_REDE_SMS,
+                                 atraso_ok_sms=ATRASO_OK_SMS)
+    with simulador:
+        modem = SIM800L(serial.Serial(simulador.porta, baudrate=115200, timeout=5))
+        try:
+            sms = modem.enviar_sms("+5500000000000", "ALERTA DE QUEDA! (teste)", timeout=5)
+            t_atd = time.time()
+            chamada = modem.comando("ATD+5500000000000;", "OK", timeout=5)
+            # Da um tempo para um OK atrasado aparecer como URC/resposta indevida
+            time.sleep(ATRASO_OK_SMS)
+        finally:
+            modem.fechar()
+
+    falhas = []
+    if not sms.ok: falhas.append(f"SMS falhou: {sms.texto!r}")
+    if sms.final != "OK": falhas.append(f"SMS terminou em {sms.final!r} e nao no OK final")
+    if sms.valor("+CMGS:") != "1": falhas.append(f"referencia do +CMGS: inesperada: {sms.valor('+CMGS:')!r}")
+    if sms.latencia < ATRASO_REDE_SMS + ATRASO_OK_SMS * 0.9:
+        falhas.append(f"SMS terminou antes do OK ({sms.latencia:.3f}s)")
+    if not chamada.ok: falhas.append(f"ATD falhou: {chamada.texto!r}")
+    if chamada.latencia < ATRASO_CHAMADA * 0.9:
+        falhas.append(f"ATD concluido em {chamada.latencia:.3f}s, antes da resposta do modulo ({ATRASO_CHAMADA:.3f}s)")
+    comandos_atd = [t for t, c in simulador.comandos_recebidos if c.startswith("ATD")]
+    if not comandos_atd or comandos_atd[0] < t_atd - 0.05:
+        falhas.append("ATD enviado antes do fim do SMS")
+
+    print(f"SMS: {sms.texto!r} em {sms.latencia:.3f}s | ATD: {chamada.texto!r} em {chamada.latencia:.3f}s")
+    return falhas
+
+
+if __name__ == "__main__":
+    falhas = verificar_sms_seguido_de_chamada()
+    for falha in falhas:
+        print(f">>> FALHA: {falha}")
+    print(">>> SMS seguido de ATD: OK" if not falhas else f">>> {len(falhas)} falha(s)")
+    raise SystemExit(1 if falhas else 0)
@@ -3,6 +3,8 @@
 import serial
 import time
 
+from gsm_modem import SIM800L
+
 # --- CONFIGURACOES ---
 numero_destino = "+5535999092107" # EDITE com o seu numero
 porta_serial = "/dev/serial0"
@@ -11,23 +13,22 @@ porta_serial = "/dev/serial0"
 try:
     ser = serial.Serial(porta_serial, baudrate=115200, timeout=1)
     print(f"Porta serial {porta_serial} aberta.")
+    modem = SIM800L(ser)
 except serial.SerialException as e:
     print(f"Erro ao abrir a porta serial: {e}")
     exit()
 
-def enviar_comando_at(comando, resposta_esperada="OK", timeout=0.2):
+def enviar_comando_at(comando, resposta_esperada="OK", timeout=2):
     """Envia um comando AT e retorna True se a resposta for a esperada."""
-    ser.write((comando + '\r\n').encode())
-    # Um tempo de espera menor para comandos rapidos
-    time.sleep(timeout) 
-    resposta = ser.read_all().decode(errors='ignore').strip()
+    # O timeout e so o limite: o comando retorna assim que chega o codigo final
+    resposta = modem.comando(comando, resposta_esperada, timeout)
     # Nao vamos imprimir a resposta para nao poluir o terminal com os bipes
-    return resposta_esperada in resposta
+    return resposta.ok
 
 # --- NOVA FUNCAO DE CHAMADA ---
 def fazer_chamada_com_alerta_rapido(numero):
     print("\n--- Iniciando chamada de alerta rapido ---")
-    if not enviar_comando_at(f"ATD{numero};", "OK", timeout=5):
+    if not enviar_comando_at(f"ATD{numero};", "OK", timeout=20):
         print(">>> Falha ao iniciar a chamada.")
         return False
     
@@ -45,7 +46,7 @@ def fazer_chamada_com_alerta_rapido(numero):
     print(">>> Alerta finalizado.")
     
     # Encerra a chamada
-    if enviar_comando_at("ATH", "OK", timeout=2):
+    if enviar_comando_at("ATH", "OK", timeout=5):
         print(">>> Chamada encerrada com sucesso.")
     else:
         print(">>> Falha ao encerrar a chamada.")
@@ -60,5 +61,7 @@ if __name__ == "__main__":
     else:
         print("\nFalha na comunicacao com o modulo.")
     
-    ser.close()
+    for nome, estat in modem.estatisticas().items():
+        print(f"Latencia {nome}: media {estat['media_ms']:.0f} ms, max {estat['max_ms']:.0f} ms ({estat['n']} comandos)")
+    modem.fechar()
     print("\nTeste finalizado.")
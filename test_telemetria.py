@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# test_telemetria.py - Verificacoes do TelemetryLog numa pasta temporaria (sem camera)
+"""
+Grava lotes de telemetria numa pasta nova e confere o arquivo do dia:
+
+- primeiro lote numa pasta vazia (menos dias que a retencao): o arquivo e
+  criado e os registros sao lidos de volta;
+- retencao com arquivos danificados (*.npy.corrompido) de dias antigos.
+
+Uso:
+    python test_telemetria.py
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import telemetria
+from landmarks import BodyFeatures, NUM_LANDMARKS
+
+
+def verificar_primeiro_lote_em_pasta_vazia():
+    falhas = []
+    pasta = tempfile.mkdtemp(prefix="telemetria_")
+    try:
+        log = telemetria.TelemetryLog(pasta, dias_retencao=7, tamanho_lote=8)
+        log.start()
+        landmarks = np.random.rand(NUM_LANDMARKS, 4).astype(np.float32)
+        medidas = BodyFeatures().calcular(landmarks, 640, 480)
+        t = time.time()
+        for i in range(20):
+            log.registrar(t + i / 30, i + 1, "Estavel", False, True, landmarks, medidas)
+        log.parar()
+        arquivos = telemetria.arquivos(pasta)
+        if len(arquivos) != 1: falhas.append(f"esperado 1 arquivo do dia, encontrados {arquivos}")
+        elif len(telemetria.ler(arquivos[0])) != 20:
+            falhas.append(f"{len(telemetria.ler(arquivos[0]))} registros lidos de volta, esperados 20")
+        if log.bytes_gravados != 20 * telemetria.REGISTRO.itemsize:
+            falhas.append(f"{log.bytes_gravados} bytes gravados, esperados {20 * telemetria.REGISTRO.itemsize}")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return falhas
+
+
+def verificar_retencao_com_corrompidos():
+    falhas = []
+    pasta = tempfile.mkdtemp(prefix="telemetria_")
+    try:
+        for dia in range(1, 11):
+            open(os.path.join(pasta, f"landmarks_202501{dia:02d}.npy"), "w").close()
+        for dia in (2, 5, 8, 9):
+            open(os.path.join(pasta, f"landmarks_202501{dia:02d}.npy.corrompido"), "w").close()
+        telemetria.TelemetryLog(pasta, dias_retencao=3)._apagar_antigos()
+        esperado = ["landmarks_20250108.npy", "landmarks_20250108.npy.corrompido", "landmarks_20250109.npy",
+                    "landmarks_20250109.npy.corrompido", "landmarks_20250110.npy"]
+        if sorted(os.listdir(pasta)) != esperado: falhas.append(f"mantidos {sorted(os.listdir(pasta))}")
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+    return falhas
+
+
+if __name__ == "__main__":
+    falhas = []
+    for verificacao in (verificar_primeiro_lote_em_pasta_vazia, verificar_retencao_com_corrompidos):
+        resultado = verificacao()
+        print(f">>> {verificacao.__name__}: {'OK' if not resultado else 'FALHA'}")
+        falhas += resultado
+    for falha in falhas:
+        print(f">>> FALHA: {falha}")
+    raise SystemExit(1 if falhas else 0)